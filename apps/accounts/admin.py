@@ -18,11 +18,12 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ("email",)
     ordering = ("-created_at",)
     readonly_fields = ("id", "created_at", "last_login")
+    filter_horizontal = ("groups", "user_permissions", "visa_type_skills")
 
     # BaseUserAdmin references 'username' by default; override to use email.
     fieldsets = (
         (None,              {"fields": ("id", "email", "password")}),
-        ("Role",            {"fields": ("role",)}),
+        ("Role",            {"fields": ("role", "visa_type_skills")}),
         ("Permissions",     {"fields": ("is_active", "is_staff", "is_superuser", "groups", "user_permissions")}),
         ("Timestamps",      {"fields": ("created_at", "last_login")}),
     )
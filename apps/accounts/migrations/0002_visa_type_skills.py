@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('visas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='visa_type_skills',
+            field=models.ManyToManyField(blank=True, related_name='skilled_officers', to='visas.visatype'),
+        ),
+    ]
@@ -39,6 +39,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         default=UserRole.APPLICANT,
         db_index=True,          # dashboard and permission queries filter heavily by role
     )
+    # Officers only: visa types routed to them when review assignment uses
+    # skill routing. Empty means any visa type.
+    visa_type_skills = models.ManyToManyField(
+        "visas.VisaType",
+        blank=True,
+        related_name="skilled_officers",
+    )
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)  # required by Django admin
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import VisaApplication
+from .services import create_application, soft_delete_application
 
 
 @admin.register(VisaApplication)
@@ -15,6 +16,7 @@ class VisaApplicationAdmin(admin.ModelAdmin):
         "applicant",
         "visa_type",
         "status",
+        "assigned_officer",
         "nationality",
         "intended_entry_date",
         "submitted_at",
@@ -23,12 +25,30 @@ class VisaApplicationAdmin(admin.ModelAdmin):
     list_filter = ("status", "visa_type", "nationality")
     search_fields = ("id", "applicant__email")
     ordering = ("-created_at",)
-    readonly_fields = ("id", "created_at", "submitted_at")
+    # status and soft_deleted_at change only through the services (here, the
+    # action below), which keep the status counters in step.
+    readonly_fields = ("id", "status", "created_at", "submitted_at", "soft_deleted_at")
+    actions = ("soft_delete_selected",)
     date_hierarchy = "created_at"
-    raw_id_fields = ("applicant",)       # UUID PKs render poorly in a dropdown
+    raw_id_fields = ("applicant", "assigned_officer")   # UUID PKs render poorly in a dropdown
 
     fieldsets = (
         ("Identity",     {"fields": ("id", "applicant", "visa_type")}),
-        ("Details",      {"fields": ("status", "nationality", "purpose_of_travel", "intended_entry_date")}),
+        ("Details",      {"fields": ("status", "assigned_officer", "nationality", "purpose_of_travel", "intended_entry_date")}),
         ("Timestamps",   {"fields": ("created_at", "submitted_at", "soft_deleted_at")}),
     )
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            super().save_model(request, obj, form, change)
+        else:
+            # New applications start as counted DRAFTs, as from the public form.
+            create_application(obj, obj.applicant)
+
+    @admin.action(description="Soft-delete selected applications")
+    def soft_delete_selected(self, request, queryset):
+        deleted = 0
+        for application in queryset.filter(soft_deleted_at__isnull=True):
+            soft_delete_application(application)
+            deleted += 1
+        self.message_user(request, f"{deleted} application(s) soft-deleted.")
@@ -0,0 +1,92 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.applications.models import ApplicationStatusCount, DailySubmissionCount, VisaApplication
+
+
+def _apply(model, key_field: str, deltas: dict) -> None:
+    # Keys in sorted order, so two transactions touching the same counter
+    # rows always lock them in the same order and cannot deadlock.
+    for key in sorted(deltas):
+        delta = deltas[key]
+        if not delta:
+            continue
+        rows = model.objects.filter(**{key_field: key})
+        if rows.update(count=F("count") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.create(**{key_field: key}, count=delta)
+        except IntegrityError:
+            # Another transaction created the counter first; add to it instead.
+            rows.update(count=F("count") + delta)
+
+
+def adjust_status_counts(deltas: dict) -> None:
+    """
+    Apply {status: delta} to the status counters. Call inside the transaction
+    that changes the applications, so the counters commit or roll back with
+    the change they describe.
+    """
+    _apply(ApplicationStatusCount, "status", deltas)
+
+
+def adjust_submission_counts(deltas: dict) -> None:
+    # {submitted_at: delta}, folded into local days.
+    by_day: dict = {}
+    for submitted_at, delta in deltas.items():
+        day = timezone.localdate(submitted_at)
+        by_day[day] = by_day.get(day, 0) + delta
+    _apply(DailySubmissionCount, "day", by_day)
+
+
+def get_status_counts() -> dict:
+    # Zero counters are left out, as the GROUP BY they replace did.
+    return dict(ApplicationStatusCount.objects.filter(count__gt=0).order_by("status").values_list("status", "count"))
+
+
+def count_submissions_since(day: datetime.date) -> int:
+    return DailySubmissionCount.objects.filter(day__gte=day).aggregate(total=Sum("count"))["total"] or 0
+
+
+@transaction.atomic
+def reconcile_counters(dry_run: bool = False) -> dict:
+    """
+    Recompute every counter from the applications table and, unless dry_run,
+    overwrite the stored values. Returns {counter: (stored, actual)} for each
+    one that had drifted. The existing counter rows are locked first, so
+    changes committing meanwhile wait rather than being counted twice.
+    """
+    list(ApplicationStatusCount.objects.select_for_update().values_list("pk"))
+    list(DailySubmissionCount.objects.select_for_update().values_list("pk"))
+
+    live = VisaApplication.objects.filter(soft_deleted_at__isnull=True)
+    actual_status = dict(live.values("status").annotate(n=Count("id")).values_list("status", "n"))
+    actual_days = dict(
+        live.filter(submitted_at__isnull=False)
+        .annotate(day=TruncDate("submitted_at"))
+        .values("day")
+        .annotate(n=Count("id"))
+        .values_list("day", "n")
+    )
+
+    drift = {}
+    for model, key_field, actual in (
+        (ApplicationStatusCount, "status", actual_status),
+        (DailySubmissionCount, "day", actual_days),
+    ):
+        stored = dict(model.objects.values_list(key_field, "count"))
+        deltas = {}
+        for key in stored.keys() | actual.keys():
+            before, after = stored.get(key, 0), actual.get(key, 0)
+            if before != after:
+                drift[f"{model._meta.verbose_name} {key}"] = (before, after)
+                deltas[key] = after - before
+        if not dry_run:
+            _apply(model, key_field, deltas)
+            model.objects.filter(count=0).delete()
+    return drift
@@ -14,3 +14,11 @@ class RuleViolation(Exception):
 
 class PaymentError(Exception):
     pass
+
+
+class PaymentNotFound(PaymentError):
+    pass
+
+
+class UploadError(Exception):
+    pass
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.applications.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the application status and daily submission counters from "
+        "the applications table and repair any drift, e.g. after status edits "
+        "made outside the application services."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report counters that have drifted.",
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(dry_run=options["dry_run"])
+        for counter, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{counter}: stored {stored}, actual {actual}")
+        verb = "found" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"{len(drift)} drifted counter(s) {verb}."))
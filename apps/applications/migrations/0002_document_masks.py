@@ -0,0 +1,64 @@
+from django.db import migrations, models
+
+
+def backfill_document_masks(apps, schema_editor):
+    from apps.documents.masks import DOCUMENT_TYPE_BITS, is_complete, required_documents_mask
+
+    VisaApplication = apps.get_model("applications", "VisaApplication")
+    ApplicationDocument = apps.get_model("documents", "ApplicationDocument")
+
+    supplied: dict = {}
+    verified: dict = {}
+    rows = ApplicationDocument.objects.values_list("application_id", "document_type", "verified")
+    for application_id, document_type, is_verified in rows.iterator(chunk_size=2000):
+        bit = DOCUMENT_TYPE_BITS.get(document_type, 0)
+        supplied[application_id] = supplied.get(application_id, 0) | bit
+        if is_verified:
+            verified[application_id] = verified.get(application_id, 0) | bit
+
+    required_masks: dict = {}
+    batch = []
+    for application in VisaApplication.objects.filter(pk__in=supplied).select_related("visa_type").iterator(chunk_size=2000):
+        code = application.visa_type.code
+        if code not in required_masks:
+            required_masks[code] = required_documents_mask(code)
+        application.documents_supplied_mask = supplied[application.pk]
+        application.documents_verified_mask = verified.get(application.pk, 0)
+        application.documents_complete = is_complete(supplied[application.pk], required_masks[code])
+        batch.append(application)
+    VisaApplication.objects.bulk_update(
+        batch,
+        ["documents_supplied_mask", "documents_verified_mask", "documents_complete"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0001_initial'),
+        ('documents', '0004_document_previews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visaapplication',
+            name='documents_complete',
+            field=models.BooleanField(default=False, help_text='Every document required for the visa type has been uploaded.'),
+        ),
+        migrations.AddField(
+            model_name='visaapplication',
+            name='documents_supplied_mask',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='visaapplication',
+            name='documents_verified_mask',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='visaapplication',
+            index=models.Index(fields=['status', 'documents_complete'], name='idx_app_status_doccomplete'),
+        ),
+        migrations.RunPython(backfill_document_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_document_masks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visaapplication',
+            name='review_started_at',
+            field=models.DateTimeField(blank=True, help_text='When the application last entered UNDER_REVIEW.', null=True),
+        ),
+    ]
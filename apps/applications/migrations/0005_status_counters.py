@@ -0,0 +1,59 @@
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def seed_counters(apps, schema_editor):
+    # Same figures reconcile_application_counters computes.
+    VisaApplication = apps.get_model("applications", "VisaApplication")
+    ApplicationStatusCount = apps.get_model("applications", "ApplicationStatusCount")
+    DailySubmissionCount = apps.get_model("applications", "DailySubmissionCount")
+    live = VisaApplication.objects.filter(soft_deleted_at__isnull=True)
+    ApplicationStatusCount.objects.bulk_create(
+        ApplicationStatusCount(status=row["status"], count=row["n"])
+        for row in live.values("status").annotate(n=Count("id"))
+    )
+    DailySubmissionCount.objects.bulk_create(
+        DailySubmissionCount(day=row["day"], count=row["n"])
+        for row in (
+            live.filter(submitted_at__isnull=False)
+            .annotate(day=TruncDate("submitted_at"))
+            .values("day")
+            .annotate(n=Count("id"))
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_assigned_officer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusCount',
+            fields=[
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('SUBMITTED', 'Submitted'), ('PRE_SCREENING', 'Pre-Screening'), ('UNDER_REVIEW', 'Under Review'), ('PENDING_INFO', 'Pending Additional Information'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('ISSUED', 'Issued'), ('WITHDRAWN', 'Withdrawn')], max_length=20, primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Application Status Count',
+                'verbose_name_plural': 'Application Status Counts',
+                'db_table': 'applications_statuscount',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySubmissionCount',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Submission Count',
+                'verbose_name_plural': 'Daily Submission Counts',
+                'db_table': 'applications_dailysubmissioncount',
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -41,11 +41,35 @@ class VisaApplication(models.Model):
         blank=True,
         db_index=True,              # SLA reports filter/sort on submission date
     )
+    review_started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the application last entered UNDER_REVIEW.",
+    )
+    # Set by apps.reviews.assignment on entry to UNDER_REVIEW and kept across
+    # PENDING_INFO round trips, so the case comes back to the same officer.
+    assigned_officer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,  # reassigned by assign_review_queue
+        null=True,
+        blank=True,
+        related_name="assigned_applications",
+        db_index=False,             # covered by idx_app_officer_queue
+    )
     soft_deleted_at = models.DateTimeField(
         null=True,
         blank=True,
         help_text="Non-null means this record is logically deleted.",
     )
+    # Denormalised from ApplicationDocument: one bit per DocumentType (see
+    # apps.documents.masks), rewritten by sync_document_masks on every
+    # document change so completeness checks need no join.
+    documents_supplied_mask = models.PositiveIntegerField(default=0)
+    documents_verified_mask = models.PositiveIntegerField(default=0)
+    documents_complete = models.BooleanField(
+        default=False,
+        help_text="Every document required for the visa type has been uploaded.",
+    )
 
     class Meta:
         db_table = "applications_visaapplication"
@@ -60,8 +84,51 @@ class VisaApplication(models.Model):
                 fields=["status", "soft_deleted_at"],
                 name="idx_app_status_softdel",
             ),
+            models.Index(
+                fields=["status", "documents_complete"],
+                name="idx_app_status_doccomplete",
+            ),
+            # An officer's queue is a range scan, already in submission order.
+            models.Index(
+                fields=["assigned_officer", "status", "submitted_at"],
+                name="idx_app_officer_queue",
+            ),
         ]
 
     def __str__(self) -> str:
         return f"Application {self.id} [{self.status}]"
 
+
+class ApplicationStatusCount(models.Model):
+    """
+    Live applications (not soft-deleted) per status, kept in step by the
+    application services in the same transaction as each change so reports
+    never GROUP BY the applications table. Repaired by
+    reconcile_application_counters.
+    """
+
+    status = models.CharField(max_length=20, choices=ApplicationStatus.choices, primary_key=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "applications_statuscount"
+        verbose_name = "Application Status Count"
+        verbose_name_plural = "Application Status Counts"
+
+    def __str__(self) -> str:
+        return f"{self.status}: {self.count}"
+
+
+class DailySubmissionCount(models.Model):
+    # Live applications by local date of submission; recent-volume reports
+    # sum a handful of these rows.
+    day = models.DateField(primary_key=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "applications_dailysubmissioncount"
+        verbose_name = "Daily Submission Count"
+        verbose_name_plural = "Daily Submission Counts"
+
+    def __str__(self) -> str:
+        return f"{self.day}: {self.count}"
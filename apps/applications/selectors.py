@@ -13,8 +13,8 @@ def get_applicant_applications(user):
     )
 
 
-def get_officer_queue():
-    return (
+def get_officer_queue(documents_complete: bool | None = None, officer=None):
+    queue = (
         VisaApplication.objects
         .filter(
             status=ApplicationStatus.UNDER_REVIEW,
@@ -23,10 +23,19 @@ def get_officer_queue():
         .select_related("applicant", "visa_type")
         .order_by("submitted_at")
     )
+    if officer is not None:
+        # Served by idx_app_officer_queue: a range scan already in order.
+        queue = queue.filter(assigned_officer=officer)
+    else:
+        queue = queue.select_related("assigned_officer")
+    if documents_complete is not None:
+        # Served by idx_app_status_doccomplete; no join to documents.
+        queue = queue.filter(documents_complete=documents_complete)
+    return queue
 
 
-def get_pending_info_queue():
-    return (
+def get_pending_info_queue(officer=None):
+    queue = (
         VisaApplication.objects
         .filter(
             status=ApplicationStatus.PENDING_INFO,
@@ -35,6 +44,9 @@ def get_pending_info_queue():
         .select_related("applicant", "visa_type")
         .order_by("submitted_at")
     )
+    if officer is not None:
+        queue = queue.filter(assigned_officer=officer)
+    return queue
 
 
 def get_application_with_documents(application_id):
@@ -48,11 +60,8 @@ def get_application_with_documents(application_id):
 
 
 def get_application_audit_trail(application_id):
-    from apps.audit.models import ApplicationAuditLog
+    # Merged view over the audit table and the outbox, so events not yet
+    # flushed still show up.
+    from apps.audit.selectors import get_audit_trail
 
-    return (
-        ApplicationAuditLog.objects
-        .filter(application_id=application_id)
-        .select_related("actor")
-        .order_by("timestamp")
-    )
+    return get_audit_trail(application_id)
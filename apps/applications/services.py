@@ -9,9 +9,28 @@ from apps.applications.exceptions import (
     PaymentError,
     RuleViolation,
 )
+from apps.applications.counters import adjust_status_counts, adjust_submission_counts
 from apps.applications.models import VisaApplication
 
 
+def write_status(application_ids, current: str, new_status: str, **fields) -> int:
+    """
+    Move the given applications from current to new_status, setting any
+    other fields alongside, and count the move in the status counters.
+    Every status write goes through here, so the counters cannot drift.
+    The UPDATE is conditional on current: rows that have already moved on
+    are left alone and not counted. Call inside the transaction that makes
+    the change. Returns how many rows moved.
+    """
+    rows = VisaApplication.objects.filter(pk__in=application_ids, status=current)
+    # Soft-deleted applications are already out of the counters.
+    hidden = rows.filter(soft_deleted_at__isnull=False).update(status=new_status, **fields)
+    moved = rows.update(status=new_status, **fields)
+    if moved:
+        adjust_status_counts({current: -moved, new_status: moved})
+    return hidden + moved
+
+
 def _transition_status(
     application: VisaApplication,
     new_status: str,
@@ -27,14 +46,23 @@ def _transition_status(
             f"Allowed: {sorted(allowed) if allowed else 'none — terminal state'}."
         )
 
-    update_fields = ["status"]
-    application.status = new_status
-
+    fields = {}
     if new_status == ApplicationStatus.SUBMITTED:
-        application.submitted_at = timezone.now()
-        update_fields.append("submitted_at")
+        fields["submitted_at"] = timezone.now()
+    elif new_status == ApplicationStatus.UNDER_REVIEW:
+        # Feeds the time-to-decision figures in ReviewerDailyStats.
+        fields["review_started_at"] = timezone.now()
+
+    if not write_status([application.pk], current, new_status, **fields):
+        raise InvalidStateTransition(
+            f"Cannot transition '{application.id}' from {current!r}: its status changed concurrently."
+        )
+    application.status = new_status
+    for name, value in fields.items():
+        setattr(application, name, value)
 
-    application.save(update_fields=update_fields)
+    if application.soft_deleted_at is None and new_status == ApplicationStatus.SUBMITTED:
+        adjust_submission_counts({application.submitted_at: 1})
 
     # Deferred import: importing audit.services at module level would create a
     # circular dependency since audit.models imports nothing from applications.
@@ -48,6 +76,45 @@ def _transition_status(
         reason=reason,
     )
 
+    from apps.reviews.feed import QUEUE_STATUSES, bump_queue_versions
+
+    if current in QUEUE_STATUSES or new_status in QUEUE_STATUSES:
+        bump_queue_versions([application.assigned_officer_id])
+
+    return application
+
+
+@transaction.atomic
+def create_application(application: VisaApplication, applicant) -> VisaApplication:
+    # Saves a new DRAFT built from the application form, and counts it.
+    from apps.documents.masks import is_complete, required_documents_mask
+
+    application.applicant = applicant
+    application.status = ApplicationStatus.DRAFT
+    # Nothing uploaded yet: complete only if the visa type needs no documents.
+    application.documents_complete = is_complete(0, required_documents_mask(application.visa_type.code))
+    application.save()
+    adjust_status_counts({ApplicationStatus.DRAFT: 1})
+    return application
+
+
+@transaction.atomic
+def soft_delete_application(application: VisaApplication) -> VisaApplication:
+    # Hides the application everywhere and takes it out of the counters;
+    # the row and its audit trail stay.
+    # The stored row decides which counters to take it out of, not the
+    # caller's copy, which may predate a status change.
+    locked = VisaApplication.objects.select_for_update().get(pk=application.pk)
+    if locked.soft_deleted_at is not None:
+        application.soft_deleted_at = locked.soft_deleted_at
+        return application
+    locked.soft_deleted_at = timezone.now()
+    locked.save(update_fields=["soft_deleted_at"])
+    adjust_status_counts({locked.status: -1})
+    if locked.submitted_at is not None:
+        adjust_submission_counts({locked.submitted_at: -1})
+    application.status = locked.status
+    application.soft_deleted_at = locked.soft_deleted_at
     return application
 
 
@@ -67,11 +134,10 @@ def run_pre_screening(application: VisaApplication) -> VisaApplication:
     # application stays SUBMITTED and a human can investigate. Soft issues
     # (missing documents) become warnings in the audit reason, not blockers.
     from rules.engine import evaluate
+    from apps.documents.masks import document_types
     from apps.documents.services import list_missing_documents
 
-    supplied_types = list(
-        application.documents.values_list("document_type", flat=True)
-    )
+    supplied_types = document_types(application.documents_supplied_mask)
 
     result = evaluate(
         visa_type_code=application.visa_type.code,
@@ -108,13 +174,19 @@ def run_pre_screening(application: VisaApplication) -> VisaApplication:
 
 @transaction.atomic
 def move_to_under_review(application: VisaApplication) -> VisaApplication:
-    return _transition_status(
+    _transition_status(
         application,
         ApplicationStatus.UNDER_REVIEW,
         actor=None,  # SYSTEM action
         reason="Pre-screening complete — assigned to officer queue.",
     )
 
+    # Deferred import: apps.reviews imports this module's models and services.
+    from apps.reviews.assignment import assign_application
+
+    assign_application(application)
+    return application
+
 
 @transaction.atomic
 def issue_visa(application: VisaApplication) -> VisaApplication:
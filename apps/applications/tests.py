@@ -1,3 +1,166 @@
+import datetime
+from unittest import mock
+
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.applications.choices import ApplicationStatus
+from apps.applications.counters import adjust_status_counts, get_status_counts, reconcile_counters
+from apps.applications.exceptions import InvalidStateTransition
+from apps.applications.models import VisaApplication
+from apps.applications.services import (
+    create_application,
+    soft_delete_application,
+    submit_application,
+    write_status,
+)
+from apps.visas.models import VisaType
+
+
+class CounterTestCase(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("applicant@example.com", "pw")
+        self.visa_type = VisaType.objects.create(code="TOURIST_30", name="Tourist", fee_amount=50, max_stay_days=30)
+
+    def make_application(self, **fields) -> VisaApplication:
+        return VisaApplication.objects.create(
+            applicant=self.applicant,
+            visa_type=self.visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+            **fields,
+        )
+
+    def draft(self) -> VisaApplication:
+        return create_application(
+            VisaApplication(
+                visa_type=self.visa_type,
+                nationality="NG",
+                purpose_of_travel="Tourism",
+                intended_entry_date=datetime.date(2030, 1, 1),
+            ),
+            self.applicant,
+        )
+
+    def assertCountersMatch(self):
+        self.assertEqual(reconcile_counters(dry_run=True), {})
+
+
+class StatusCounterTests(CounterTestCase):
+    def test_submit_moves_the_counts(self):
+        application = self.draft()
+        submit_application(application, actor=self.applicant)
+
+        self.assertEqual(get_status_counts(), {ApplicationStatus.SUBMITTED: 1})
+        self.assertCountersMatch()
+
+    def test_soft_delete_then_move_leaves_counts_alone(self):
+        application = self.draft()
+        soft_delete_application(application)
+
+        self.assertEqual(write_status([application.pk], ApplicationStatus.DRAFT, ApplicationStatus.SUBMITTED), 1)
+        application.refresh_from_db()
+        self.assertEqual(application.status, ApplicationStatus.SUBMITTED)
+        self.assertCountersMatch()
+
+    def test_soft_delete_reads_the_stored_status(self):
+        application = self.draft()
+        stale = VisaApplication.objects.get(pk=application.pk)
+        submit_application(application, actor=self.applicant)
+
+        soft_delete_application(stale)
+        self.assertEqual(stale.status, ApplicationStatus.SUBMITTED)
+        self.assertEqual(get_status_counts(), {})
+        self.assertCountersMatch()
+
+    def test_stale_status_moves_nothing(self):
+        application = self.draft()
+        stale = VisaApplication.objects.get(pk=application.pk)
+        submit_application(application, actor=self.applicant)
+
+        with self.assertRaisesMessage(InvalidStateTransition, "changed concurrently"):
+            submit_application(stale, actor=self.applicant)
+        self.assertEqual(get_status_counts()[ApplicationStatus.SUBMITTED], 1)
+        self.assertCountersMatch()
+
+    def test_batch_write_counts_each_row(self):
+        approved = [self.make_application(status=ApplicationStatus.APPROVED) for _ in range(3)]
+        issued = self.make_application(status=ApplicationStatus.ISSUED)
+        reconcile_counters()
+
+        moved = write_status(
+            [a.pk for a in approved] + [issued.pk], ApplicationStatus.APPROVED, ApplicationStatus.ISSUED,
+        )
+        self.assertEqual(moved, 3)
+        self.assertEqual(get_status_counts(), {ApplicationStatus.ISSUED: 4})
+        self.assertCountersMatch()
+
+    def test_first_change_survives_a_concurrent_creator(self):
+        adjust_status_counts({ApplicationStatus.DRAFT: 1})
+
+        # The UPDATE misses, as if the counter were committed between it and
+        # the INSERT; the INSERT then hits the primary key.
+        update = QuerySet.update
+        missed = []
+
+        def miss_once(queryset, **kwargs):
+            if not missed:
+                missed.append(True)
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", miss_once):
+            adjust_status_counts({ApplicationStatus.DRAFT: 2})
+        self.assertEqual(get_status_counts(), {ApplicationStatus.DRAFT: 3})
+
+    def test_reconcile_repairs_drift(self):
+        now = timezone.now()
+        self.make_application(submitted_at=now, status=ApplicationStatus.SUBMITTED)
+
+        self.assertEqual(reconcile_counters(), {
+            "Application Status Count SUBMITTED": (0, 1),
+            f"Daily Submission Count {timezone.localdate(now)}": (0, 1),
+        })
+        self.assertCountersMatch()
+
+
+class ApplicationAdminTests(CounterTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = User.objects.create_superuser("admin@example.com", "pw")
+        self.client.force_login(admin)
+
+    def test_status_cannot_be_edited(self):
+        application = self.draft()
+        url = reverse("admin:applications_visaapplication_change", args=[application.pk])
+        response = self.client.get(url)
+        self.assertNotContains(response, 'name="status"')
+
+        response = self.client.post(url, {
+            "applicant": self.applicant.pk,
+            "visa_type": self.visa_type.pk,
+            "status": ApplicationStatus.APPROVED,
+            "nationality": "GH",
+            "purpose_of_travel": "Tourism",
+            "intended_entry_date": "2030-01-01",
+        })
+        self.assertEqual(response.status_code, 302)
+        application.refresh_from_db()
+        self.assertEqual((application.status, application.nationality), (ApplicationStatus.DRAFT, "GH"))
+        self.assertCountersMatch()
 
-# Create your tests here.
+    def test_added_application_is_counted(self):
+        response = self.client.post(reverse("admin:applications_visaapplication_add"), {
+            "applicant": self.applicant.pk,
+            "visa_type": self.visa_type.pk,
+            "nationality": "NG",
+            "purpose_of_travel": "Tourism",
+            "intended_entry_date": "2030-01-01",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(get_status_counts(), {ApplicationStatus.DRAFT: 1})
+        self.assertCountersMatch()
@@ -4,12 +4,14 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import FormView, View
 
 from apps.accounts.choices import UserRole
 from apps.accounts.mixins import RoleRequiredMixin
 from apps.applications.choices import ApplicationStatus
-from apps.applications.exceptions import InvalidStateTransition, RuleViolation
+from apps.applications.exceptions import InvalidStateTransition, RuleViolation, UploadError
 from apps.applications.forms import CreateApplicationForm
 from apps.applications.models import VisaApplication
 from apps.applications.selectors import (
@@ -17,12 +19,22 @@ from apps.applications.selectors import (
     get_application_audit_trail,
     get_application_with_documents,
 )
-from apps.applications.services import move_to_under_review, run_pre_screening, submit_application
+from apps.applications.services import (
+    create_application,
+    move_to_under_review,
+    run_pre_screening,
+    submit_application,
+)
 from apps.documents.forms import DocumentUploadForm
-from apps.documents.models import ApplicationDocument
-from apps.documents.services import get_document_summary
+from apps.documents.services import get_document_summary, save_application_document
+from apps.documents.uploadhandlers import ValidatingUploadHandler
+from apps.documents.validation import check_declared_size
 from apps.recommendations.services import get_recommendations
 
+# Allowance for multipart boundaries and the non-file fields when comparing the
+# request's Content-Length against a file size limit.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
 
 class ApplicantDashboardView(LoginRequiredMixin, RoleRequiredMixin, View):
     allowed_roles = [UserRole.APPLICANT]
@@ -44,13 +56,11 @@ class CreateApplicationView(LoginRequiredMixin, RoleRequiredMixin, FormView):
     form_class = CreateApplicationForm
 
     def form_valid(self, form):
-        app = form.save(commit=False)
-        app.applicant = self.request.user
-        app.status = ApplicationStatus.DRAFT
-        app.save()
+        app = create_application(form.save(commit=False), applicant=self.request.user)
         return redirect("applications:upload", pk=app.pk)
 
 
+@method_decorator(csrf_exempt, name="dispatch")
 class UploadDocumentsView(LoginRequiredMixin, RoleRequiredMixin, View):
     allowed_roles = [UserRole.APPLICANT]
     template_name = "applicant/upload_documents.html"
@@ -75,39 +85,55 @@ class UploadDocumentsView(LoginRequiredMixin, RoleRequiredMixin, View):
             "can_submit": app.status == ApplicationStatus.DRAFT,
         })
 
+    def _render_form(self, request, app, form, status=200):
+        return render(request, self.template_name, {
+            "application": app,
+            "form": form,
+            "doc_summary": get_document_summary(app),
+            "can_upload": True,
+            "can_submit": app.status == ApplicationStatus.DRAFT,
+        }, status=status)
+
     def post(self, request, pk):
+        # The validating handler must be installed before anything reads
+        # request.POST, so CSRF is enforced on _handle_upload instead of by the
+        # middleware (dispatch is csrf_exempt).
         app = self._get_owned(request, pk)
         if app is None:
             return render(request, "auth/access_denied.html", status=403)
         if app.status not in (ApplicationStatus.DRAFT, ApplicationStatus.PENDING_INFO):
             messages.error(request, "Documents cannot be changed at this stage.")
             return redirect("applications:upload", pk=pk)
+
+        # Declared body already over the limit: answer without reading any of it.
+        try:
+            check_declared_size(
+                int(request.META.get("CONTENT_LENGTH") or 0) - MULTIPART_OVERHEAD_BYTES,
+                request.GET.get("document_type"),
+            )
+        except UploadError as exc:
+            messages.error(request, str(exc))
+            return self._render_form(request, app, DocumentUploadForm(), status=413)
+
+        request.upload_handlers = [ValidatingUploadHandler(request)]
+        return self._handle_upload(request, app)
+
+    @method_decorator(csrf_protect)
+    def _handle_upload(self, request, app):
         form = DocumentUploadForm(request.POST, request.FILES)
-        if not form.is_valid():
-            return render(request, self.template_name, {
-                "application": app,
-                "form": form,
-                "doc_summary": get_document_summary(app),
-                "can_upload": True,
-                "can_submit": app.status == ApplicationStatus.DRAFT,
-            })
-        from django.conf import settings as _s
-        from pathlib import Path
-        uploaded = request.FILES["file"]
-        upload_dir = Path(_s.MEDIA_ROOT) / "documents" / str(app.pk)
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        rel_path = f"documents/{app.pk}/{uploaded.name}"
-        with open(Path(_s.MEDIA_ROOT) / rel_path, "wb+") as dest:
-            for chunk in uploaded.chunks():
-                dest.write(chunk)
+        valid = form.is_valid()
+        rejection = getattr(request, "upload_rejection", None)
+        if rejection:
+            # A rejected file never reaches request.FILES; report why instead
+            # of the generic "required" error.
+            form.errors["file"] = form.error_class([rejection])
+            valid = False
+        if not valid:
+            return self._render_form(request, app, form)
         doc_type = form.cleaned_data["document_type"]
-        ApplicationDocument.objects.update_or_create(
-            application=app,
-            document_type=doc_type,
-            defaults={"file_path": rel_path, "verified": False},
-        )
+        save_application_document(app, doc_type, request.FILES["file"])
         messages.success(request, f"Document '{doc_type}' uploaded.")
-        return redirect("applications:upload", pk=pk)
+        return redirect("applications:upload", pk=app.pk)
 
 
 class SubmitApplicationView(LoginRequiredMixin, RoleRequiredMixin, View):
@@ -208,9 +234,6 @@ class ReApplicationView(LoginRequiredMixin, RoleRequiredMixin, FormView):
             VisaApplication, pk=self.previous_pk, applicant=self.request.user,
             status=ApplicationStatus.REJECTED,
         )
-        new_app = form.save(commit=False)
-        new_app.applicant = self.request.user
-        new_app.status = ApplicationStatus.DRAFT
-        new_app.save()
+        new_app = create_application(form.save(commit=False), applicant=self.request.user)
         messages.success(self.request, "New application created. Please upload your documents.")
         return redirect("applications:upload", pk=new_app.pk)
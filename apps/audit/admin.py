@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import ApplicationAuditLog
+from .models import ApplicationAuditLog, AuditCheckpoint, AuditOutbox
 
 
 @admin.register(ApplicationAuditLog)
@@ -33,12 +33,14 @@ class ApplicationAuditLogAdmin(admin.ModelAdmin):
         "actor",
         "reason",
         "timestamp",
+        "row_hash",
     )
 
     fieldsets = (
         ("Transition",  {"fields": ("id", "application", "previous_status", "new_status")}),
         ("Actor",       {"fields": ("actor", "reason")}),
         ("Timestamps",  {"fields": ("timestamp",)}),
+        ("Integrity",   {"fields": ("row_hash",)}),
     )
 
     def has_add_permission(self, request) -> bool:
@@ -52,3 +54,41 @@ class ApplicationAuditLogAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None) -> bool:
         # Deleting audit logs would violate the integrity of the audit trail.
         return False
+
+
+@admin.register(AuditOutbox)
+class AuditOutboxAdmin(admin.ModelAdmin):
+    """
+    Read-only view of audit events not yet moved into ApplicationAuditLog by
+    flush_audit_outbox; a growing backlog means the worker is not running.
+    """
+
+    list_display = ("id", "application", "previous_status", "new_status", "actor", "timestamp")
+    ordering = ("id",)
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        # Removing an entry here would drop it from the audit trail for good.
+        return False
+
+
+@admin.register(AuditCheckpoint)
+class AuditCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("id", "last_log_id", "rows_verified", "created_at")
+    ordering = ("-last_log_id",)
+    readonly_fields = ("last_log_id", "row_hash", "rows_verified", "created_at", "signature")
+
+    def has_add_permission(self, request) -> bool:
+        # Only verify_audit_chain records checkpoints.
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        return False
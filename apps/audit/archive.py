@@ -0,0 +1,208 @@
+import datetime
+import functools
+import gzip
+import json
+import mmap
+import os
+import struct
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+from apps.audit.models import ApplicationAuditLog
+from apps.audit.partitions import archive_table, archived_months
+
+# Segment layout: one gzip member per application, members sorted by
+# application_id, so a segment is still a plain .jsonl.gz to zcat/gunzip.
+# The sidecar index holds one fixed-width record per application, in the
+# same order: 16-byte UUID, 8-byte member offset, 4-byte member length.
+INDEX_RECORD = struct.Struct(">16sQI")
+EXPORT_CHUNK_SIZE = 5000
+
+
+@dataclass
+class SegmentReport:
+    month: datetime.date
+    rows: int = 0
+    applications: int = 0
+    bytes_written: int = 0
+
+
+def archive_dir() -> Path:
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def segment_paths(month: datetime.date) -> tuple[Path, Path]:
+    stem = archive_dir() / f"audit-{month:%Y%m}"
+    return stem.with_suffix(".jsonl.gz"), stem.with_suffix(".idx")
+
+
+def segment_months() -> list[datetime.date]:
+    months = []
+    for path in archive_dir().glob("audit-??????.idx"):
+        stamp = path.stem[len("audit-"):]
+        months.append(datetime.date(int(stamp[:4]), int(stamp[4:]), 1))
+    return sorted(months)
+
+
+def _iter_archived_rows(month: datetime.date):
+    # Keyset pages over (application_id, timestamp, id), the order of the
+    # archive table's copy of idx_audit_app_timestamp. raw() applies the
+    # model's converters, so ids come back as UUIDs and timestamps aware.
+    table = archive_table(month)
+    columns = "id, application_id, previous_status, new_status, actor_id, reason, timestamp, row_hash"
+    after = None
+    while True:
+        where, params = "", []
+        if after is not None:
+            application_id, timestamp, log_id = after
+            where = (
+                "WHERE application_id > %s OR (application_id = %s AND "
+                "(timestamp > %s OR (timestamp = %s AND id > %s)))"
+            )
+            stamp = connection.ops.adapt_datetimefield_value(timestamp)
+            params = [application_id.hex, application_id.hex, stamp, stamp, log_id]
+        rows = list(ApplicationAuditLog.objects.raw(
+            f"SELECT {columns} FROM {table} {where} "
+            f"ORDER BY application_id, timestamp, id LIMIT {EXPORT_CHUNK_SIZE}",
+            params,
+        ))
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1]
+        after = last.application_id, last.timestamp, last.pk
+
+
+def _row_json(log: ApplicationAuditLog) -> bytes:
+    return (json.dumps({
+        "id": log.pk,
+        "application_id": log.application_id.hex,
+        "previous_status": log.previous_status,
+        "new_status": log.new_status,
+        "actor_id": None if log.actor_id is None else str(log.actor_id),
+        "reason": log.reason,
+        "timestamp": log.timestamp.isoformat(),
+        "row_hash": log.row_hash,
+    }) + "\n").encode()
+
+
+def write_segment(month: datetime.date) -> SegmentReport:
+    """
+    Export the detached month's archive table to a segment and its index.
+    Both are written under temporary names and renamed into place read-only,
+    so a segment either exists complete or not at all. Memory holds one
+    application's rows at a time.
+    """
+    segment_path, index_path = segment_paths(month)
+    if segment_path.exists() or index_path.exists():
+        raise FileExistsError(f"Segment for {month:%Y-%m} already exists; segments are immutable.")
+    segment_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_segment = segment_path.with_name(segment_path.name + ".tmp")
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+
+    report = SegmentReport(month)
+    with open(tmp_segment, "wb") as segment, open(tmp_index, "wb") as index:
+        def flush(application_id, lines):
+            member = gzip.compress(b"".join(lines), mtime=0)
+            index.write(INDEX_RECORD.pack(application_id.bytes, segment.tell(), len(member)))
+            segment.write(member)
+            report.applications += 1
+
+        current, lines = None, []
+        for log in _iter_archived_rows(month):
+            if log.application_id != current:
+                if lines:
+                    flush(current, lines)
+                current, lines = log.application_id, []
+            lines.append(_row_json(log))
+            report.rows += 1
+        if lines:
+            flush(current, lines)
+        report.bytes_written = segment.tell()
+        for fh in (segment, index):
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    for tmp, final in ((tmp_segment, segment_path), (tmp_index, index_path)):
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, final)
+    return report
+
+
+def drop_archive_table(month: datetime.date) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {archive_table(month)}")
+
+
+@functools.lru_cache(maxsize=128)
+def _open_segment(month: datetime.date):
+    # Segments never change once written, so the mappings are kept open.
+    segment_path, index_path = segment_paths(month)
+    with open(segment_path, "rb") as segment, open(index_path, "rb") as index:
+        data = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) if segment_path.stat().st_size else b""
+        entries = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ) if index_path.stat().st_size else b""
+    return data, entries
+
+
+def _find_member(entries, key: bytes) -> tuple[int, int] | None:
+    # Binary search straight over the mapped index; only the pages it lands
+    # on are ever read from disk.
+    lo, hi = 0, len(entries) // INDEX_RECORD.size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        record_key, offset, length = INDEX_RECORD.unpack_from(entries, mid * INDEX_RECORD.size)
+        if record_key == key:
+            return offset, length
+        if record_key < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return None
+
+
+def _read_detached_month(month: datetime.date, application_id: uuid.UUID) -> list[dict]:
+    # A detached month not yet exported: read its archive table directly,
+    # in the same shape as a segment line.
+    rows = ApplicationAuditLog.objects.raw(
+        f"SELECT id, application_id, previous_status, new_status, actor_id, reason, timestamp, row_hash "
+        f"FROM {archive_table(month)} WHERE application_id = %s ORDER BY timestamp, id",
+        [application_id.hex],
+    )
+    events = []
+    for log in rows:
+        event = json.loads(_row_json(log))
+        event["timestamp"] = log.timestamp
+        events.append(event)
+    return events
+
+
+def read_archived_events(application_id: uuid.UUID, since: datetime.date | None = None) -> list[dict]:
+    """
+    Archived audit rows of one application, oldest first, from every
+    detached month from the month of since onwards (all when None). Months
+    with a segment are read from it; months detached but not yet exported
+    are read from their archive table, so they never drop out of the trail.
+    """
+    events = []
+    key = application_id.bytes
+    exported = set(segment_months())
+    for month in sorted(exported | set(archived_months())):
+        if since is not None and month < datetime.date(since.year, since.month, 1):
+            continue
+        if month not in exported:
+            events.extend(_read_detached_month(month, application_id))
+            continue
+        data, entries = _open_segment(month)
+        found = _find_member(entries, key)
+        if found is None:
+            continue
+        offset, length = found
+        for line in gzip.decompress(data[offset:offset + length]).splitlines():
+            event = json.loads(line)
+            event["timestamp"] = datetime.datetime.fromisoformat(event["timestamp"])
+            events.append(event)
+    return events
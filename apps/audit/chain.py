@@ -0,0 +1,177 @@
+import datetime
+import hashlib
+import hmac
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from apps.audit.models import ApplicationAuditLog, AuditCheckpoint
+
+GENESIS_HASH = "0" * 64
+# Columns that feed a row's hash, in the order they are read for verification.
+CHAIN_FIELDS = ("application_id", "previous_status", "new_status", "actor_id", "reason", "timestamp")
+
+
+def _canonical_timestamp(value: datetime.datetime) -> str:
+    return value.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def row_digest(prev_hash: str, application_id, previous_status: str, new_status: str, actor_id, reason: str,
+               timestamp: datetime.datetime) -> str:
+    # Length-prefixed fields, so no two different rows can encode the same.
+    parts = [
+        prev_hash,
+        application_id.hex,
+        previous_status,
+        new_status,
+        "" if actor_id is None else str(actor_id),
+        reason,
+        _canonical_timestamp(timestamp),
+    ]
+    encoded = b"".join(f"{len(p.encode())}:".encode() + p.encode() for p in parts)
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def chain_tail_hash() -> str:
+    """
+    Hash the next appended row chains onto: the newest row's, or the newest
+    checkpoint's once every row has been detached. Call inside the appending
+    transaction; the newest row stays locked until it commits, which keeps
+    concurrent appends in single file.
+    """
+    tail = ApplicationAuditLog.objects.select_for_update().order_by("-id").values_list("row_hash", flat=True).first()
+    if tail:
+        return tail
+    checkpoint = AuditCheckpoint.objects.order_by("-last_log_id").values_list("row_hash", flat=True).first()
+    return checkpoint or GENESIS_HASH
+
+
+def _checkpoint_message(last_log_id: int, row_hash: str, created_at: datetime.datetime) -> bytes:
+    return f"{last_log_id}:{row_hash}:{_canonical_timestamp(created_at)}".encode()
+
+
+def sign_checkpoint(last_log_id: int, row_hash: str, created_at: datetime.datetime) -> str:
+    secret = settings.AUDIT_CHECKPOINT_SECRET or settings.SECRET_KEY
+    return hmac.new(secret.encode(), _checkpoint_message(last_log_id, row_hash, created_at), hashlib.sha256).hexdigest()
+
+
+def checkpoint_is_authentic(checkpoint: AuditCheckpoint) -> bool:
+    expected = sign_checkpoint(checkpoint.last_log_id, checkpoint.row_hash, checkpoint.created_at)
+    return hmac.compare_digest(expected, checkpoint.signature)
+
+
+def create_checkpoint(last_log_id: int, row_hash: str, rows_verified: int) -> AuditCheckpoint:
+    checkpoint = AuditCheckpoint(last_log_id=last_log_id, row_hash=row_hash, rows_verified=rows_verified)
+    checkpoint.signature = sign_checkpoint(last_log_id, row_hash, checkpoint.created_at)
+    checkpoint.save()
+    return checkpoint
+
+
+class ChainOrderError(Exception):
+    """Rows on both sides of a detach boundary interleave in chain (id) order."""
+
+
+def checkpoint_before_detach(before: datetime.datetime) -> AuditCheckpoint | None:
+    """
+    Record where the chain stands at the highest id among the rows older
+    than before, so that once those rows are detached, verification of what
+    remains can start from a signed hash instead of from genesis.
+
+    Months are detached by timestamp but chained by id. If a row that stays
+    has a lower id than one that goes (an event filed late across the month
+    boundary), no single hash can stand in for the detached rows, so this
+    raises ChainOrderError instead of writing a checkpoint.
+    """
+    boundary = (
+        ApplicationAuditLog.objects.filter(timestamp__lt=before)
+        .order_by("-id")
+        .values_list("id", "row_hash")
+        .first()
+    )
+    if boundary is None or not boundary[1]:
+        return None
+    straddler = (
+        ApplicationAuditLog.objects.filter(timestamp__gte=before, id__lt=boundary[0])
+        .order_by("id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    if straddler is not None:
+        raise ChainOrderError(
+            f"Audit row {straddler} is dated on or after {before:%Y-%m-%d} but precedes row "
+            f"{boundary[0]} in the chain; detaching by date would split the chain."
+        )
+    return create_checkpoint(boundary[0], boundary[1], rows_verified=0)
+
+
+def starting_point() -> tuple[int, str]:
+    """
+    (after_id, prev_hash) for verifying from the oldest row still in the
+    table: genesis, or the newest checkpoint below it if older rows have
+    been detached.
+    """
+    first_id = ApplicationAuditLog.objects.order_by("id").values_list("id", flat=True).first()
+    if first_id is None:
+        return 0, GENESIS_HASH
+    return first_id - 1, _detached_hash_before(first_id)
+
+
+def _detached_hash_before(log_id: int) -> str:
+    anchor = AuditCheckpoint.objects.filter(last_log_id__lt=log_id).order_by("-last_log_id", "-id").first()
+    if anchor is None or not checkpoint_is_authentic(anchor):
+        return GENESIS_HASH
+    return anchor.row_hash
+
+
+def anchor_is_intact(checkpoint: AuditCheckpoint) -> bool:
+    """
+    Rehash the checkpoint's own row from its predecessor's stored hash. True
+    when it still yields the signed hash, or when the row has been detached.
+    """
+    rows = ApplicationAuditLog.objects.values_list("id", *CHAIN_FIELDS, "row_hash")
+    anchor = rows.filter(id=checkpoint.last_log_id).first()
+    if anchor is None:
+        return True
+    _, *fields, stored = anchor
+    prev_hash = (
+        rows.filter(id__lt=checkpoint.last_log_id).order_by("-id").values_list("row_hash", flat=True).first()
+        or _detached_hash_before(checkpoint.last_log_id)
+    )
+    return stored == checkpoint.row_hash and row_digest(prev_hash, *fields) == checkpoint.row_hash
+
+
+@dataclass
+class ChainReport:
+    start_id: int
+    rows: int = 0
+    last_id: int = 0
+    last_hash: str = GENESIS_HASH
+    broken_at: int | None = None    # id of the first row whose hash does not match
+    problem: str = ""
+
+
+def verify_chain(after_id: int = 0, prev_hash: str = GENESIS_HASH, chunk_size: int = 10000, on_chunk=None) -> ChainReport:
+    """
+    Recompute the chain for every row with id > after_id, starting from
+    prev_hash, in keyset chunks on the primary key; memory holds one chunk.
+    Stops at the first row whose stored hash differs from the recomputed one.
+    """
+    report = ChainReport(start_id=after_id, last_id=after_id, last_hash=prev_hash)
+    rows = ApplicationAuditLog.objects.order_by("id").values_list("id", *CHAIN_FIELDS, "row_hash")
+    while True:
+        chunk = list(rows.filter(id__gt=report.last_id)[:chunk_size])
+        if not chunk:
+            return report
+        for log_id, *fields, stored in chunk:
+            expected = row_digest(report.last_hash, *fields)
+            if not hmac.compare_digest(expected, stored):
+                report.broken_at = log_id
+                report.problem = (
+                    "row hash missing" if not stored
+                    else f"row or a predecessor was altered, deleted or reordered after id {report.last_id}"
+                )
+                return report
+            report.rows += 1
+            report.last_id, report.last_hash = log_id, stored
+        if on_chunk is not None:
+            on_chunk(report)
@@ -0,0 +1,54 @@
+import string
+
+from django import forms
+
+from apps.applications.choices import ApplicationStatus
+
+HEX_DIGITS = frozenset(string.hexdigits)
+# Shorter prefixes match too large a slice of the index to be worth a range scan.
+MIN_APPLICATION_PREFIX = 4
+
+
+class AuditSearchForm(forms.Form):
+    application = forms.CharField(
+        required=False,
+        max_length=36,
+        label="Application ID",
+        widget=forms.TextInput(attrs={"placeholder": "Full ID or first characters…"}),
+    )
+    actor = forms.EmailField(
+        required=False,
+        label="Actor email",
+        widget=forms.EmailInput(attrs={"placeholder": "officer@example.com"}),
+    )
+    status = forms.ChoiceField(
+        required=False,
+        choices=[("", "Any status")] + list(ApplicationStatus.choices),
+        label="New status",
+    )
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    text = forms.CharField(
+        required=False,
+        max_length=200,
+        label="Reason contains",
+        widget=forms.TextInput(attrs={"placeholder": "Words in the reason…"}),
+    )
+
+    def clean_application(self) -> str:
+        # Normalised to bare lowercase hex, the form UUIDs are stored in.
+        value = self.cleaned_data["application"].strip().replace("-", "").lower()
+        if not value:
+            return ""
+        if not set(value) <= HEX_DIGITS:
+            raise forms.ValidationError("Application IDs only contain hexadecimal digits.")
+        if len(value) < MIN_APPLICATION_PREFIX:
+            raise forms.ValidationError(f"Enter at least {MIN_APPLICATION_PREFIX} characters of the ID.")
+        return value
+
+    def clean(self):
+        cleaned = super().clean()
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            self.add_error("date_to", "End date is before the start date.")
+        return cleaned
@@ -0,0 +1,71 @@
+import datetime
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template.defaultfilters import filesizeformat
+
+from apps.audit.archive import drop_archive_table, segment_paths, write_segment
+from apps.audit.partitions import archive_table, archived_months
+
+
+def _parse_month(value: str) -> datetime.date:
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f"Invalid month {value!r}; expected YYYY-MM.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Export detached audit months (see maintain_audit_partitions) to "
+        "immutable gzip JSONL segments with an application index, and "
+        "optionally drop their archive tables from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            help="Only this month (YYYY-MM); default is every detached month.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop each archive table once its segment holds every row.",
+        )
+
+    def handle(self, *args, **options):
+        months = archived_months()
+        if options["month"]:
+            month = _parse_month(options["month"])
+            if month not in months:
+                raise CommandError(f"No detached archive table for {month:%Y-%m}.")
+            months = [month]
+
+        for month in months:
+            segment_path, _ = segment_paths(month)
+            if segment_path.exists():
+                self.stdout.write(f"{month:%Y-%m}: segment already written.")
+            else:
+                report = write_segment(month)
+                self.stdout.write(
+                    f"{month:%Y-%m}: {report.rows} row(s) for {report.applications} application(s), "
+                    f"{filesizeformat(report.bytes_written)}."
+                )
+            if options["drop"]:
+                self._drop_if_complete(month, segment_path)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(months)} month(s)."))
+
+    def _drop_if_complete(self, month, segment_path):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {archive_table(month)}")
+            expected = cursor.fetchone()[0]
+        with gzip.open(segment_path, "rb") as segment:
+            written = sum(1 for _ in segment)
+        if written != expected:
+            raise CommandError(
+                f"{month:%Y-%m}: segment has {written} row(s) but the archive table has {expected}; not dropping."
+            )
+        drop_archive_table(month)
+        self.stdout.write(f"{month:%Y-%m}: dropped {archive_table(month)}.")
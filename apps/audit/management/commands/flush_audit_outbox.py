@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.audit.services import flush_audit_outbox
+
+
+class Command(BaseCommand):
+    help = "Move audit events from the outbox into the audit log table in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running as a worker, polling for new events.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds to wait between polls when the outbox is empty (with --loop).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Events moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        flushed = 0
+        while True:
+            count = flush_audit_outbox(batch_size=options["batch_size"])
+            flushed += count
+            if count:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} audit event(s)."))
@@ -0,0 +1,81 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.audit.chain import ChainOrderError, checkpoint_before_detach
+from apps.audit.partitions import add_months, get_partitioning, month_start, partition_name
+
+
+def _utc_midnight(day: datetime.date) -> datetime.datetime:
+    return datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-create monthly audit log partitions ahead of time and detach "
+        "months past the retention window into standalone archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.AUDIT_PARTITION_MONTHS_AHEAD,
+            help="Keep partitions for this many future months.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.AUDIT_HOT_RETENTION_MONTHS,
+            help="Months kept attached, the current one included; older ones are detached.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would change.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retain_months"] < 1:
+            raise CommandError("--retain-months must be at least 1.")
+        try:
+            partitioning = get_partitioning()
+        except NotImplementedError as exc:
+            raise CommandError(str(exc))
+
+        current = month_start(timezone.now().date())
+        partitions = partitioning.partitions()
+        months = [p.month for p in partitions if p.month is not None]
+
+        # RANGE partitions can only be split off the top, so fill every month
+        # from the newest existing one up to the horizon.
+        target = add_months(current, options["ahead"])
+        month = add_months(max(months), 1) if months else current
+        to_create = []
+        while month <= target:
+            to_create.append(month)
+            month = add_months(month, 1)
+
+        cutoff = add_months(current, 1 - options["retain_months"])
+        to_detach = [p for p in partitions if p.month is not None and p.month < cutoff]
+
+        for month in to_create:
+            self.stdout.write(f"{'Would create' if options['dry_run'] else 'Creating'} {partition_name(month)}")
+            if not options["dry_run"]:
+                partitioning.create(month)
+        for partition in to_detach:
+            if options["dry_run"]:
+                self.stdout.write(f"Would detach {partition.name} (~{partition.rows} rows)")
+                continue
+            try:
+                checkpoint_before_detach(_utc_midnight(add_months(partition.month, 1)))
+            except ChainOrderError as exc:
+                raise CommandError(f"Not detaching {partition.name}: {exc}")
+            table = partitioning.detach(partition.month)
+            self.stdout.write(f"Detached {partition.name} (~{partition.rows} rows) into {table}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(to_create)} partition(s) created, {len(to_detach)} detached."
+        ))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.audit.chain import (
+    anchor_is_intact,
+    checkpoint_is_authentic,
+    create_checkpoint,
+    starting_point,
+    verify_chain,
+)
+from apps.audit.models import AuditCheckpoint
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify the audit log hash chain from the latest signed checkpoint "
+        "and record a new checkpoint at the end. Exits non-zero if the chain "
+        "or a checkpoint has been tampered with. Rows before the checkpoint "
+        "are only rehashed with --full."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rehash from the first row instead of the latest checkpoint.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Rows read per query.",
+        )
+        parser.add_argument(
+            "--no-checkpoint",
+            action="store_true",
+            help="Verify only; do not record a new checkpoint.",
+        )
+
+    def handle(self, *args, **options):
+        # Genesis, or the checkpoint recorded when older months were detached.
+        after_id, prev_hash = starting_point()
+        checkpoint = None if options["full"] else AuditCheckpoint.objects.order_by("-last_log_id", "-id").first()
+        if checkpoint is not None and checkpoint.last_log_id > after_id:
+            if not checkpoint_is_authentic(checkpoint):
+                raise CommandError(f"Checkpoint {checkpoint.pk} has an invalid signature.")
+            if not anchor_is_intact(checkpoint):
+                raise CommandError(f"Audit row {checkpoint.last_log_id} no longer matches checkpoint {checkpoint.pk}.")
+            after_id, prev_hash = checkpoint.last_log_id, checkpoint.row_hash
+            self.stdout.write(f"Resuming from checkpoint {checkpoint.pk} at row {after_id}.")
+
+        report = verify_chain(
+            after_id=after_id,
+            prev_hash=prev_hash,
+            chunk_size=options["chunk_size"],
+            on_chunk=lambda r: self.stdout.write(f"  verified {r.rows} row(s), up to id {r.last_id}"),
+        )
+        if report.broken_at is not None:
+            raise CommandError(
+                f"Audit chain broken at row {report.broken_at}: {report.problem}. "
+                f"{report.rows} row(s) after id {report.start_id} verified before the break."
+            )
+
+        if report.rows and not options["no_checkpoint"]:
+            new = create_checkpoint(report.last_id, report.last_hash, report.rows)
+            self.stdout.write(f"Recorded checkpoint {new.pk} at row {new.last_log_id}.")
+        self.stdout.write(self.style.SUCCESS(f"Audit chain intact: {report.rows} new row(s) verified."))
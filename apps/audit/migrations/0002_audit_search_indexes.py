@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+# Full-text search over reason. Django has no portable full-text index, so it
+# is created per backend: an InnoDB FULLTEXT index on MySQL, and on SQLite an
+# external-content FTS5 table kept in sync by triggers (audit rows are
+# insert-only, but deletes are mirrored so a rebuild never drifts).
+MYSQL_FORWARD = [
+    "CREATE FULLTEXT INDEX ftx_audit_reason ON audit_applicationauditlog (reason)",
+]
+MYSQL_REVERSE = [
+    "DROP INDEX ftx_audit_reason ON audit_applicationauditlog",
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE audit_reason_fts USING fts5("
+    "reason, content='audit_applicationauditlog', content_rowid='id')",
+    "CREATE TRIGGER audit_reason_fts_ai AFTER INSERT ON audit_applicationauditlog BEGIN "
+    "INSERT INTO audit_reason_fts(rowid, reason) VALUES (new.id, new.reason); END",
+    "CREATE TRIGGER audit_reason_fts_ad AFTER DELETE ON audit_applicationauditlog BEGIN "
+    "INSERT INTO audit_reason_fts(audit_reason_fts, rowid, reason) VALUES ('delete', old.id, old.reason); END",
+    "INSERT INTO audit_reason_fts(audit_reason_fts) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS audit_reason_fts_ad",
+    "DROP TRIGGER IF EXISTS audit_reason_fts_ai",
+    "DROP TABLE IF EXISTS audit_reason_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicationauditlog',
+            index=models.Index(fields=['new_status', 'timestamp'], name='idx_audit_status_timestamp'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationauditlog',
+            index=models.Index(fields=['timestamp'], name='idx_audit_timestamp'),
+        ),
+        migrations.RunPython(
+            _run({"mysql": MYSQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"mysql": MYSQL_REVERSE, "sqlite": SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,45 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_document_masks'),
+        ('audit', '0002_audit_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # auto_now_add -> default: Python-side only, so skip the DDL (on SQLite
+        # a table remake, which would drop the reason FTS triggers).
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='applicationauditlog',
+                    name='timestamp',
+                    field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuditOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_status', models.CharField(blank=True, default='', max_length=20)),
+                ('new_status', models.CharField(max_length=20)),
+                ('reason', models.TextField(blank=True, default='')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='applications.visaapplication')),
+            ],
+            options={
+                'verbose_name': 'Audit Outbox Entry',
+                'verbose_name_plural': 'Audit Outbox',
+                'db_table': 'audit_outbox',
+                'indexes': [models.Index(fields=['application', 'id'], name='idx_outbox_app_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,119 @@
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# MySQL only: RANGE-partition audit_applicationauditlog by month. Partitioned
+# InnoDB tables cannot have foreign keys or FULLTEXT indexes, and every unique
+# key must include the partitioning column, so this migration
+#   - drops the two FK constraints (PROTECT / SET_NULL stay enforced by Django),
+#   - moves the reason FULLTEXT index to audit_reason_fulltext, fed by trigger,
+#   - widens the primary key to (id, timestamp).
+# Rebuilding the table copies every row; run it in a maintenance window.
+# SQLite has nothing to convert: partitions.SQLitePartitions emulates it.
+TABLE = "audit_applicationauditlog"
+FULLTEXT_TABLE = "audit_reason_fulltext"
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_clauses(first_month, last_month):
+    clauses = []
+    month = first_month
+    while month <= last_month:
+        end = _add_months(month, 1)
+        clauses.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{end.isoformat()}'))")
+        month = end
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ", ".join(clauses)
+
+
+def partition_forward(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_TYPE = 'FOREIGN KEY'",
+            [TABLE],
+        )
+        foreign_keys = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT MIN(timestamp) FROM {TABLE}")
+        oldest = cursor.fetchone()[0]
+
+    for name in foreign_keys:
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP FOREIGN KEY {name}")
+
+    schema_editor.execute(f"DROP INDEX ftx_audit_reason ON {TABLE}")
+    schema_editor.execute(
+        f"CREATE TABLE {FULLTEXT_TABLE} ("
+        "log_id BIGINT NOT NULL PRIMARY KEY, "
+        "reason LONGTEXT NOT NULL, "
+        "FULLTEXT KEY ftx_audit_reason (reason)"
+        ") ENGINE=InnoDB"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FULLTEXT_TABLE} (log_id, reason) SELECT id, reason FROM {TABLE} WHERE reason <> ''"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER audit_reason_fulltext_ai AFTER INSERT ON {TABLE} FOR EACH ROW "
+        f"INSERT INTO {FULLTEXT_TABLE} (log_id, reason) SELECT NEW.id, NEW.reason FROM DUAL WHERE NEW.reason <> ''"
+    )
+
+    this_month = datetime.date.today().replace(day=1)
+    first_month = oldest.date().replace(day=1) if oldest else this_month
+    schema_editor.execute(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)")
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(timestamp)) ("
+        f"{_partition_clauses(first_month, _add_months(this_month, MONTHS_AHEAD))})"
+    )
+
+
+def partition_reverse(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(f"ALTER TABLE {TABLE} REMOVE PARTITIONING")
+    schema_editor.execute(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+    schema_editor.execute("DROP TRIGGER IF EXISTS audit_reason_fulltext_ai")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FULLTEXT_TABLE}")
+    schema_editor.execute(f"CREATE FULLTEXT INDEX ftx_audit_reason ON {TABLE} (reason)")
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE} "
+        "ADD CONSTRAINT audit_log_application_id_fk FOREIGN KEY (application_id) "
+        "REFERENCES applications_visaapplication (id), "
+        "ADD CONSTRAINT audit_log_actor_id_fk FOREIGN KEY (actor_id) "
+        "REFERENCES accounts_user (id)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0003_audit_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The constraints themselves are dropped by partition_forward; on
+        # SQLite an AlterField would remake the table and lose the FTS triggers.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='applicationauditlog',
+                    name='application',
+                    field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='audit_logs', to='applications.visaapplication'),
+                ),
+                migrations.AlterField(
+                    model_name='applicationauditlog',
+                    name='actor',
+                    field=models.ForeignKey(blank=True, db_constraint=False, help_text='The user who triggered the transition, or NULL for SYSTEM actions.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_actions', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.RunPython(partition_forward, partition_reverse),
+    ]
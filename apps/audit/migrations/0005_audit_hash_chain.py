@@ -0,0 +1,71 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def chain_existing_rows(apps, schema_editor):
+    # Seal the history written before the chain existed, oldest id first.
+    from apps.audit.chain import CHAIN_FIELDS, GENESIS_HASH, row_digest
+
+    ApplicationAuditLog = apps.get_model("audit", "ApplicationAuditLog")
+    prev_hash, last_id = GENESIS_HASH, 0
+    while True:
+        chunk = list(
+            ApplicationAuditLog.objects.filter(id__gt=last_id).order_by("id").only("id", *CHAIN_FIELDS)[:5000]
+        )
+        if not chunk:
+            break
+        for log in chunk:
+            prev_hash = log.row_hash = row_digest(prev_hash, *(getattr(log, f) for f in CHAIN_FIELDS))
+        ApplicationAuditLog.objects.bulk_update(chunk, ["row_hash"], batch_size=1000)
+        last_id = chunk[-1].id
+
+
+def restore_sqlite_fts_triggers(apps, schema_editor):
+    # SQLite adds a column with a default by remaking the table, which drops
+    # the reason FTS triggers from migration 0002; put them back.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in [
+        "DROP TRIGGER IF EXISTS audit_reason_fts_ai",
+        "DROP TRIGGER IF EXISTS audit_reason_fts_ad",
+        "CREATE TRIGGER audit_reason_fts_ai AFTER INSERT ON audit_applicationauditlog BEGIN "
+        "INSERT INTO audit_reason_fts(rowid, reason) VALUES (new.id, new.reason); END",
+        "CREATE TRIGGER audit_reason_fts_ad AFTER DELETE ON audit_applicationauditlog BEGIN "
+        "INSERT INTO audit_reason_fts(audit_reason_fts, rowid, reason) VALUES ('delete', old.id, old.reason); END",
+        "INSERT INTO audit_reason_fts(audit_reason_fts) VALUES ('rebuild')",
+    ]:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_partition_audit_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationauditlog',
+            name='row_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(restore_sqlite_fts_triggers, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='AuditCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_log_id', models.BigIntegerField()),
+                ('row_hash', models.CharField(max_length=64)),
+                ('rows_verified', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('signature', models.CharField(max_length=64)),
+            ],
+            options={
+                'verbose_name': 'Audit Checkpoint',
+                'verbose_name_plural': 'Audit Checkpoints',
+                'db_table': 'audit_checkpoint',
+                'indexes': [models.Index(fields=['last_log_id'], name='idx_checkpoint_last_log')],
+            },
+        ),
+        migrations.RunPython(chain_existing_rows, migrations.RunPython.noop),
+    ]
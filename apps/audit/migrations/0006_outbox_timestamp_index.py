@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0005_audit_hash_chain'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditoutbox',
+            index=models.Index(fields=['timestamp', 'id'], name='idx_outbox_timestamp_id'),
+        ),
+    ]
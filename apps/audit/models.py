@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class ApplicationAuditLog(models.Model):
@@ -8,6 +9,7 @@ class ApplicationAuditLog(models.Model):
         on_delete=models.PROTECT,   # PROTECT: audit trail must never be silently removed
         related_name="audit_logs",
         db_index=True,
+        db_constraint=False,        # partitioned on MySQL, which rules out foreign keys
     )
     previous_status = models.CharField(
         max_length=20,
@@ -23,13 +25,18 @@ class ApplicationAuditLog(models.Model):
         on_delete=models.SET_NULL,  # SET_NULL: log survives even if the user is deleted
         related_name="audit_actions",
         db_index=True,
+        db_constraint=False,
         help_text="The user who triggered the transition, or NULL for SYSTEM actions.",
     )
     reason = models.TextField(
         blank=True,
         default="",
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happened, not when the outbox flush inserted the row.
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+    # SHA-256 over the previous row's row_hash (in id order) and this row's
+    # content; see chain.py. Editing or deleting any row breaks every later hash.
+    row_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
 
     class Meta:
         db_table = "audit_applicationauditlog"
@@ -44,7 +51,20 @@ class ApplicationAuditLog(models.Model):
                 fields=["actor", "timestamp"],
                 name="idx_audit_actor_timestamp",
             ),
+            models.Index(
+                fields=["new_status", "timestamp"],
+                name="idx_audit_status_timestamp",
+            ),
+            # Unfiltered and date-range-only searches walk this backwards.
+            models.Index(
+                fields=["timestamp"],
+                name="idx_audit_timestamp",
+            ),
         ]
+        # reason is also full-text indexed through a trigger-fed shadow table
+        # (MySQL FULLTEXT, SQLite FTS5); see migrations 0002/0004 and selectors.
+        # On MySQL the table is RANGE-partitioned by month on timestamp, with
+        # primary key (id, timestamp); see partitions.py.
 
     def save(self, *args, **kwargs) -> None:
         # Overriding save() to block updates: if pk is set the row already exists.
@@ -66,3 +86,72 @@ class ApplicationAuditLog(models.Model):
             f"{self.previous_status!r} → {self.new_status!r}"
         )
 
+
+class AuditCheckpoint(models.Model):
+    """
+    Signed record that the hash chain verified up to last_log_id ended in
+    row_hash. verify_audit_chain resumes from the latest checkpoint, so a
+    nightly run only rehashes the rows added since the last one.
+    """
+
+    last_log_id = models.BigIntegerField()
+    row_hash = models.CharField(max_length=64)
+    rows_verified = models.BigIntegerField(default=0)  # rows checked since the previous checkpoint
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # HMAC with AUDIT_CHECKPOINT_SECRET: database access alone cannot forge one.
+    signature = models.CharField(max_length=64)
+
+    class Meta:
+        db_table = "audit_checkpoint"
+        verbose_name = "Audit Checkpoint"
+        verbose_name_plural = "Audit Checkpoints"
+        indexes = [
+            models.Index(fields=["last_log_id"], name="idx_checkpoint_last_log"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Checkpoint @ {self.last_log_id} ({self.row_hash[:12]}…)"
+
+
+class AuditOutbox(models.Model):
+    """
+    Audit events waiting to be moved into ApplicationAuditLog. Business code
+    writes here inside its own transaction, so the event commits or rolls
+    back with the state change it records; flush_audit_outbox later moves
+    rows across in (timestamp, id) order, in large batches, deleting them as
+    it goes.
+    """
+
+    application = models.ForeignKey(
+        "applications.VisaApplication",
+        on_delete=models.PROTECT,
+        related_name="+",
+    )
+    previous_status = models.CharField(max_length=20, blank=True, default="")
+    new_status = models.CharField(max_length=20)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    reason = models.TextField(blank=True, default="")
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        db_table = "audit_outbox"
+        verbose_name = "Audit Outbox Entry"
+        verbose_name_plural = "Audit Outbox"
+        indexes = [
+            # Merged trail for one application while its events are pending.
+            models.Index(fields=["application", "id"], name="idx_outbox_app_id"),
+            # flush_audit_outbox drains the oldest events first.
+            models.Index(fields=["timestamp", "id"], name="idx_outbox_timestamp_id"),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"[{self.timestamp}] {self.application_id}: "
+            f"{self.previous_status!r} → {self.new_status!r} (pending)"
+        )
@@ -0,0 +1,146 @@
+import datetime
+import re
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+from apps.audit.models import ApplicationAuditLog
+
+AUDIT_TABLE = ApplicationAuditLog._meta.db_table
+# MySQL cannot put a FULLTEXT index on a partitioned table, so reason is
+# mirrored into this plain table by an insert trigger (migration 0004).
+FULLTEXT_TABLE = "audit_reason_fulltext"
+CATCH_ALL = "pmax"
+PARTITION_NAME = re.compile(r"^p(\d{4})(\d{2})$")
+
+
+@dataclass
+class Partition:
+    name: str
+    month: datetime.date | None     # None for the MAXVALUE catch-all
+    rows: int                       # estimate on MySQL, exact on SQLite
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def archive_table(month: datetime.date) -> str:
+    # Where a detached month lives until it is exported or dropped.
+    return f"{AUDIT_TABLE}_{partition_name(month)}"
+
+
+def _month_bounds(month: datetime.date) -> tuple[str, str]:
+    return month.isoformat(), add_months(month, 1).isoformat()
+
+
+class MySQLPartitions:
+    """
+    audit_applicationauditlog is RANGE-partitioned on TO_DAYS(timestamp), one
+    partition per month plus a MAXVALUE catch-all (migration 0004). New months
+    are split off the catch-all ahead of time; old ones are exchanged into a
+    standalone table and dropped, which is metadata-only on the hot table.
+    """
+
+    def partitions(self) -> list[Partition]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT PARTITION_NAME, TABLE_ROWS FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION",
+                [AUDIT_TABLE],
+            )
+            rows = cursor.fetchall()
+        result = []
+        for name, table_rows in rows:
+            match = PARTITION_NAME.match(name)
+            month = datetime.date(int(match[1]), int(match[2]), 1) if match else None
+            result.append(Partition(name, month, table_rows or 0))
+        return result
+
+    def create(self, month: datetime.date) -> None:
+        _, end = _month_bounds(month)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {AUDIT_TABLE} REORGANIZE PARTITION {CATCH_ALL} INTO ("
+                f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{end}')), "
+                f"PARTITION {CATCH_ALL} VALUES LESS THAN MAXVALUE)"
+            )
+
+    def detach(self, month: datetime.date) -> str:
+        name, table = partition_name(month), archive_table(month)
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {table} LIKE {AUDIT_TABLE}")
+            cursor.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+            cursor.execute(f"ALTER TABLE {AUDIT_TABLE} EXCHANGE PARTITION {name} WITH TABLE {table}")
+            cursor.execute(
+                f"DELETE f FROM {FULLTEXT_TABLE} f JOIN {table} a ON a.id = f.log_id"
+            )
+            cursor.execute(f"ALTER TABLE {AUDIT_TABLE} DROP PARTITION {name}")
+        return table
+
+
+class SQLitePartitions:
+    """
+    Emulation for development and tests. SQLite has no partitioning, so every
+    attached month lives in the one table and creating a month is a no-op;
+    detaching moves the month's rows into their own per-month table, just as
+    on MySQL.
+    """
+
+    def partitions(self) -> list[Partition]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT strftime('%Y%m', timestamp) AS ym, COUNT(*) FROM {AUDIT_TABLE} GROUP BY ym ORDER BY ym"
+            )
+            rows = cursor.fetchall()
+        return [
+            Partition(f"p{ym}", datetime.date(int(ym[:4]), int(ym[4:]), 1), count)
+            for ym, count in rows
+        ]
+
+    def create(self, month: datetime.date) -> None:
+        return None
+
+    @transaction.atomic
+    def detach(self, month: datetime.date) -> str:
+        start, end = _month_bounds(month)
+        table = archive_table(month)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {table} AS SELECT * FROM {AUDIT_TABLE} WHERE timestamp >= %s AND timestamp < %s",
+                [start, end],
+            )
+            # The delete trigger drops the rows from the FTS table too.
+            cursor.execute(
+                f"DELETE FROM {AUDIT_TABLE} WHERE timestamp >= %s AND timestamp < %s", [start, end]
+            )
+        return table
+
+
+def get_partitioning():
+    if connection.vendor == "mysql":
+        return MySQLPartitions()
+    if connection.vendor == "sqlite":
+        return SQLitePartitions()
+    raise NotImplementedError(f"Audit partitioning is not implemented for {connection.vendor}.")
+
+
+def archived_months() -> list[datetime.date]:
+    """Months detached from the audit table whose archive table still exists."""
+    months = []
+    for table in connection.introspection.table_names():
+        if table.startswith(f"{AUDIT_TABLE}_p"):
+            match = PARTITION_NAME.match(table[len(AUDIT_TABLE) + 1:])
+            if match:
+                months.append(datetime.date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
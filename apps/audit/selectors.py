@@ -0,0 +1,226 @@
+import datetime
+import re
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import BooleanField, F, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from apps.audit.models import ApplicationAuditLog, AuditOutbox
+
+UUID_HEX_LENGTH = 32
+SEARCH_WORD = re.compile(r"\w+")
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _timestamp_floor(application_id) -> dict:
+    # No audit row predates its application, so bounding timestamp from below
+    # lets MySQL prune every monthly partition older than the application.
+    from apps.applications.models import VisaApplication
+
+    created_at = VisaApplication.objects.filter(pk=application_id).values_list("created_at", flat=True).first()
+    if created_at is None:
+        return {}
+    return {"timestamp__gte": created_at.astimezone(datetime.timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0,
+    )}
+
+
+def _application_filter(value: str) -> dict:
+    # A full ID is an equality lookup; a prefix becomes a closed range on the
+    # same column, so both ride idx_audit_app_timestamp instead of a LIKE scan.
+    if len(value) == UUID_HEX_LENGTH:
+        application_id = uuid.UUID(value)
+        return {"application_id": application_id, **_timestamp_floor(application_id)}
+    padding = UUID_HEX_LENGTH - len(value)
+    return {
+        "application_id__gte": uuid.UUID(value + "0" * padding),
+        "application_id__lte": uuid.UUID(value + "f" * padding),
+    }
+
+
+def _day_start(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def filter_reason_matches(logs, text: str):
+    """
+    Restrict logs to rows whose reason contains every word of text (prefix
+    matches allowed), through the backend's full-text shadow table from
+    migrations 0002/0004. Backends without one fall back to a plain
+    substring match.
+    """
+    words = SEARCH_WORD.findall(text)
+    if not words:
+        return logs
+    if connection.vendor == "mysql":
+        query = " ".join(f"+{word}*" for word in words)
+        return logs.filter(
+            pk__in=RawSQL(
+                "SELECT log_id FROM audit_reason_fulltext WHERE MATCH (reason) AGAINST (%s IN BOOLEAN MODE)",
+                [query],
+            )
+        )
+    if connection.vendor == "sqlite":
+        query = " ".join(f'"{word}"*' for word in words)
+        return logs.filter(
+            pk__in=RawSQL("SELECT rowid FROM audit_reason_fts WHERE audit_reason_fts MATCH %s", [query])
+        )
+    for word in words:
+        logs = logs.filter(reason__icontains=word)
+    return logs
+
+
+def parse_audit_cursor(cursor: str) -> tuple[datetime.datetime, int] | None:
+    micros, _, log_id = (cursor or "").partition(":")
+    try:
+        return EPOCH + datetime.timedelta(microseconds=int(micros)), int(log_id)
+    except (ValueError, OverflowError):
+        return None
+
+
+def audit_cursor(timestamp: datetime.datetime, log_id: int) -> str:
+    # Whole microseconds since the epoch: exact, and free of the ':' and '+'
+    # an ISO timestamp would carry into the query string.
+    return f"{(timestamp - EPOCH) // datetime.timedelta(microseconds=1)}:{log_id}"
+
+
+def filter_audit_logs(
+    model=ApplicationAuditLog,
+    application: str = "",
+    actor_email: str = "",
+    status: str = "",
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    text: str = "",
+):
+    """
+    Audit rows matching every given filter, unordered. application is bare
+    lowercase hex (a full ID or a prefix, as cleaned by AuditSearchForm).
+    Each filter maps onto an index, so the cost follows the size of the
+    result rather than the size of the table. Pass model=AuditOutbox to
+    search the events still waiting to be flushed.
+    """
+    logs = model.objects.all()
+    if application:
+        logs = logs.filter(**_application_filter(application))
+    if actor_email:
+        # Resolve the email through uq_user_email first; a join would let the
+        # planner drive the search from the users table instead.
+        actor_ids = list(
+            get_user_model().objects.filter(email__iexact=actor_email).values_list("pk", flat=True)
+        )
+        if not actor_ids:
+            return logs.none()
+        logs = logs.filter(actor_id__in=actor_ids)
+    if status:
+        logs = logs.filter(new_status=status)
+    if date_from:
+        logs = logs.filter(timestamp__gte=_day_start(date_from))
+    if date_to:
+        logs = logs.filter(timestamp__lt=_day_start(date_to + datetime.timedelta(days=1)))
+    if text:
+        if model is ApplicationAuditLog:
+            logs = filter_reason_matches(logs, text)
+        else:
+            # The outbox is small and has no full-text index.
+            for word in SEARCH_WORD.findall(text):
+                logs = logs.filter(reason__icontains=word)
+    return logs
+
+
+def search_audit_logs(
+    before: tuple[datetime.datetime, int] | None = None,
+    limit: int = 100,
+    **filters,
+) -> tuple[list[ApplicationAuditLog], str | None]:
+    # Keyset pagination on (timestamp, id), newest first: each page starts
+    # where the last one ended, so paging deep into the history costs the
+    # same as the first page. The first page also leads with matching events
+    # still in the outbox; they are always the newest.
+    columns = (
+        "id", "previous_status", "new_status", "reason", "timestamp",
+        "application__id", "application__visa_type__name",
+        "actor__email", "actor__role",
+    )
+    pending = []
+    if before is None:
+        pending = list(
+            filter_audit_logs(model=AuditOutbox, **filters)
+            .select_related("application__visa_type", "actor")
+            .only(*columns)
+            .order_by("-id")[:limit]
+        )
+        for event in pending:
+            event.pending = True
+    logs = (
+        filter_audit_logs(**filters)
+        .select_related("application__visa_type", "actor")
+        .only(*columns)
+        .order_by("-timestamp", "-id")
+    )
+    if before is not None:
+        timestamp, log_id = before
+        # The redundant upper bound is what lets MySQL prune newer partitions.
+        logs = logs.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=log_id),
+            timestamp__lte=timestamp,
+        )
+    page = list(logs[: limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = audit_cursor(last.timestamp, last.pk)
+    return pending + page, next_cursor
+
+
+def get_audit_trail(application_id) -> list[dict]:
+    """
+    Full history of one application, oldest first: rows in detached months
+    (cold storage segments, or archive tables not yet exported), flushed
+    audit rows and events still in the outbox.
+    The last two come from one UNION ALL, read from a single snapshot, so a
+    flush running at the same moment can neither hide an event nor show it
+    twice.
+    """
+    from apps.audit.archive import read_archived_events
+
+    fields = ("previous_status", "new_status", "reason", "timestamp", "actor_email", "pending")
+    floor = _timestamp_floor(application_id)
+    logs = (
+        ApplicationAuditLog.objects.filter(application_id=application_id, **floor)
+        .annotate(actor_email=F("actor__email"), pending=Value(False, output_field=BooleanField()))
+        .values_list(*fields)
+    )
+    outbox = (
+        AuditOutbox.objects.filter(application_id=application_id)
+        .annotate(actor_email=F("actor__email"), pending=Value(True, output_field=BooleanField()))
+        .values_list(*fields)
+    )
+    rows = logs.union(outbox, all=True).order_by("timestamp", "pending")
+    trail = [dict(zip(fields, row)) for row in rows]
+
+    since = floor["timestamp__gte"].date() if floor else None
+    archived = read_archived_events(uuid.UUID(str(application_id)), since=since)
+    if not archived:
+        return trail
+    User = get_user_model()
+    for event in archived:
+        event["actor_id"] = User._meta.pk.to_python(event["actor_id"]) if event["actor_id"] else None
+    emails = dict(
+        User.objects.filter(pk__in={e["actor_id"] for e in archived if e["actor_id"]}).values_list("pk", "email")
+    )
+    return [
+        {
+            "previous_status": event["previous_status"],
+            "new_status": event["new_status"],
+            "reason": event["reason"],
+            "timestamp": event["timestamp"],
+            "actor_email": emails.get(event["actor_id"]),
+            "pending": False,
+        }
+        for event in archived
+    ] + trail
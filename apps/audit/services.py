@@ -1,4 +1,14 @@
-from apps.audit.models import ApplicationAuditLog
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.audit.chain import CHAIN_FIELDS, chain_tail_hash, row_digest
+from apps.audit.models import ApplicationAuditLog, AuditOutbox
+
+# Columns copied verbatim from the outbox into the audit table.
+OUTBOX_FIELDS = CHAIN_FIELDS
 
 
 def log_event(
@@ -7,11 +17,67 @@ def log_event(
     new_status: str,
     actor,  # None for SYSTEM-initiated transitions
     reason: str = "",
-) -> ApplicationAuditLog:
-    return ApplicationAuditLog.objects.create(
+) -> AuditOutbox:
+    # Written to the outbox in the caller's transaction; flush_audit_outbox
+    # moves it into ApplicationAuditLog.
+    return AuditOutbox.objects.create(
         application=application,
         previous_status=previous_status,
         new_status=new_status,
         actor=actor,
         reason=reason,
     )
+
+
+def log_events(events: list[dict]) -> list[AuditOutbox]:
+    # Batched variant of log_event for bulk operations: one INSERT for all rows.
+    # Each dict carries the same keyword arguments log_event accepts.
+    return AuditOutbox.objects.bulk_create(
+        [AuditOutbox(**event) for event in events]
+    )
+
+
+def flush_audit_outbox(batch_size: int = 5000) -> int:
+    """
+    Move the oldest batch of outbox rows into ApplicationAuditLog: one INSERT
+    and one DELETE in a single transaction, so every event moves at most once
+    and none is lost. Rows are copied in (timestamp, id) order with their
+    original timestamps, and hash-chained as they go (see chain.py).
+
+    Outbox ids are handed out at INSERT but become visible at COMMIT, so a
+    slow transaction can commit an older event after a newer one has been
+    flushed. Only rows older than AUDIT_OUTBOX_COMMIT_LAG_SECONDS are moved:
+    the log keeps event order as long as no transaction holds an audit event
+    uncommitted for longer than that.
+
+    The ids are read first and then locked by primary key, which keeps the
+    lock off the gap new events are inserted into. A worker that loses a
+    batch to another one reads the next batch instead of reporting an empty
+    outbox. Returns the number of rows moved; 0 only when nothing is due.
+    """
+    due = AuditOutbox.objects.filter(
+        timestamp__lt=timezone.now() - datetime.timedelta(seconds=settings.AUDIT_OUTBOX_COMMIT_LAG_SECONDS)
+    ).order_by("timestamp", "id")
+    while True:
+        ids = list(due.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return 0
+        with transaction.atomic():
+            rows = list(
+                AuditOutbox.objects.select_for_update()
+                .filter(id__in=ids)
+                .order_by("timestamp", "id")
+                .values_list(*OUTBOX_FIELDS)
+            )
+            if not rows:
+                continue    # another worker moved this batch first
+            # Chain each row onto the one inserted before it. The batch goes
+            # in as one multi-row INSERT, whose ids ascend in list order.
+            prev_hash = chain_tail_hash()
+            logs = []
+            for row in rows:
+                prev_hash = row_digest(prev_hash, *row)
+                logs.append(ApplicationAuditLog(**dict(zip(OUTBOX_FIELDS, row)), row_hash=prev_hash))
+            ApplicationAuditLog.objects.bulk_create(logs)
+            AuditOutbox.objects.filter(id__in=ids).delete()
+        return len(rows)
@@ -1,3 +1,492 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.choices import UserRole
+from apps.accounts.models import User
+from apps.applications.choices import ApplicationStatus
+from apps.applications.models import VisaApplication
+from apps.audit.archive import INDEX_RECORD, _open_segment, read_archived_events, segment_paths, write_segment
+from apps.audit.chain import (
+    ChainOrderError,
+    checkpoint_before_detach,
+    create_checkpoint,
+    starting_point,
+    verify_chain,
+)
+from apps.audit.export import iter_export_chunks, stream_audit_export
+from apps.audit.models import ApplicationAuditLog, AuditCheckpoint, AuditOutbox
+from apps.audit.partitions import archive_table, archived_months
+from apps.audit.selectors import (
+    audit_cursor,
+    filter_audit_logs,
+    get_audit_trail,
+    parse_audit_cursor,
+    search_audit_logs,
+)
+from apps.audit.services import flush_audit_outbox, log_event
+from apps.visas.models import VisaType
+
+T0 = datetime.datetime(2025, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+class AuditTestCase(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("applicant@example.com", "pw")
+        self.supervisor = User.objects.create_user("supervisor@example.com", "pw", role=UserRole.SUPERVISOR)
+        self.visa_type = VisaType.objects.create(code="TOURIST_30", name="Tourist", fee_amount=50, max_stay_days=30)
+        self.application = VisaApplication.objects.create(
+            applicant=self.applicant,
+            visa_type=self.visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+        )
+
+    def make_log(self, timestamp, reason="", new_status=ApplicationStatus.SUBMITTED) -> ApplicationAuditLog:
+        return ApplicationAuditLog.objects.create(
+            application=self.application,
+            previous_status=ApplicationStatus.DRAFT,
+            new_status=new_status,
+            reason=reason,
+            timestamp=timestamp,
+        )
+
+    def make_event(self, timestamp, reason="") -> AuditOutbox:
+        return AuditOutbox.objects.create(
+            application=self.application, previous_status=ApplicationStatus.DRAFT,
+            new_status=ApplicationStatus.SUBMITTED, reason=reason, timestamp=timestamp,
+        )
+
+    def make_logs(self, count: int) -> list[ApplicationAuditLog]:
+        # Pairs share a timestamp, so pages have to break ties on id.
+        return [self.make_log(T0 + datetime.timedelta(minutes=i // 2), reason=f"event {i}") for i in range(count)]
+
+
+class AuditPaginationTests(AuditTestCase):
+    def walk(self, **filters) -> list[int]:
+        seen, before = [], None
+        while True:
+            page, next_cursor = search_audit_logs(before=before, limit=3, **filters)
+            seen.extend(log.pk for log in page)
+            if next_cursor is None:
+                return seen
+            before = parse_audit_cursor(next_cursor)
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        logs = self.make_logs(8)
+        expected = [log.pk for log in sorted(logs, key=lambda log: (log.timestamp, log.pk), reverse=True)]
+        self.assertEqual(self.walk(), expected)
+
+    def test_pages_respect_filters(self):
+        self.make_logs(4)
+        approved = [self.make_log(T0 + datetime.timedelta(hours=i), new_status=ApplicationStatus.APPROVED) for i in range(4)]
+        self.assertEqual(self.walk(status=ApplicationStatus.APPROVED), [log.pk for log in reversed(approved)])
+
+    def test_outbox_events_lead_the_first_page_only(self):
+        self.make_logs(4)
+        event = AuditOutbox.objects.create(
+            application=self.application, previous_status=ApplicationStatus.SUBMITTED,
+            new_status=ApplicationStatus.UNDER_REVIEW,
+        )
+        first, next_cursor = search_audit_logs(limit=3)
+        self.assertEqual(first[0].pk, event.pk)
+        self.assertTrue(first[0].pending)
+        second, _ = search_audit_logs(before=parse_audit_cursor(next_cursor), limit=3)
+        self.assertFalse(any(getattr(log, "pending", False) for log in second))
+
+    def test_cursor_round_trip(self):
+        timestamp = T0 + datetime.timedelta(microseconds=123456)
+        self.assertEqual(parse_audit_cursor(audit_cursor(timestamp, 42)), (timestamp, 42))
+        for garbage in ("", "abc", "1:", ":1", "1:x"):
+            with self.subTest(cursor=garbage):
+                self.assertIsNone(parse_audit_cursor(garbage))
+
+
+class AuditSearchTests(AuditTestCase):
+    def ids(self, model=ApplicationAuditLog, **filters) -> set:
+        return set(filter_audit_logs(model=model, **filters).values_list("pk", flat=True))
+
+    def test_application_id_and_prefix(self):
+        other = VisaApplication.objects.create(
+            applicant=self.applicant, visa_type=self.visa_type, nationality="GH",
+            purpose_of_travel="Business", intended_entry_date=datetime.date(2030, 1, 1),
+        )
+        now = timezone.now()
+        mine = self.make_log(now)
+        theirs = ApplicationAuditLog.objects.create(
+            application=other, previous_status=ApplicationStatus.DRAFT,
+            new_status=ApplicationStatus.SUBMITTED, timestamp=now,
+        )
+
+        self.assertEqual(self.ids(application=self.application.pk.hex), {mine.pk})
+        # The shortest prefix that tells the two IDs apart.
+        mine_hex, theirs_hex = self.application.pk.hex, other.pk.hex
+        shared = next(i for i, (a, b) in enumerate(zip(mine_hex, theirs_hex)) if a != b)
+        self.assertEqual(self.ids(application=mine_hex[:shared + 1]), {mine.pk})
+        self.assertEqual(self.ids(application=theirs_hex[:shared + 1]), {theirs.pk})
+        if shared:
+            self.assertEqual(self.ids(application=mine_hex[:shared]), {mine.pk, theirs.pk})
+
+    def test_actor_email(self):
+        by_supervisor = ApplicationAuditLog.objects.create(
+            application=self.application, previous_status=ApplicationStatus.UNDER_REVIEW,
+            new_status=ApplicationStatus.APPROVED, actor=self.supervisor, timestamp=T0,
+        )
+        self.make_log(T0)
+
+        self.assertEqual(self.ids(actor_email="Supervisor@Example.com"), {by_supervisor.pk})
+        self.assertEqual(self.ids(actor_email="nobody@example.com"), set())
+
+    def test_status(self):
+        self.make_log(T0)
+        approved = self.make_log(T0, new_status=ApplicationStatus.APPROVED)
+        self.assertEqual(self.ids(status=ApplicationStatus.APPROVED), {approved.pk})
+
+    def test_dates_are_whole_local_days(self):
+        day = timezone.localtime(T0).date()
+        start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+        first = self.make_log(start)
+        last = self.make_log(start + datetime.timedelta(days=1, microseconds=-1))
+        self.make_log(start - datetime.timedelta(microseconds=1))
+        self.make_log(start + datetime.timedelta(days=1))
+
+        self.assertEqual(self.ids(date_from=day, date_to=day), {first.pk, last.pk})
+        self.assertEqual(len(self.ids(date_from=day)), 3)
+        self.assertEqual(len(self.ids(date_to=day)), 3)
+
+    def test_text_needs_every_word_and_allows_prefixes(self):
+        match = self.make_log(T0, reason="Passport scan rejected as blurry.")
+        self.make_log(T0, reason="Passport accepted.")
+
+        self.assertEqual(self.ids(text="pass blur"), {match.pk})
+        self.assertEqual(self.ids(text="BLURRY passport"), {match.pk})
+        self.assertEqual(self.ids(text="passport visa"), set())
+        self.assertEqual(len(self.ids(text="...")), 2)   # no words: no filter
+
+    def test_text_fallback_without_a_fulltext_table(self):
+        match = self.make_log(T0, reason="Passport scan rejected as blurry.")
+        self.make_log(T0, reason="Passport accepted.")
+
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            self.assertEqual(self.ids(text="blurry passport"), {match.pk})
+            self.assertEqual(self.ids(text="passport visa"), set())
+
+    def test_outbox_is_searched_by_substring(self):
+        event = self.make_event(T0, reason="Passport scan rejected.")
+        self.make_event(T0, reason="Photo accepted.")
+        self.assertEqual(self.ids(model=AuditOutbox, text="scan pass"), {event.pk})
+
+    def test_filters_combine(self):
+        wanted = self.make_log(T0, reason="Approved after interview.", new_status=ApplicationStatus.APPROVED)
+        self.make_log(T0, reason="Approved after interview.")
+        self.make_log(T0 + datetime.timedelta(days=2), reason="Approved.", new_status=ApplicationStatus.APPROVED)
+
+        day = timezone.localtime(T0).date()
+        self.assertEqual(
+            self.ids(status=ApplicationStatus.APPROVED, text="interview", date_from=day, date_to=day),
+            {wanted.pk},
+        )
+
+
+class AuditExportTests(AuditTestCase):
+    def test_export_chunks_walk_oldest_first(self):
+        logs = self.make_logs(7)
+        chunks = list(iter_export_chunks(filter_audit_logs(), chunk_size=2))
+        self.assertEqual([len(rows) for rows in chunks], [2, 2, 2, 1])
+        self.assertEqual([row["id"] for rows in chunks for row in rows], [log.pk for log in logs])
+
+    def test_export_leaves_out_rows_from_the_future(self):
+        self.make_log(timezone.now() + datetime.timedelta(days=1))
+        self.assertEqual(list(iter_export_chunks(filter_audit_logs())), [])
+
+    def test_gzipped_jsonl(self):
+        logs = self.make_logs(3)
+        data = gzip.decompress(b"".join(stream_audit_export(filter_audit_logs(), "jsonl", compress=True)))
+        lines = [json.loads(line) for line in data.decode().splitlines()]
+        self.assertEqual([line["id"] for line in lines], [log.pk for log in logs])
+        self.assertEqual(lines[0]["application_id"], str(self.application.pk))
+        self.assertEqual(lines[0]["reason"], "event 0")
+
+    def test_csv(self):
+        self.make_logs(2)
+        data = b"".join(stream_audit_export(filter_audit_logs(), "csv")).decode()
+        rows = list(csv.reader(io.StringIO(data)))
+        self.assertEqual(rows[0][:3], ["id", "timestamp", "application_id"])
+        self.assertEqual(len(rows), 3)
+
+    def test_export_view(self):
+        self.make_logs(2)
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse("audit:export"), {"format": "jsonl", "status": ApplicationStatus.SUBMITTED})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 2)
+
+        self.assertEqual(self.client.get(reverse("audit:export"), {"format": "xml"}).status_code, 400)
+
+    def test_export_view_is_for_supervisors(self):
+        self.client.force_login(self.applicant)
+        self.assertEqual(self.client.get(reverse("audit:export")).status_code, 403)
+
+
+@override_settings(AUDIT_OUTBOX_COMMIT_LAG_SECONDS=5)
+class OutboxFlushTests(AuditTestCase):
+
+    def test_events_move_in_timestamp_order(self):
+        # The later id carries the earlier event, as when a slow transaction
+        # inserts first and commits last.
+        self.make_event(T0 + datetime.timedelta(seconds=1), reason="second")
+        self.make_event(T0, reason="first")
+        self.make_event(T0 + datetime.timedelta(seconds=1), reason="third")
+
+        self.assertEqual(flush_audit_outbox(), 3)
+        self.assertFalse(AuditOutbox.objects.exists())
+        self.assertEqual(
+            list(ApplicationAuditLog.objects.order_by("id").values_list("reason", flat=True)),
+            ["first", "second", "third"],
+        )
+        report = verify_chain()
+        self.assertIsNone(report.broken_at)
+        self.assertEqual(report.rows, 3)
+
+    def test_recent_events_wait_for_the_commit_lag(self):
+        self.make_event(T0, reason="old")
+        recent = self.make_event(timezone.now(), reason="recent")
+
+        self.assertEqual(flush_audit_outbox(), 1)
+        self.assertEqual(flush_audit_outbox(), 0)
+        self.assertEqual(list(AuditOutbox.objects.values_list("pk", flat=True)), [recent.pk])
+
+    def test_batches_chain_onto_each_other(self):
+        for i in range(5):
+            self.make_event(T0 + datetime.timedelta(seconds=i), reason=f"event {i}")
+        self.assertEqual([flush_audit_outbox(batch_size=2) for _ in range(4)], [2, 2, 1, 0])
+        self.assertEqual(verify_chain().rows, 5)
+
+    def test_lost_race_moves_the_next_batch(self):
+        events = [self.make_event(T0 + datetime.timedelta(seconds=i)) for i in range(4)]
+        taken = [event.pk for event in events[:2]]
+        select_for_update = AuditOutbox.objects.select_for_update
+        calls = []
+
+        def other_worker_first(*args, **kwargs):
+            # Another worker moves the first batch between our read and our lock.
+            if not calls:
+                calls.append(True)
+                AuditOutbox.objects.filter(pk__in=taken).delete()
+            return select_for_update(*args, **kwargs)
+
+        with mock.patch.object(AuditOutbox.objects, "select_for_update", other_worker_first):
+            self.assertEqual(flush_audit_outbox(batch_size=2), 2)
+        self.assertFalse(AuditOutbox.objects.exists())
+
+    def test_command_drains_the_outbox(self):
+        for i in range(3):
+            self.make_event(T0 + datetime.timedelta(seconds=i))
+        out = io.StringIO()
+        call_command("flush_audit_outbox", batch_size=2, stdout=out)
+        self.assertIn("Flushed 3 audit event(s).", out.getvalue())
+
+    def test_trail_shows_pending_and_flushed_events_once(self):
+        self.make_event(timezone.now() - datetime.timedelta(minutes=1), reason="flushed")
+        flush_audit_outbox()
+        log_event(self.application, ApplicationStatus.SUBMITTED, ApplicationStatus.UNDER_REVIEW, actor=None, reason="pending")
+
+        trail = get_audit_trail(self.application.pk)
+        self.assertEqual([(e["reason"], e["pending"]) for e in trail], [("flushed", False), ("pending", True)])
+
+
+@override_settings(AUDIT_OUTBOX_COMMIT_LAG_SECONDS=5)
+class HashChainTests(AuditTestCase):
+    def make_chain(self, timestamps) -> list[int]:
+        for i, timestamp in enumerate(timestamps):
+            self.make_event(timestamp, reason=f"event {i}")
+        flush_audit_outbox()
+        return list(ApplicationAuditLog.objects.order_by("id").values_list("id", flat=True))
+
+    def tamper(self, sql, params):
+        # Direct SQL, as ApplicationAuditLog.save() and delete() refuse.
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(table=ApplicationAuditLog._meta.db_table), params)
+
+    def verify(self, **options):
+        out = io.StringIO()
+        call_command("verify_audit_chain", stdout=out, **options)
+        return out.getvalue()
+
+    def test_intact_chain_verifies_and_checkpoints(self):
+        ids = self.make_chain(T0 + datetime.timedelta(minutes=i) for i in range(4))
+        self.assertIn("4 new row(s) verified", self.verify())
+        self.assertEqual(AuditCheckpoint.objects.get().last_log_id, ids[-1])
+
+        # The next run resumes from the checkpoint and only rehashes new rows.
+        self.make_chain([T0 + datetime.timedelta(hours=1)])
+        self.assertIn("1 new row(s) verified", self.verify())
+
+    def test_edited_row_breaks_the_chain(self):
+        ids = self.make_chain(T0 + datetime.timedelta(minutes=i) for i in range(4))
+        self.tamper("UPDATE {table} SET reason = %s WHERE id = %s", ["edited", ids[2]])
+
+        report = verify_chain()
+        self.assertEqual((report.broken_at, report.rows), (ids[2], 2))
+        with self.assertRaisesMessage(CommandError, f"broken at row {ids[2]}"):
+            self.verify()
+
+    def test_deleted_row_breaks_the_chain(self):
+        ids = self.make_chain(T0 + datetime.timedelta(minutes=i) for i in range(4))
+        self.tamper("DELETE FROM {table} WHERE id = %s", [ids[1]])
+        self.assertEqual(verify_chain().broken_at, ids[2])
+
+    def test_edit_before_a_checkpoint_is_caught(self):
+        ids = self.make_chain(T0 + datetime.timedelta(minutes=i) for i in range(3))
+        self.verify()
+        self.tamper("UPDATE {table} SET reason = %s WHERE id = %s", ["edited", ids[-1]])
+        with self.assertRaisesMessage(CommandError, "no longer matches checkpoint"):
+            self.verify()
+        # Only a full rehash looks past the checkpoint's own row.
+        self.tamper("UPDATE {table} SET reason = %s WHERE id = %s", ["edited", ids[0]])
+        with self.assertRaisesMessage(CommandError, f"broken at row {ids[0]}"):
+            self.verify(full=True)
+
+    def test_forged_checkpoint_is_refused(self):
+        ids = self.make_chain(T0 + datetime.timedelta(minutes=i) for i in range(2))
+        checkpoint = create_checkpoint(ids[-1], "f" * 64, rows_verified=0)
+        AuditCheckpoint.objects.filter(pk=checkpoint.pk).update(signature="0" * 64)
+        with self.assertRaisesMessage(CommandError, "invalid signature"):
+            self.verify()
+
+    def test_detached_month_leaves_a_verifiable_chain(self):
+        old = datetime.datetime(2020, 1, 15, tzinfo=datetime.timezone.utc)
+        ids = self.make_chain([old, old + datetime.timedelta(hours=1), timezone.now() - datetime.timedelta(minutes=1)])
+
+        out = io.StringIO()
+        call_command("maintain_audit_partitions", ahead=0, retain_months=1, stdout=out)
+        self.assertIn("Detached p202001", out.getvalue())
+        self.assertEqual(list(ApplicationAuditLog.objects.values_list("id", flat=True)), ids[2:])
+        self.assertEqual(starting_point()[0], ids[2] - 1)
+        self.assertIn("1 new row(s) verified", self.verify(full=True))
+
+    def test_detach_refuses_rows_interleaved_across_the_boundary(self):
+        # A current event filed first, then a late one from an old month:
+        # the old row ends up after the current one in chain order.
+        current = self.make_chain([timezone.now() - datetime.timedelta(minutes=1)])
+        late = self.make_chain([datetime.datetime(2020, 1, 15, tzinfo=datetime.timezone.utc)])[-1]
+        boundary = datetime.datetime(2020, 2, 1, tzinfo=datetime.timezone.utc)
+
+        with self.assertRaisesMessage(ChainOrderError, f"Audit row {current[0]}"):
+            checkpoint_before_detach(boundary)
+        self.assertFalse(AuditCheckpoint.objects.exists())
+        with self.assertRaisesMessage(CommandError, "Not detaching p202001"):
+            call_command("maintain_audit_partitions", ahead=0, retain_months=1, stdout=io.StringIO())
+        self.assertTrue(ApplicationAuditLog.objects.filter(pk=late).exists())
+
+
+@override_settings(AUDIT_OUTBOX_COMMIT_LAG_SECONDS=5)
+class ArchiveSegmentTests(AuditTestCase):
+    MONTH = datetime.date(2020, 1, 1)
+
+    def setUp(self):
+        super().setUp()
+        archive = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, archive, ignore_errors=True)
+        settings_override = override_settings(AUDIT_ARCHIVE_DIR=archive)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Mapped segments are cached per month; each test has its own directory.
+        self.addCleanup(_open_segment.cache_clear)
+
+        # Backdated, or the trail would skip segments older than the application.
+        created = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        VisaApplication.objects.filter(pk=self.application.pk).update(created_at=created)
+        self.other = VisaApplication.objects.create(
+            applicant=self.applicant, visa_type=self.visa_type, nationality="GH",
+            purpose_of_travel="Business", intended_entry_date=datetime.date(2030, 1, 1),
+        )
+
+    def archive_old_month(self):
+        old = datetime.datetime(2020, 1, 10, tzinfo=datetime.timezone.utc)
+        for i, application in enumerate([self.application, self.other, self.application]):
+            AuditOutbox.objects.create(
+                application=application, previous_status=ApplicationStatus.DRAFT,
+                new_status=ApplicationStatus.SUBMITTED, actor=self.supervisor if i else None,
+                reason=f"old {i}", timestamp=old + datetime.timedelta(hours=i),
+            )
+        self.make_event(timezone.now() - datetime.timedelta(minutes=1), reason="current")
+        flush_audit_outbox()
+        archived = {
+            row["id"]: row for row in ApplicationAuditLog.objects.filter(timestamp__lt=T0).values()
+        }
+        call_command("maintain_audit_partitions", ahead=0, retain_months=1, stdout=io.StringIO())
+        return archived
+
+    def test_round_trip_through_a_segment(self):
+        archived = self.archive_old_month()
+        out = io.StringIO()
+        call_command("archive_audit_segments", drop=True, stdout=out)
+        self.assertIn("3 row(s) for 2 application(s)", out.getvalue())
+        self.assertNotIn(self.MONTH, archived_months())
+
+        events = read_archived_events(self.application.pk)
+        self.assertEqual([e["reason"] for e in events], ["old 0", "old 2"])
+        for event in events + read_archived_events(self.other.pk):
+            row = archived[event["id"]]
+            self.assertEqual(event["timestamp"], row["timestamp"])
+            self.assertEqual(event["row_hash"], row["row_hash"])
+            self.assertEqual(event["application_id"], row["application_id"].hex)
+            self.assertEqual(event["actor_id"], None if row["actor_id"] is None else str(row["actor_id"]))
+        self.assertEqual(read_archived_events(uuid.uuid4()), [])
+
+    def test_trail_merges_archived_and_live_events(self):
+        self.archive_old_month()
+        call_command("archive_audit_segments", drop=True, stdout=io.StringIO())
+
+        trail = get_audit_trail(self.application.pk)
+        self.assertEqual([e["reason"] for e in trail], ["old 0", "old 2", "current"])
+        self.assertEqual(trail[1]["actor_email"], self.supervisor.email)
+
+    def test_trail_reads_detached_months_before_export(self):
+        archived = self.archive_old_month()
+        self.assertIn(self.MONTH, archived_months())
+
+        trail = get_audit_trail(self.application.pk)
+        self.assertEqual([e["reason"] for e in trail], ["old 0", "old 2", "current"])
+        self.assertEqual(trail[1]["actor_email"], self.supervisor.email)
+        detached = read_archived_events(self.application.pk)
+
+        # Exported but not yet dropped: read once, from the segment.
+        write_segment(self.MONTH)
+        self.assertEqual(read_archived_events(self.application.pk), detached)
+        self.assertEqual([e["timestamp"] for e in detached], [archived[e["id"]]["timestamp"] for e in detached])
+
+    def test_segment_is_plain_gzip_jsonl(self):
+        self.archive_old_month()
+        write_segment(self.MONTH)
+        segment_path, index_path = segment_paths(self.MONTH)
+        with gzip.open(segment_path, "rb") as segment:
+            self.assertEqual(sum(1 for _ in segment), 3)
+        self.assertEqual(index_path.stat().st_size, 2 * INDEX_RECORD.size)
+
+    def test_segments_are_immutable(self):
+        self.archive_old_month()
+        write_segment(self.MONTH)
+        with self.assertRaises(FileExistsError):
+            write_segment(self.MONTH)
+        # Without --drop, the archive table stays put.
+        call_command("archive_audit_segments", stdout=io.StringIO())
+        self.assertIn(self.MONTH, archived_months())
+        self.assertIn(archive_table(self.MONTH), connection.introspection.table_names())
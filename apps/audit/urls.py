@@ -1,9 +1,10 @@
 from django.urls import path
 
-from apps.audit.views import AuditLogView
+from apps.audit.views import AuditLogExportView, AuditLogView
 
 app_name = "audit"
 
 urlpatterns = [
     path("logs/", AuditLogView.as_view(), name="logs"),
+    path("logs/export/", AuditLogExportView.as_view(), name="export"),
 ]
@@ -1,10 +1,29 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
 from django.views.generic import View
 
 from apps.accounts.choices import UserRole
 from apps.accounts.mixins import RoleRequiredMixin
-from apps.audit.models import ApplicationAuditLog
+from apps.audit.export import EXPORT_FORMATS, stream_audit_export
+from apps.audit.forms import AuditSearchForm
+from apps.audit.selectors import filter_audit_logs, parse_audit_cursor, search_audit_logs
+
+AUDIT_PAGE_SIZE = 100
+EXPORT_CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def _search_filters(form: AuditSearchForm) -> dict:
+    data = form.cleaned_data
+    return {
+        "application": data["application"],
+        "actor_email": data["actor"],
+        "status": data["status"],
+        "date_from": data["date_from"],
+        "date_to": data["date_to"],
+        "text": data["text"],
+    }
 
 
 class AuditLogView(LoginRequiredMixin, RoleRequiredMixin, View):
@@ -12,15 +31,51 @@ class AuditLogView(LoginRequiredMixin, RoleRequiredMixin, View):
     template_name = "supervisor/audit_log.html"
 
     def get(self, request):
-        query = request.GET.get("q", "").strip()
-        logs = (
-            ApplicationAuditLog.objects
-            .select_related("application__visa_type", "actor")
-            .order_by("-timestamp")
-        )
-        if query:
-            logs = logs.filter(application_id__icontains=query)
+        form = AuditSearchForm(request.GET)
+        before = parse_audit_cursor(request.GET.get("before", ""))
+        logs, next_cursor, filters = [], None, {}
+        if form.is_valid():
+            filters = _search_filters(form)
+            logs, next_cursor = search_audit_logs(before=before, limit=AUDIT_PAGE_SIZE, **filters)
+
+        # Filters carried into the pagination and export links.
+        params = request.GET.copy()
+        params.pop("before", None)
         return render(request, self.template_name, {
-            "logs": logs[:500],
-            "query": query,
+            "form": form,
+            "logs": logs,
+            "searching": any(filters.values()),
+            "page_size": AUDIT_PAGE_SIZE,
+            "next_cursor": next_cursor,
+            "is_first_page": before is None,
+            "filter_query": params.urlencode(),
         })
+
+
+class AuditLogExportView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """
+    Streams every audit row matching the search filters as CSV or JSONL
+    (?format=, optionally ?gzip=1), oldest first, in constant memory.
+    """
+
+    allowed_roles = [UserRole.SUPERVISOR, UserRole.ADMIN]
+
+    def get(self, request):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"format must be one of: {', '.join(EXPORT_FORMATS)}.")
+        form = AuditSearchForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        compress = request.GET.get("gzip") == "1"
+
+        logs = filter_audit_logs(**_search_filters(form))
+        filename = f"audit-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        if compress:
+            filename += ".gz"
+        response = StreamingHttpResponse(
+            stream_audit_export(logs, export_format, compress=compress),
+            content_type="application/gzip" if compress else EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -19,13 +19,14 @@ class ApplicationDocumentAdmin(admin.ModelAdmin):
         "uploaded_at",
     )
     list_filter = ("document_type", "verified")
-    search_fields = ("application__id", "application__applicant__email")
+    search_fields = ("application__id", "application__applicant__email", "sha256")
     ordering = ("-uploaded_at",)
-    readonly_fields = ("id", "uploaded_at")
+    readonly_fields = ("id", "uploaded_at", "sha256", "size_bytes", "file_kind")
     raw_id_fields = ("application",)
 
     fieldsets = (
         ("Document",   {"fields": ("id", "application", "document_type", "file_path")}),
+        ("Content",    {"fields": ("original_name", "file_kind", "sha256", "size_bytes")}),
         ("Verification",{"fields": ("verified",)}),
         ("Timestamps", {"fields": ("uploaded_at",)}),
     )
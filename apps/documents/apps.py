@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.signals import post_migrate
+
+
+def _refresh_required_masks(sender, apps=None, **kwargs):
+    # Rule-file edits ship with a deploy, and every deploy migrates. Skipped
+    # while migrated back to before the mask was recorded. flush sends the
+    # signal without a migration state; the schema is current then.
+    if apps is not None:
+        try:
+            apps.get_model("visas", "VisaType")._meta.get_field("required_documents_mask")
+        except (LookupError, FieldDoesNotExist):
+            return
+    from apps.documents.services import refresh_required_masks
+
+    refresh_required_masks()
 
 
 class DocumentsConfig(AppConfig):
     name = "apps.documents"
     verbose_name = "Documents"
+
+    def ready(self):
+        post_migrate.connect(_refresh_required_masks, sender=self)
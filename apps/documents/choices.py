@@ -9,3 +9,16 @@ class DocumentType(models.TextChoices):
     TRAVEL_ITINERARY = "TRAVEL_ITINERARY", "Travel Itinerary"
     ACCOMMODATION_PROOF = "ACCOMMODATION_PROOF", "Accommodation Proof"
     OTHER = "OTHER", "Other"
+
+
+class UploadSessionStatus(models.TextChoices):
+    OPEN = "OPEN", "Open"
+    COMPLETED = "COMPLETED", "Completed"
+
+
+class PreviewStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    PROCESSING = "PROCESSING", "Processing"
+    READY = "READY", "Ready"
+    FAILED = "FAILED", "Failed"
+    UNSUPPORTED = "UNSUPPORTED", "Unsupported"
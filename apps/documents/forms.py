@@ -1,12 +1,35 @@
 from django import forms
 
+from apps.applications.exceptions import UploadError
 from apps.documents.choices import DocumentType
 from apps.documents.models import ApplicationDocument
+from apps.documents.validation import SNIFF_BYTES, check_declared_size, check_kind, sniff_kind
 
 
 class DocumentUploadForm(forms.Form):
     document_type = forms.ChoiceField(choices=DocumentType.choices)
     file = forms.FileField(
-        help_text="Upload a PDF, JPG, or PNG (max 5 MB).",
+        help_text="Upload a PDF, JPG, or PNG. Size limits depend on the document type.",
         widget=forms.FileInput(attrs={"accept": ".pdf,.jpg,.jpeg,.png"}),
     )
+
+    def clean(self):
+        # The upload handler may only have known the generic limit while
+        # streaming; now that document_type is parsed, apply the exact rules.
+        cleaned_data = super().clean()
+        uploaded = cleaned_data.get("file")
+        doc_type = cleaned_data.get("document_type")
+        if uploaded is None or not doc_type:
+            return cleaned_data
+
+        kind = getattr(uploaded, "kind", None)
+        if kind is None:
+            head = uploaded.read(SNIFF_BYTES)
+            uploaded.seek(0)
+            kind = sniff_kind(head)
+        try:
+            check_kind(kind, doc_type)
+            check_declared_size(uploaded.size, doc_type)
+        except UploadError as exc:
+            self.add_error("file", str(exc))
+        return cleaned_data
@@ -0,0 +1,234 @@
+import datetime
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.documents.choices import UploadSessionStatus
+from apps.documents.models import ApplicationDocument, UploadSession
+from apps.documents.previews import rendition_paths
+from apps.documents.services import CAS_PREFIX
+
+# Everything the document pipeline writes lives under this storage prefix:
+# content-addressed originals and renditions, legacy per-application folders
+# and (by default) the upload staging dir.
+DOCUMENTS_PREFIX = "documents"
+REFERENCE_QUERY_CHUNK = 5000
+RECLAIM_CHUNK = 500
+RENDITION_SUFFIXES = tuple(suffix[len("x"):] for suffix in rendition_paths("x"))
+
+
+@dataclass
+class Orphan:
+    path: Path
+    size: int
+    mtime: float
+
+
+@dataclass
+class GcReport:
+    scanned_files: int = 0
+    orphans: list[Orphan] = field(default_factory=list)
+    reclaimed: int = 0     # files actually deleted or quarantined
+    skipped: int = 0       # orphans referenced or touched again since the scan
+    cutoff: float = 0.0
+    soft_deleted_before: datetime.datetime | None = None
+
+    @property
+    def orphan_bytes(self) -> int:
+        return sum(o.size for o in self.orphans)
+
+
+def _documents_root(storage) -> Path:
+    root = storage.local_path(DOCUMENTS_PREFIX)
+    if root is None:
+        raise ValueError("Document GC needs filesystem-backed document storage.")
+    return root
+
+
+def _staging_dir() -> Path:
+    return Path(settings.DOCUMENT_UPLOAD_TMP_DIR).resolve()
+
+
+def referenced_paths(media_root: Path, documents) -> set[str]:
+    """
+    Absolute paths of every file still in use, loaded in keyset-paginated
+    chunks so the query never materialises the whole table at once.
+    """
+    documents = documents.order_by("pk")
+    referenced: set[str] = set()
+    last_pk = 0
+    while True:
+        rows = list(
+            documents.filter(pk__gt=last_pk)
+            .values_list("pk", "file_path", "thumbnail_path", "preview_path")[:REFERENCE_QUERY_CHUNK]
+        )
+        if not rows:
+            break
+        for _, file_path, thumbnail_path, preview_path in rows:
+            # Renditions are derived from file_path, so count them even while
+            # the row is still PENDING and its rendition columns are blank.
+            for key in (file_path, thumbnail_path, preview_path, *rendition_paths(file_path)):
+                if key:
+                    referenced.add(os.path.join(media_root, key))
+        last_pk = rows[-1][0]
+
+    # Open resumable uploads own their preallocated staging file.
+    tmp_dir = _staging_dir()
+    for session_id in UploadSession.objects.filter(status=UploadSessionStatus.OPEN).values_list("id", flat=True):
+        referenced.add(os.path.join(tmp_dir, f"{session_id}.upload"))
+    return referenced
+
+
+def _scan_tree(top: str, referenced: set[str], cutoff: float, skip: frozenset[str], recursive: bool = True):
+    scanned = 0
+    orphans = []
+    stack = [top]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive and entry.path not in skip:
+                    stack.append(entry.path)
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            scanned += 1
+            if entry.path in referenced:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            # The grace period covers uploads and renditions that are written
+            # to disk a moment before their row is committed.
+            if stat.st_mtime < cutoff:
+                orphans.append(Orphan(Path(entry.path), stat.st_size, stat.st_mtime))
+    return scanned, orphans
+
+
+def _key_for(path: Path, media_root: Path) -> str | None:
+    # Storage key of the original a scanned file belongs to; None for staging files.
+    try:
+        key = path.relative_to(media_root).as_posix()
+    except ValueError:
+        return None
+    for suffix in RENDITION_SUFFIXES:
+        if key.endswith(suffix):
+            return key[: -len(suffix)]
+    return key
+
+
+def _drop_rereferenced(orphans: list[Orphan], media_root: Path, documents) -> list[Orphan]:
+    # The reference set was loaded before the scan; an upload that deduplicated
+    # onto an "orphan" in the meantime must not lose its file.
+    keys = {o.path: _key_for(o.path, media_root) for o in orphans}
+    wanted = sorted({k for k in keys.values() if k})
+    live = set()
+    for i in range(0, len(wanted), RECLAIM_CHUNK):
+        live.update(
+            documents.filter(file_path__in=wanted[i:i + RECLAIM_CHUNK]).values_list("file_path", flat=True)
+        )
+    return [o for o in orphans if keys[o.path] not in live]
+
+
+def _documents_queryset(soft_deleted_before: datetime.datetime | None):
+    documents = ApplicationDocument.objects.all()
+    if soft_deleted_before is not None:
+        # Past retention, a soft-deleted application no longer pins its files
+        # (unless identical content is still referenced by a live one).
+        documents = documents.exclude(application__soft_deleted_at__lt=soft_deleted_before)
+    return documents
+
+
+def find_orphans(
+    storage,
+    grace: datetime.timedelta,
+    soft_deleted_retention: datetime.timedelta | None = None,
+    workers: int = 8,
+) -> GcReport:
+    root = _documents_root(storage)
+    media_root = root.parent
+    soft_deleted_before = timezone.now() - soft_deleted_retention if soft_deleted_retention is not None else None
+    documents = _documents_queryset(soft_deleted_before)
+    referenced = referenced_paths(media_root, documents)
+    cutoff = time.time() - grace.total_seconds()
+    skip = frozenset({os.fspath(Path(settings.DOCUMENT_GC_QUARANTINE_DIR).resolve())})
+
+    tops = [root]
+    tmp_dir = _staging_dir()
+    if tmp_dir != root and root not in tmp_dir.parents:
+        tops.append(tmp_dir)
+
+    # Work items are (directory, recursive). The top-level dirs and documents/cas
+    # itself are listed shallowly; every subtree below them (the 256 CAS
+    # fan-out dirs, legacy <app_id>/ folders, tmp) is its own pool task.
+    # scandir/stat spend their time in syscalls, which release the GIL.
+    tasks = []
+    cas_dir = os.fspath(media_root / CAS_PREFIX)
+    pending = [os.fspath(top) for top in tops]
+    while pending:
+        directory = pending.pop()
+        tasks.append((directory, False))
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = [e.path for e in entries if e.is_dir(follow_symlinks=False) and e.path not in skip]
+        except FileNotFoundError:
+            continue
+        for subdir in subdirs:
+            if subdir == cas_dir:
+                pending.append(subdir)
+            else:
+                tasks.append((subdir, True))
+
+    report = GcReport(cutoff=cutoff, soft_deleted_before=soft_deleted_before)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda task: _scan_tree(task[0], referenced, cutoff, skip, recursive=task[1]), tasks)
+        for scanned, orphans in results:
+            report.scanned_files += scanned
+            report.orphans.extend(orphans)
+
+    report.orphans = sorted(_drop_rereferenced(report.orphans, media_root, documents), key=lambda o: o.path)
+    return report
+
+
+def reclaim(report: GcReport, storage, quarantine: bool = True) -> None:
+    """
+    Delete the report's orphans, or move them under DOCUMENT_GC_QUARANTINE_DIR
+    (keeping their relative path) for later review. Staging leftovers are
+    always deleted; they were never documents. Each batch is checked against
+    the database and the file's mtime again just before it is touched, so a
+    file re-referenced since the scan is skipped and left for the next run.
+    """
+    media_root = _documents_root(storage).parent
+    staging_dir = _staging_dir()
+    quarantine_dir = Path(settings.DOCUMENT_GC_QUARANTINE_DIR)
+    documents = _documents_queryset(report.soft_deleted_before)
+    for i in range(0, len(report.orphans), RECLAIM_CHUNK):
+        batch = report.orphans[i:i + RECLAIM_CHUNK]
+        still_orphaned = _drop_rereferenced(batch, media_root, documents)
+        report.skipped += len(batch) - len(still_orphaned)
+        for orphan in still_orphaned:
+            try:
+                # A deduplicated upload touches the file before its row commits.
+                if orphan.path.stat().st_mtime >= report.cutoff:
+                    report.skipped += 1
+                    continue
+                if quarantine and staging_dir not in orphan.path.parents:
+                    target = quarantine_dir / orphan.path.relative_to(media_root)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.move(orphan.path, target)
+                else:
+                    orphan.path.unlink()
+            except FileNotFoundError:
+                continue
+            report.reclaimed += 1
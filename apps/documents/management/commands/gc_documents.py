@@ -0,0 +1,77 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from apps.documents.gc import find_orphans, reclaim
+from apps.documents.storage import get_document_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Find document files no longer referenced by any ApplicationDocument "
+        "(superseded uploads, stale renditions, staging leftovers) and "
+        "quarantine or delete them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be reclaimed.",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete orphans outright instead of moving them to DOCUMENT_GC_QUARANTINE_DIR.",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=settings.DOCUMENT_GC_GRACE_HOURS,
+            help="Leave files modified within this many hours alone.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Threads used to scan the media tree.",
+        )
+        parser.add_argument(
+            "--verbose-list",
+            action="store_true",
+            help="Print every orphaned path.",
+        )
+
+    def handle(self, *args, **options):
+        retention_days = settings.DOCUMENT_GC_SOFT_DELETE_RETENTION_DAYS
+        storage = get_document_storage()
+        try:
+            report = find_orphans(
+                storage,
+                grace=datetime.timedelta(hours=options["grace_hours"]),
+                soft_deleted_retention=datetime.timedelta(days=retention_days) if retention_days is not None else None,
+                workers=options["workers"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["verbose_list"]:
+            for orphan in report.orphans:
+                self.stdout.write(f"{orphan.size:>12}  {orphan.path}")
+
+        summary = (
+            f"Scanned {report.scanned_files} file(s); {len(report.orphans)} orphan(s), "
+            f"{filesizeformat(report.orphan_bytes)} reclaimable."
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"[dry run] {summary}")
+            return
+
+        reclaim(report, storage, quarantine=not options["delete"])
+        action = "Deleted" if options["delete"] else "Quarantined"
+        message = f"{summary} {action} {report.reclaimed} file(s)."
+        if report.skipped:
+            message += f" Skipped {report.skipped} referenced or touched since the scan."
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.documents.previews import process_next_pending_preview
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and previews for uploaded documents awaiting them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running as a worker, polling for new uploads.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty (with --loop).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Stop after this many documents (0 = no limit).",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while not options["limit"] or processed < options["limit"]:
+            document = process_next_pending_preview()
+            if document is None:
+                if not options["loop"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} document(s)."))
@@ -0,0 +1,22 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.documents.services import purge_stale_upload_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned and finished chunked-upload sessions and their temp files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=settings.DOCUMENT_UPLOAD_SESSION_TTL_HOURS,
+            help="Purge sessions idle for longer than this many hours.",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_stale_upload_sessions(datetime.timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} upload session(s)."))
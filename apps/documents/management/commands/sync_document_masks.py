@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.applications.models import VisaApplication
+from apps.documents.services import refresh_required_masks, sync_document_masks
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-application document bitmasks and completeness flag. "
+        "Changes to required_documents in the visa rules are picked up after "
+        "every migrate; run this to repair masks edited outside the services."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Applications locked and rewritten per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_required_masks()
+        if refreshed:
+            self.stdout.write(f"Required documents changed for {refreshed} visa type(s).")
+        batch_size = options["batch_size"]
+        ids = VisaApplication.objects.order_by("pk").values_list("pk", flat=True)
+        synced = 0
+        batch = []
+        for application_id in ids.iterator(chunk_size=batch_size):
+            batch.append(application_id)
+            if len(batch) == batch_size:
+                sync_document_masks(batch)
+                synced += len(batch)
+                batch = []
+        if batch:
+            sync_document_masks(batch)
+            synced += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Synced document masks for {synced} application(s)."))
@@ -0,0 +1,27 @@
+from apps.documents.choices import DocumentType
+from rules.engine import get_required_documents
+
+# One bit per DocumentType, in declaration order. Masks are persisted on
+# VisaApplication, so new types must only ever be appended to DocumentType.
+DOCUMENT_TYPE_BITS: dict[str, int] = {value: 1 << i for i, value in enumerate(DocumentType.values)}
+
+
+def document_mask(document_types) -> int:
+    mask = 0
+    for document_type in document_types:
+        mask |= DOCUMENT_TYPE_BITS.get(document_type, 0)
+    return mask
+
+
+def document_types(mask: int) -> list[str]:
+    return [value for value, bit in DOCUMENT_TYPE_BITS.items() if mask & bit]
+
+
+def required_documents_mask(visa_type_code: str) -> int:
+    # Rule-file entries that are not a DocumentType can never be uploaded, so
+    # they carry no bit.
+    return document_mask(get_required_documents(visa_type_code))
+
+
+def is_complete(supplied_mask: int, required_mask: int) -> bool:
+    return supplied_mask & required_mask == required_mask
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='original_name',
+            field=models.CharField(blank=True, default='', help_text='Filename as supplied by the applicant; the stored path is content-addressed.', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='size_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='preview_path',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='preview_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('READY', 'Ready'), ('FAILED', 'Failed'), ('UNSUPPORTED', 'Unsupported')], db_index=True, default='PENDING', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='thumbnail_path',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+    ]
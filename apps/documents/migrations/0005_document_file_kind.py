@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+
+def sniff_existing_documents(apps, schema_editor):
+    # Documents uploaded before file_kind existed: read their first bytes
+    # back from storage. Missing files stay blank and are served as
+    # downloads.
+    from apps.documents.storage import get_document_storage
+    from apps.documents.validation import SNIFF_BYTES, sniff_kind
+
+    ApplicationDocument = apps.get_model("documents", "ApplicationDocument")
+    storage = get_document_storage()
+    kinds = {}
+    for pk, file_path in ApplicationDocument.objects.filter(file_kind="").values_list("pk", "file_path").iterator():
+        try:
+            with storage.open(file_path) as fh:
+                kind = sniff_kind(fh.read(SNIFF_BYTES))
+        except (OSError, ValueError):
+            continue
+        if kind:
+            kinds.setdefault(kind, []).append(pk)
+    for kind, pks in kinds.items():
+        for start in range(0, len(pks), 1000):
+            ApplicationDocument.objects.filter(pk__in=pks[start:start + 1000]).update(file_kind=kind)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_previews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='file_kind',
+            field=models.CharField(blank=True, default='', help_text='Format sniffed from the content on upload (pdf, jpeg, png); decides how it is served.', max_length=10),
+        ),
+        migrations.RunPython(sniff_existing_documents, migrations.RunPython.noop),
+    ]
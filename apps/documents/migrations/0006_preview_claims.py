@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_document_file_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='preview_claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a preview worker took the document; stale claims are taken over.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='applicationdocument',
+            name='preview_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('READY', 'Ready'), ('FAILED', 'Failed'), ('UNSUPPORTED', 'Unsupported')], db_index=True, default='PENDING', max_length=12),
+        ),
+    ]
@@ -1,6 +1,8 @@
-from django.db import models
+import uuid
+from django.conf import settings
+from django.db import models, transaction
 
-from .choices import DocumentType
+from .choices import DocumentType, PreviewStatus, UploadSessionStatus
 
 
 class ApplicationDocument(models.Model):
@@ -19,6 +21,38 @@ class ApplicationDocument(models.Model):
         max_length=512,
         help_text="Relative path or object-storage key for the uploaded file.",
     )
+    original_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="Filename as supplied by the applicant; the stored path is content-addressed.",
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        db_index=True,              # dedup lookups and integrity checks go by content hash
+    )
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    file_kind = models.CharField(
+        max_length=10,
+        blank=True,
+        default="",
+        help_text="Format sniffed from the content on upload (pdf, jpeg, png); decides how it is served.",
+    )
+    preview_status = models.CharField(
+        max_length=12,
+        choices=PreviewStatus.choices,
+        default=PreviewStatus.PENDING,
+        db_index=True,              # preview worker polls for PENDING rows
+    )
+    preview_claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a preview worker took the document; stale claims are taken over.",
+    )
+    thumbnail_path = models.CharField(max_length=512, blank=True, default="")
+    preview_path = models.CharField(max_length=512, blank=True, default="")
     verified = models.BooleanField(
         default=False,
         db_index=True,              # index lets verification dashboard query unverified docs
@@ -46,6 +80,119 @@ class ApplicationDocument(models.Model):
             ),
         ]
 
+    def save(self, *args, **kwargs) -> None:
+        # Keeps VisaApplication's document bitmasks in step with every
+        # instance save. Queryset .update()/.delete() bypass this and must call
+        # sync_document_masks themselves.
+        from apps.documents.services import sync_document_masks
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            sync_document_masks([self.application_id])
+
+    def delete(self, *args, **kwargs):
+        from apps.documents.services import sync_document_masks
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            sync_document_masks([self.application_id])
+        return result
+
     def __str__(self) -> str:
         return f"{self.document_type} for application {self.application_id}"
 
+
+class UploadSession(models.Model):
+    """
+    Server-side state for a resumable chunked upload.
+    Verified chunks are copied into a preallocated temp file at their offset;
+    the session row only tracks which chunks have arrived intact.
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+    )
+    application = models.ForeignKey(
+        "applications.VisaApplication",
+        on_delete=models.CASCADE,   # CASCADE: sessions are transient and hold no evidence
+        related_name="upload_sessions",
+    )
+    uploader = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+    )
+    document_type = models.CharField(
+        max_length=30,
+        choices=DocumentType.choices,
+    )
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    expected_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Optional whole-file hash supplied by the client; checked on completion.",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=UploadSessionStatus.choices,
+        default=UploadSessionStatus.OPEN,
+    )
+    document = models.ForeignKey(
+        ApplicationDocument,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        help_text="Document produced by this session once completed.",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "documents_uploadsession"
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+        indexes = [
+            models.Index(
+                fields=["status", "updated_at"],
+                name="idx_upload_status_updated",   # abandoned-session cleanup scan
+            ),
+        ]
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.total_size // self.chunk_size)
+
+    def __str__(self) -> str:
+        return f"Upload {self.id} ({self.document_type}) [{self.status}]"
+
+
+class UploadChunk(models.Model):
+    session = models.ForeignKey(
+        UploadSession,
+        on_delete=models.CASCADE,
+        related_name="chunks",
+    )
+    index = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "documents_uploadchunk"
+        verbose_name = "Upload Chunk"
+        verbose_name_plural = "Upload Chunks"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session", "index"],
+                name="uq_upload_chunk_session_index",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Chunk {self.index} of upload {self.session_id}"
@@ -0,0 +1,148 @@
+import datetime
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.documents.choices import PreviewStatus
+from apps.documents.models import ApplicationDocument
+from apps.documents.storage import get_document_storage
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (256, 256)
+PREVIEW_SIZE = (1280, 1280)
+JPEG_QUALITY = 80
+PREVIEW_CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
+PDF_SIGNATURE = b"%PDF-"
+
+
+def rendition_paths(file_path: str) -> tuple[str, str]:
+    # Renditions sit next to the content-addressed original, so documents that
+    # share a file also share their previews.
+    return f"{file_path}.thumb.jpg", f"{file_path}.preview.jpg"
+
+
+def _render_jpeg(image, size) -> io.BytesIO:
+    copy = image.copy()
+    copy.thumbnail(size)
+    out = io.BytesIO()
+    copy.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    out.seek(0)
+    return out
+
+
+def _first_pdf_page(storage, file_path: str):
+    # Pillow cannot rasterise PDFs; poppler's pdftoppm is used when installed.
+    from PIL import Image
+
+    pdftoppm = shutil.which("pdftoppm")
+    if pdftoppm is None:
+        return None
+
+    with tempfile.TemporaryDirectory() as work:
+        source = storage.local_path(file_path)
+        if source is None:
+            source = os.path.join(work, "source.pdf")
+            with storage.open(file_path) as src, open(source, "wb") as dest:
+                shutil.copyfileobj(src, dest)
+        out_base = os.path.join(work, "page")
+        subprocess.run(
+            [pdftoppm, "-f", "1", "-l", "1", "-r", "100", "-png", "-singlefile", str(source), out_base],
+            check=True,
+            capture_output=True,
+            timeout=60,
+        )
+        with Image.open(out_base + ".png") as page:
+            page.load()
+            return page.convert("RGB")
+
+
+def _load_image(storage, file_path: str):
+    from PIL import Image
+
+    with storage.open(file_path) as fh:
+        head = fh.read(8)
+    if head.startswith(PDF_SIGNATURE):
+        return _first_pdf_page(storage, file_path)
+    if not head.startswith(IMAGE_SIGNATURES):
+        return None
+    with storage.open(file_path) as fh:
+        with Image.open(fh) as image:
+            image.draft("RGB", PREVIEW_SIZE)   # JPEG: decode at reduced scale
+            return image.convert("RGB")
+
+
+def generate_renditions(document: ApplicationDocument) -> str:
+    """Write thumbnail and preview for *document*; returns the resulting PreviewStatus."""
+    storage = get_document_storage()
+    thumb_path, preview_path = rendition_paths(document.file_path)
+
+    if not (storage.exists(thumb_path) and storage.exists(preview_path)):
+        image = _load_image(storage, document.file_path)
+        if image is None:
+            return PreviewStatus.UNSUPPORTED
+        storage.save(thumb_path, _render_jpeg(image, THUMBNAIL_SIZE))
+        storage.save(preview_path, _render_jpeg(image, PREVIEW_SIZE))
+
+    # Guard on the hash: a re-upload while we were rendering leaves the row PENDING.
+    ApplicationDocument.objects.filter(pk=document.pk, sha256=document.sha256).update(
+        preview_status=PreviewStatus.READY,
+        thumbnail_path=thumb_path,
+        preview_path=preview_path,
+    )
+    return PreviewStatus.READY
+
+
+def _claim_next_document() -> ApplicationDocument | None:
+    # The claim commits at once, so the row lock lasts one UPDATE rather than
+    # the whole render: a re-upload of the same document never waits behind
+    # pdftoppm. SKIP LOCKED lets several workers share the queue; a claim
+    # older than PREVIEW_CLAIM_TIMEOUT belongs to a crashed worker and is
+    # taken over.
+    now = timezone.now()
+    with transaction.atomic():
+        document = (
+            ApplicationDocument.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(preview_status=PreviewStatus.PENDING)
+                | Q(preview_status=PreviewStatus.PROCESSING, preview_claimed_at__lt=now - PREVIEW_CLAIM_TIMEOUT)
+            )
+            .only("id", "file_path", "sha256")
+            .order_by("id")
+            .first()
+        )
+        if document is None:
+            return None
+        ApplicationDocument.objects.filter(pk=document.pk).update(
+            preview_status=PreviewStatus.PROCESSING,
+            preview_claimed_at=now,
+        )
+    return document
+
+
+def process_next_pending_preview() -> ApplicationDocument | None:
+    document = _claim_next_document()
+    if document is None:
+        return None
+    # Rendered outside any transaction. Results are written guarded on the
+    # hash, so a re-upload meanwhile stays PENDING for the next pass.
+    try:
+        status = generate_renditions(document)
+    except Exception:
+        logger.exception("Preview generation failed for document %s", document.pk)
+        status = PreviewStatus.FAILED
+    if status != PreviewStatus.READY:
+        ApplicationDocument.objects.filter(pk=document.pk, sha256=document.sha256).update(
+            preview_status=status,
+        )
+    return document
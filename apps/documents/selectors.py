@@ -0,0 +1,43 @@
+import uuid
+
+from django.db.models import Q
+
+from apps.documents.models import ApplicationDocument
+
+
+def parse_verification_cursor(cursor: str) -> tuple[uuid.UUID, int] | None:
+    application_id, _, document_id = (cursor or "").partition(":")
+    try:
+        return uuid.UUID(application_id), int(document_id)
+    except ValueError:
+        return None
+
+
+def get_unverified_documents(after: tuple[uuid.UUID, int] | None = None, limit: int = 100):
+    # Keyset pagination on (application_id, id): rides idx_doc_app_verified,
+    # whose InnoDB entries end in the primary key, so every page is an index
+    # range scan no matter how deep the officer has paged.
+    qs = (
+        ApplicationDocument.objects
+        .filter(verified=False, application__soft_deleted_at__isnull=True)
+        .select_related("application__visa_type")
+        .only(
+            "id", "document_type", "uploaded_at", "size_bytes", "preview_status",
+            "application__id", "application__status", "application__nationality",
+            "application__visa_type__name",
+        )
+        .order_by("application_id", "id")
+    )
+    if after is not None:
+        application_id, document_id = after
+        qs = qs.filter(
+            Q(application_id__gt=application_id)
+            | Q(application_id=application_id, id__gt=document_id)
+        )
+    page = list(qs[: limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = f"{last.application_id}:{last.pk}"
+    return page, next_cursor
@@ -1,32 +1,403 @@
+import datetime
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.lookups import Exact
+from django.utils import timezone
+
+from apps.applications.exceptions import UploadError
+from apps.documents.choices import PreviewStatus, UploadSessionStatus
+from apps.documents.masks import DOCUMENT_TYPE_BITS, is_complete, required_documents_mask
+from apps.documents.models import ApplicationDocument, UploadChunk, UploadSession
+from apps.documents.storage import get_document_storage
+from apps.documents.validation import (
+    SNIFF_BYTES,
+    StreamingUploadValidator,
+    check_declared_size,
+    check_kind,
+    sniff_kind,
+)
 from rules.engine import get_required_documents
 
+# Content-addressed layout: documents/cas/ab/cd/abcd…  — two fan-out levels keep
+# any single directory small even with millions of distinct files.
+CAS_PREFIX = "documents/cas"
+
+
+@dataclass
+class StoredFile:
+    path: str       # storage key
+    sha256: str
+    size_bytes: int
+    created: bool   # False when an identical file was already stored
+    kind: str = ""  # sniffed format, see validation.FILE_SIGNATURES
+
+
+def cas_path_for(digest: str) -> str:
+    return f"{CAS_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def _commit_to_cas(tmp_name: str, digest: str, size: int, kind: str | None) -> StoredFile:
+    # Shared tail of every upload path: hand a fully written staging file to the
+    # document storage, or drop it if identical content is already stored
+    # (possibly for another application).
+    storage = get_document_storage()
+    rel_path = cas_path_for(digest)
+    if storage.exists(rel_path):
+        os.unlink(tmp_name)
+        local = storage.local_path(rel_path)
+        if local is not None:
+            # Re-referenced: restart gc_documents' grace period for this file.
+            os.utime(local)
+        return StoredFile(path=rel_path, sha256=digest, size_bytes=size, created=False, kind=kind or "")
+
+    storage.save_from_path(rel_path, tmp_name)
+    return StoredFile(path=rel_path, sha256=digest, size_bytes=size, created=True, kind=kind or "")
+
+
+def _tmp_dir() -> Path:
+    # Staging always happens on local scratch disk, whatever the storage backend.
+    tmp_dir = Path(settings.DOCUMENT_UPLOAD_TMP_DIR)
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    return tmp_dir
+
+
+def store_uploaded_file(uploaded, document_type: str | None = None) -> StoredFile:
+    staged_sha256 = getattr(uploaded, "sha256", "")
+    if staged_sha256 and hasattr(uploaded, "temporary_file_path"):
+        # Already streamed, hashed and validated into staging by
+        # ValidatingUploadHandler — publishing it is just a rename.
+        uploaded.file.flush()
+        return _commit_to_cas(uploaded.temporary_file_path(), staged_sha256, uploaded.size, uploaded.kind)
+
+    # Single pass over the upload: each chunk is validated, hashed and written
+    # to a staging file; with local storage on the same filesystem the final
+    # rename is atomic.
+    validator = StreamingUploadValidator(document_type)
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=_tmp_dir(), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as dest:
+            for chunk in uploaded.chunks():
+                validator.feed(chunk)
+                hasher.update(chunk)
+                size += len(chunk)
+                dest.write(chunk)
+        validator.finish()
+        return _commit_to_cas(tmp_name, hasher.hexdigest(), size, validator.kind)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _record_document(application, document_type: str, stored: StoredFile, original_name: str) -> ApplicationDocument:
+    document, _ = ApplicationDocument.objects.update_or_create(
+        application=application,
+        document_type=document_type,
+        defaults={
+            "file_path": stored.path,
+            "original_name": os.path.basename(original_name or "")[:255],
+            "sha256": stored.sha256,
+            "size_bytes": stored.size_bytes,
+            "file_kind": stored.kind,
+            "verified": False,
+            "preview_status": PreviewStatus.PENDING,
+            "thumbnail_path": "",
+            "preview_path": "",
+            # auto_now_add only fires on insert; a re-upload is a new version.
+            "uploaded_at": timezone.now(),
+        },
+    )
+    return document
+
+
+@transaction.atomic
+def save_application_document(application, document_type: str, uploaded) -> ApplicationDocument:
+    stored = store_uploaded_file(uploaded, document_type)
+    return _record_document(application, document_type, stored, uploaded.name)
+
+
+# ── Resumable chunked uploads ────────────────────────────────────────────────
+
+def _session_tmp_path(session: UploadSession) -> Path:
+    return _tmp_dir() / f"{session.id}.upload"
+
+
+def start_upload_session(
+    application,
+    uploader,
+    document_type: str,
+    original_name: str,
+    total_size: int,
+    expected_sha256: str = "",
+) -> UploadSession:
+    if total_size <= 0:
+        raise UploadError("Upload size must be positive.")
+    # Oversized uploads are refused before a single byte is sent.
+    check_declared_size(total_size, document_type)
+
+    session = UploadSession.objects.create(
+        application=application,
+        uploader=uploader,
+        document_type=document_type,
+        original_name=os.path.basename(original_name or "")[:255],
+        total_size=total_size,
+        chunk_size=settings.DOCUMENT_UPLOAD_CHUNK_BYTES,
+        expected_sha256=expected_sha256.lower(),
+    )
+    # Preallocate (sparse) so chunks can land in any order at their offset.
+    with open(_session_tmp_path(session), "wb") as fh:
+        fh.truncate(total_size)
+    return session
+
+
+def write_upload_chunk(session: UploadSession, offset: int, stream, length: int, chunk_sha256: str) -> UploadChunk:
+    if session.status != UploadSessionStatus.OPEN:
+        raise UploadError(f"Upload {session.id} is already {session.status}.")
+    if offset % session.chunk_size or offset >= session.total_size:
+        raise UploadError(f"Offset {offset} is not a chunk boundary of upload {session.id}.")
+
+    index = offset // session.chunk_size
+    expected_length = min(session.chunk_size, session.total_size - offset)
+    if length != expected_length:
+        raise UploadError(
+            f"Chunk {index} of upload {session.id} must be {expected_length} bytes, got {length}."
+        )
+
+    hasher = hashlib.sha256()
+    received = 0
+    first_piece = b""
+    if index == 0:
+        # The first chunk decides the file type; a wrong one kills the session
+        # before anything is written. Socket reads can come back short, so
+        # read until there is enough to sniff.
+        wanted = min(SNIFF_BYTES, length)
+        while len(first_piece) < wanted:
+            piece = stream.read(min(64 * 1024, length) - len(first_piece))
+            if not piece:
+                raise UploadError(f"Chunk {index} of upload {session.id} was truncated.")
+            first_piece += piece
+        try:
+            check_kind(sniff_kind(first_piece), session.document_type)
+        except UploadError:
+            abort_upload_session(session)
+            raise
+
+    # The chunk is staged in a scratch file and only copied to its offset once
+    # its checksum holds, so a bad re-send cannot spoil bytes already recorded.
+    with tempfile.TemporaryFile(dir=_tmp_dir()) as scratch:
+        while received < length:
+            piece = first_piece or stream.read(min(64 * 1024, length - received))
+            first_piece = b""
+            if not piece:
+                break
+            hasher.update(piece)
+            scratch.write(piece)
+            received += len(piece)
+
+        digest = hasher.hexdigest()
+        if received != length:
+            raise UploadError(f"Chunk {index} of upload {session.id} was truncated.")
+        if digest != chunk_sha256.lower():
+            raise UploadError(f"Checksum mismatch for chunk {index} of upload {session.id}.")
+
+        scratch.seek(0)
+        with transaction.atomic():
+            # Locked for the copy: complete_upload_session takes the same lock
+            # before moving the file into CAS, so no write can land in a blob.
+            locked = UploadSession.objects.select_for_update().filter(pk=session.pk).first()
+            if locked is None:
+                raise UploadError(f"Upload {session.id} no longer exists.")
+            if locked.status != UploadSessionStatus.OPEN:
+                raise UploadError(f"Upload {session.id} is already {locked.status}.")
+            with open(_session_tmp_path(session), "r+b") as fh:
+                fh.seek(offset)
+                shutil.copyfileobj(scratch, fh)
+
+            # The lock also serialises retries of the same chunk.
+            chunk, _ = UploadChunk.objects.update_or_create(
+                session=locked,
+                index=index,
+                defaults={"size": length, "sha256": digest, "received_at": timezone.now()},
+            )
+            UploadSession.objects.filter(pk=session.pk).update(updated_at=timezone.now())
+    return chunk
+
+
+def abort_upload_session(session: UploadSession) -> None:
+    try:
+        os.unlink(_session_tmp_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def missing_chunk_indices(session: UploadSession) -> list[int]:
+    received = set(session.chunks.values_list("index", flat=True))
+    return [i for i in range(session.chunk_count) if i not in received]
+
+
+@transaction.atomic
+def complete_upload_session(session: UploadSession) -> ApplicationDocument:
+    session = UploadSession.objects.select_for_update().get(pk=session.pk)
+    if session.status == UploadSessionStatus.COMPLETED and session.document is not None:
+        # Retried finalize after a dropped response — hand back the same document.
+        return session.document
+
+    missing = missing_chunk_indices(session)
+    if missing:
+        raise UploadError(
+            f"Upload {session.id} is missing {len(missing)} chunk(s), first: {missing[0]}."
+        )
+
+    tmp_path = _session_tmp_path(session)
+    hasher = hashlib.sha256()
+    with open(tmp_path, "rb") as fh:
+        kind = sniff_kind(fh.read(SNIFF_BYTES))
+        fh.seek(0)
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    if session.expected_sha256 and digest != session.expected_sha256:
+        raise UploadError(f"Assembled file for upload {session.id} does not match the expected hash.")
+
+    stored = _commit_to_cas(str(tmp_path), digest, session.total_size, kind)
+    document = _record_document(session.application, session.document_type, stored, session.original_name)
+
+    session.status = UploadSessionStatus.COMPLETED
+    session.document = document
+    session.save(update_fields=["status", "document", "updated_at"])
+    session.chunks.all().delete()
+    return document
+
+
+def purge_stale_upload_sessions(older_than: datetime.timedelta) -> int:
+    # Completed sessions only keep their row for idempotent finalize retries;
+    # open ones past the TTL are treated as abandoned.
+    cutoff = timezone.now() - older_than
+    purged = 0
+    stale = UploadSession.objects.filter(updated_at__lt=cutoff).only("id", "status")
+    for session in stale.iterator(chunk_size=500):
+        abort_upload_session(session)
+        purged += 1
+    return purged
+
+
+@transaction.atomic
+def sync_document_masks(application_ids) -> None:
+    """
+    Recompute the supplied/verified DocumentType bitmasks and the completeness
+    flag on the given applications from their ApplicationDocument rows.
+    """
+    from apps.applications.models import VisaApplication
+
+    ids = set(application_ids)
+    if not ids:
+        return
+    # Row locks serialise concurrent uploads to the same application, so the
+    # last writer always recomputes from everything committed before it.
+    applications = list(
+        VisaApplication.objects
+        .select_for_update(of=("self",))
+        .select_related("visa_type")
+        .only("id", "visa_type__code")
+        .filter(pk__in=ids)
+        .order_by("pk")
+    )
+    supplied = dict.fromkeys(ids, 0)
+    verified = dict.fromkeys(ids, 0)
+    rows = ApplicationDocument.objects.filter(application_id__in=ids).values_list(
+        "application_id", "document_type", "verified"
+    )
+    for application_id, document_type, is_verified in rows:
+        bit = DOCUMENT_TYPE_BITS.get(document_type, 0)
+        supplied[application_id] |= bit
+        if is_verified:
+            verified[application_id] |= bit
+
+    required_masks: dict[str, int] = {}
+    for application in applications:
+        code = application.visa_type.code
+        if code not in required_masks:
+            required_masks[code] = required_documents_mask(code)
+        application.documents_supplied_mask = supplied[application.pk]
+        application.documents_verified_mask = verified[application.pk]
+        application.documents_complete = is_complete(supplied[application.pk], required_masks[code])
+    VisaApplication.objects.bulk_update(
+        applications,
+        ["documents_supplied_mask", "documents_verified_mask", "documents_complete"],
+    )
+
+
+def refresh_required_masks() -> int:
+    """
+    Recompute documents_complete for the applications of every visa type
+    whose required documents changed in the visa rules since the last run,
+    with one UPDATE per changed type. Returns the number of visa types
+    refreshed. Runs after every migrate (see DocumentsConfig) and from the
+    sync_document_masks command.
+    """
+    from apps.applications.models import VisaApplication
+    from apps.visas.models import VisaType
+
+    refreshed = 0
+    for visa_type in VisaType.objects.only("id", "code", "required_documents_mask").order_by("pk"):
+        mask = required_documents_mask(visa_type.code)
+        if visa_type.required_documents_mask == mask:
+            continue
+        with transaction.atomic():
+            VisaApplication.objects.filter(visa_type=visa_type).update(
+                documents_complete=Exact(F("documents_supplied_mask").bitand(mask), mask),
+            )
+            VisaType.objects.filter(pk=visa_type.pk).update(required_documents_mask=mask)
+        refreshed += 1
+    return refreshed
+
 
 def validate_required_documents(application) -> bool:
-    return len(list_missing_documents(application)) == 0
+    return is_complete(
+        application.documents_supplied_mask,
+        required_documents_mask(application.visa_type.code),
+    )
 
 
 def list_missing_documents(application) -> list[str]:
     # Required list comes from the rule engine, not hardcoded here.
     required = get_required_documents(application.visa_type.code)
-    supplied = set(
-        application.documents.values_list("document_type", flat=True)
-    )
-    return [doc for doc in required if doc not in supplied]
+    supplied = application.documents_supplied_mask
+    return [
+        doc for doc in required
+        if doc in DOCUMENT_TYPE_BITS and not supplied & DOCUMENT_TYPE_BITS[doc]
+    ]
 
 
 def get_document_summary(application) -> dict:
     required = get_required_documents(application.visa_type.code)
-    supplied_qs = application.documents.values("document_type", "verified", "uploaded_at")
-    supplied_map = {d["document_type"]: d for d in supplied_qs}
+    supplied_mask = application.documents_supplied_mask
+    verified_mask = application.documents_verified_mask
+    # Only the upload timestamps still need the documents table, and only
+    # when something has been uploaded.
+    uploaded_at = dict(
+        application.documents.values_list("document_type", "uploaded_at")
+    ) if supplied_mask else {}
 
     summary = []
     for doc_type in required:
-        record = supplied_map.get(doc_type)
+        bit = DOCUMENT_TYPE_BITS.get(doc_type, 0)
         summary.append({
             "document_type": doc_type,
-            "uploaded": record is not None,
-            "verified": record["verified"] if record else False,
-            "uploaded_at": record["uploaded_at"] if record else None,
+            "uploaded": bool(supplied_mask & bit),
+            "verified": bool(verified_mask & bit),
+            "uploaded_at": uploaded_at.get(doc_type),
         })
 
     return {
@@ -35,3 +406,50 @@ def get_document_summary(application) -> dict:
         "all_uploaded": all(item["uploaded"] for item in summary),
         "all_verified": all(item["verified"] for item in summary),
     }
+
+
+BULK_VERIFY_MAX = 1000
+
+
+@transaction.atomic
+def bulk_set_verified(document_ids, verified: bool, actor) -> int:
+    # Only rows whose flag actually changes are touched or audited, so
+    # re-submitting the same selection is a no-op.
+    if len(document_ids) > BULK_VERIFY_MAX:
+        raise ValueError(f"At most {BULK_VERIFY_MAX} documents can be updated per request.")
+
+    rows = list(
+        ApplicationDocument.objects
+        .select_for_update()
+        .filter(
+            pk__in=document_ids,
+            verified=not verified,
+            application__soft_deleted_at__isnull=True,
+        )
+        .values_list("pk", "application_id", "application__status", "document_type")
+    )
+    if not rows:
+        return 0
+
+    ApplicationDocument.objects.filter(pk__in=[row[0] for row in rows]).update(verified=verified)
+    sync_document_masks({row[1] for row in rows})
+
+    by_application: dict = {}
+    for _, application_id, status, document_type in rows:
+        entry = by_application.setdefault(application_id, {"status": status, "types": []})
+        entry["types"].append(document_type)
+
+    from apps.audit.services import log_events
+
+    verb = "verified" if verified else "marked unverified"
+    log_events([
+        {
+            "application_id": application_id,
+            "previous_status": entry["status"],
+            "new_status": entry["status"],   # status unchanged; document event only
+            "actor": actor,
+            "reason": f"Documents {verb} by {actor.email}: {', '.join(sorted(entry['types']))}.",
+        }
+        for application_id, entry in by_application.items()
+    ])
+    return len(rows)
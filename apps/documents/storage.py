@@ -0,0 +1,304 @@
+import abc
+import functools
+import io
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+STREAM_BLOCK_SIZE = 64 * 1024
+# S3 error codes for a missing object: head_object reports a bare 404,
+# get_object NoSuchKey.
+NOT_FOUND_CODES = frozenset({"404", "NoSuchKey", "NotFound"})
+
+
+class DocumentStorage(abc.ABC):
+    """
+    Minimal storage contract for uploaded documents. Keys are the relative
+    paths recorded in ApplicationDocument.file_path; callers never build
+    filesystem paths themselves.
+    """
+
+    @abc.abstractmethod
+    def save(self, key: str, content: BinaryIO) -> None:
+        ...
+
+    def save_from_path(self, key: str, local_path: str) -> None:
+        # Default: copy then discard the staging file. Backends that share a
+        # filesystem with the staging area override this with a rename.
+        with open(local_path, "rb") as fh:
+            self.save(key, fh)
+        os.unlink(local_path)
+
+    @abc.abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        ...
+
+    def stream(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        # end is inclusive, matching HTTP byte ranges.
+        with self.open(key) as fh:
+            fh.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                block = fh.read(STREAM_BLOCK_SIZE if remaining is None else min(STREAM_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                if remaining is not None:
+                    remaining -= len(block)
+                yield block
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def size(self, key: str) -> int:
+        ...
+
+    def local_path(self, key: str) -> Path | None:
+        # Only filesystem-backed storage can hand a path to the web server.
+        return None
+
+
+class LocalFileSystemStorage(DocumentStorage):
+    def __init__(self, root=None):
+        self.root = Path(root or settings.MEDIA_ROOT)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Storage key {key!r} escapes the storage root.")
+        return path
+
+    def save(self, key: str, content: BinaryIO) -> None:
+        final = self._path(key)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=final.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as dest:
+                shutil.copyfileobj(content, dest, STREAM_BLOCK_SIZE)
+            os.replace(tmp_name, final)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def save_from_path(self, key: str, local_path: str) -> None:
+        final = self._path(key)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(local_path, final)
+        except OSError:
+            # Staging dir lives on another device; fall back to copy + rename.
+            super().save_from_path(key, local_path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._path(key).stat().st_size
+
+    def local_path(self, key: str) -> Path | None:
+        return self._path(key)
+
+
+class InMemoryStorage(DocumentStorage):
+    """Process-local storage for tests; nothing touches disk."""
+
+    def __init__(self):
+        self._objects: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def save(self, key: str, content: BinaryIO) -> None:
+        data = content.read()
+        with self._lock:
+            self._objects[key] = data
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return io.BytesIO(self._objects[key])
+        except KeyError:
+            raise FileNotFoundError(key) from None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def exists(self, key: str) -> bool:
+        return key in self._objects
+
+    def size(self, key: str) -> int:
+        try:
+            return len(self._objects[key])
+        except KeyError:
+            raise FileNotFoundError(key) from None
+
+
+class ObjectStoreStorage(DocumentStorage):
+    """
+    Object-store backend. *client* follows the subset of the S3 client API used
+    here (put_object, get_object, head_object, delete_object), so a boto3 client
+    and LocalObjectStoreClient are interchangeable. Either client's missing-key
+    error surfaces as FileNotFoundError.
+    """
+
+    def __init__(self, client=None, bucket: str = "documents", prefix: str = "", client_options=None):
+        if client is None:
+            client = LocalObjectStoreClient(**(client_options or {}))
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _call(self, method: str, key: str, **kwargs) -> dict:
+        try:
+            return getattr(self.client, method)(Bucket=self.bucket, Key=self._key(key), **kwargs)
+        except Exception as exc:
+            if _is_missing_object(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+
+    def save(self, key: str, content: BinaryIO) -> None:
+        self._call("put_object", key, Body=content)
+
+    def open(self, key: str) -> BinaryIO:
+        return self._call("get_object", key)["Body"]
+
+    def stream(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        # Ranged GET so only the requested bytes leave the object store.
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        body = self._call("get_object", key, Range=byte_range)["Body"]
+        try:
+            for block in iter(lambda: body.read(STREAM_BLOCK_SIZE), b""):
+                yield block
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self._call("delete_object", key)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._call("head_object", key)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, key: str) -> int:
+        return self._call("head_object", key)["ContentLength"]
+
+
+def _is_missing_object(exc: Exception) -> bool:
+    # LocalObjectStoreClient raises FileNotFoundError; botocore's ClientError
+    # carries the S3 error code in exc.response instead.
+    if isinstance(exc, FileNotFoundError):
+        return True
+    response = getattr(exc, "response", None)
+    if not isinstance(response, dict):
+        return False
+    return str(response.get("Error", {}).get("Code", "")) in NOT_FOUND_CODES
+
+
+class _RangeReader:
+    def __init__(self, fh, length: int):
+        self._fh = fh
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._fh.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class LocalObjectStoreClient:
+    """
+    Stand-in for an S3-compatible client backed by a local directory, so the
+    object-store code path runs in development and tests without a network.
+    Missing objects raise FileNotFoundError.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root or Path(settings.MEDIA_ROOT) / "object-store")
+
+    def _path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / key
+
+    def put_object(self, Bucket: str, Key: str, Body) -> dict:
+        path = self._path(Bucket, Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "wb") as dest:
+            if isinstance(Body, (bytes, bytearray)):
+                dest.write(Body)
+            else:
+                shutil.copyfileobj(Body, dest, STREAM_BLOCK_SIZE)
+        os.replace(tmp_name, path)
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, Range: str | None = None) -> dict:
+        path = self._path(Bucket, Key)
+        fh = open(path, "rb")
+        size = os.fstat(fh.fileno()).st_size
+        if Range is None:
+            return {"Body": fh, "ContentLength": size}
+        start_s, _, end_s = Range.removeprefix("bytes=").partition("-")
+        start = int(start_s)
+        end = min(int(end_s), size - 1) if end_s else size - 1
+        fh.seek(start)
+        return {"Body": _RangeReader(fh, end - start + 1), "ContentLength": end - start + 1}
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        path = self._path(Bucket, Key)
+        if not path.is_file():
+            raise FileNotFoundError(Key)
+        return {"ContentLength": path.stat().st_size}
+
+    def delete_object(self, Bucket: str, Key: str) -> dict:
+        try:
+            os.unlink(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+
+@functools.cache
+def get_document_storage() -> DocumentStorage:
+    config = getattr(settings, "DOCUMENT_STORAGE", {})
+    backend = import_string(config.get("BACKEND", "apps.documents.storage.LocalFileSystemStorage"))
+    return backend(**config.get("OPTIONS", {}))
+
+
+@receiver(setting_changed)
+def _reset_document_storage(*, setting, **kwargs):
+    # Lets tests swap backends with override_settings(DOCUMENT_STORAGE=...).
+    if setting in ("DOCUMENT_STORAGE", "MEDIA_ROOT"):
+        get_document_storage.cache_clear()
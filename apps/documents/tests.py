@@ -1,3 +1,693 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import json
+import os
+from unittest import mock
+import shutil
+import tempfile
+import time
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.choices import UserRole
+from apps.accounts.models import User
+from apps.applications.services import create_application
+from apps.applications.exceptions import UploadError
+from apps.applications.models import VisaApplication
+from apps.documents.choices import PreviewStatus, UploadSessionStatus
+from apps.documents.gc import find_orphans, reclaim
+from apps.documents.masks import DOCUMENT_TYPE_BITS, document_mask
+from apps.documents.models import ApplicationDocument, UploadChunk, UploadSession
+from apps.documents.previews import (
+    PREVIEW_CLAIM_TIMEOUT,
+    _claim_next_document,
+    generate_renditions,
+    process_next_pending_preview,
+)
+from apps.documents.services import (
+    bulk_set_verified,
+    cas_path_for,
+    complete_upload_session,
+    missing_chunk_indices,
+    refresh_required_masks,
+    save_application_document,
+    start_upload_session,
+    write_upload_chunk,
+)
+from apps.documents.storage import (
+    DocumentStorage,
+    InMemoryStorage,
+    LocalObjectStoreClient,
+    ObjectStoreStorage,
+    get_document_storage,
+)
+from apps.visas.models import VisaType
+
+PDF = b"%PDF-1.4\n" + b"x" * 100
+PNG = b"\x89PNG\r\n\x1a\n" + b"y" * 100
+
+
+class DocumentTestCase(TestCase):
+    """Runs each test against a throwaway MEDIA_ROOT with local storage."""
+
+    def setUp(self):
+        media = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media,
+            DOCUMENT_UPLOAD_TMP_DIR=media / "documents" / "tmp",
+            DOCUMENT_STORAGE={"BACKEND": "apps.documents.storage.LocalFileSystemStorage", "OPTIONS": {}},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.applicant = User.objects.create_user("applicant@example.com", "pw")
+        self.visa_type = VisaType.objects.create(code="TOURIST_30", name="Tourist", fee_amount=50, max_stay_days=30)
+        self.application = self.make_application()
+
+    def make_application(self, applicant=None, **fields) -> VisaApplication:
+        return VisaApplication.objects.create(
+            applicant=applicant or self.applicant,
+            visa_type=self.visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+            **fields,
+        )
+
+
+class ContentAddressedStorageTests(DocumentTestCase):
+    def test_stored_under_content_hash(self):
+        document = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("scan.pdf", PDF))
+
+        digest = hashlib.sha256(PDF).hexdigest()
+        self.assertEqual(document.sha256, digest)
+        self.assertEqual(document.file_path, cas_path_for(digest))
+        self.assertEqual(document.size_bytes, len(PDF))
+        self.assertEqual(document.original_name, "scan.pdf")
+        with get_document_storage().open(document.file_path) as fh:
+            self.assertEqual(fh.read(), PDF)
+
+    def test_identical_content_is_stored_once(self):
+        other = self.make_application()
+        first = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        second = save_application_document(other, "PASSPORT", SimpleUploadedFile("b.pdf", PDF))
+
+        self.assertEqual(first.file_path, second.file_path)
+        cas_root = get_document_storage().local_path("documents/cas")
+        self.assertEqual(len([p for p in cas_root.rglob("*") if p.is_file()]), 1)
+
+    def test_different_content_gets_its_own_file(self):
+        first = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        second = save_application_document(self.application, "PHOTO", SimpleUploadedFile("b.png", PNG))
+
+        self.assertNotEqual(first.file_path, second.file_path)
+        self.assertTrue(get_document_storage().exists(second.file_path))
+
+    def test_reupload_replaces_the_document_row(self):
+        save_application_document(self.application, "PHOTO", SimpleUploadedFile("a.png", PNG))
+        replacement = PNG + b"z"
+        document = save_application_document(self.application, "PHOTO", SimpleUploadedFile("b.png", replacement))
+
+        self.assertEqual(ApplicationDocument.objects.filter(application=self.application).count(), 1)
+        self.assertEqual(document.sha256, hashlib.sha256(replacement).hexdigest())
+        self.assertEqual(document.original_name, "b.png")
+
+    def test_staging_dir_is_left_empty(self):
+        save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        save_application_document(self.make_application(), "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+
+        self.assertEqual(list(Path(settings.DOCUMENT_UPLOAD_TMP_DIR).iterdir()), [])
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@override_settings(DOCUMENT_UPLOAD_CHUNK_BYTES=16)
+class ChunkedUploadTests(DocumentTestCase):
+    DATA = b"%PDF-1.4\n" + bytes(range(40))   # 50 bytes: chunks of 16, 16, 16 and 2
+
+    def start(self, data=DATA, **kwargs) -> UploadSession:
+        return start_upload_session(
+            self.application, self.applicant, "PASSPORT", "scan.pdf", len(data), **kwargs
+        )
+
+    def send(self, session, index, data=DATA, checksum=None):
+        piece = data[index * 16:(index + 1) * 16]
+        return write_upload_chunk(session, index * 16, io.BytesIO(piece), len(piece), checksum or _sha256(piece))
+
+    def test_chunks_in_any_order_then_resume(self):
+        session = self.start()
+        self.assertEqual(session.chunk_count, 4)
+        self.send(session, 3)
+        self.send(session, 1)
+        self.assertEqual(missing_chunk_indices(session), [0, 2])
+
+        # The client comes back later and sends only what is missing.
+        self.send(session, 0)
+        self.send(session, 2)
+        self.assertEqual(missing_chunk_indices(session), [])
+
+        document = complete_upload_session(session)
+        self.assertEqual(document.sha256, _sha256(self.DATA))
+        self.assertEqual(document.file_kind, "pdf")
+        with get_document_storage().open(document.file_path) as fh:
+            self.assertEqual(fh.read(), self.DATA)
+        self.assertFalse(UploadChunk.objects.filter(session=session).exists())
+
+    def test_bad_checksum_is_not_recorded_and_retry_overwrites(self):
+        session = self.start()
+        with self.assertRaisesMessage(UploadError, "Checksum mismatch"):
+            self.send(session, 1, checksum="0" * 64)
+        self.assertIn(1, missing_chunk_indices(session))
+
+        self.send(session, 1)
+        self.send(session, 1)   # a retried chunk is recorded once
+        self.assertEqual(UploadChunk.objects.filter(session=session, index=1).count(), 1)
+
+    def test_bad_resend_keeps_the_recorded_chunk(self):
+        session = self.start()
+        for index in range(session.chunk_count):
+            self.send(session, index)
+
+        corrupt = b"!" * 16
+        with self.assertRaisesMessage(UploadError, "Checksum mismatch"):
+            write_upload_chunk(session, 16, io.BytesIO(corrupt), 16, _sha256(self.DATA[16:32]))
+        with self.assertRaisesMessage(UploadError, "was truncated"):
+            write_upload_chunk(session, 16, io.BytesIO(corrupt[:4]), 16, _sha256(self.DATA[16:32]))
+
+        document = complete_upload_session(session)
+        with get_document_storage().open(document.file_path) as fh:
+            self.assertEqual(fh.read(), self.DATA)
+
+    def test_write_checks_the_stored_status(self):
+        session = self.start()
+        stale = UploadSession.objects.get(pk=session.pk)
+        for index in range(session.chunk_count):
+            self.send(session, index)
+        complete_upload_session(session)
+
+        with self.assertRaisesMessage(UploadError, "already COMPLETED"):
+            self.send(stale, 0)
+
+    def test_offset_and_length_must_match_a_chunk(self):
+        session = self.start()
+        with self.assertRaisesMessage(UploadError, "not a chunk boundary"):
+            write_upload_chunk(session, 5, io.BytesIO(b"x" * 16), 16, _sha256(b"x" * 16))
+        with self.assertRaisesMessage(UploadError, "must be 16 bytes"):
+            write_upload_chunk(session, 16, io.BytesIO(b"x" * 8), 8, _sha256(b"x" * 8))
+
+    def test_complete_refuses_missing_chunks(self):
+        session = self.start()
+        self.send(session, 0)
+        with self.assertRaisesMessage(UploadError, "missing 3 chunk(s), first: 1"):
+            complete_upload_session(session)
+
+    def test_complete_checks_expected_hash(self):
+        session = self.start(expected_sha256="f" * 64)
+        for index in range(session.chunk_count):
+            self.send(session, index)
+        with self.assertRaisesMessage(UploadError, "does not match the expected hash"):
+            complete_upload_session(session)
+
+    def test_complete_is_idempotent(self):
+        session = self.start()
+        for index in range(session.chunk_count):
+            self.send(session, index)
+        first = complete_upload_session(session)
+        again = complete_upload_session(session)
+
+        self.assertEqual(first.pk, again.pk)
+        session.refresh_from_db()
+        self.assertEqual(session.status, UploadSessionStatus.COMPLETED)
+        with self.assertRaisesMessage(UploadError, "already COMPLETED"):
+            self.send(session, 0)
+
+
+class _S3ClientError(Exception):
+    # Shape of botocore.exceptions.ClientError, without needing boto3.
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class _MissingObjectClient:
+    def __init__(self, code):
+        self.code = code
+
+    def head_object(self, **kwargs):
+        raise _S3ClientError(self.code)
+
+    get_object = head_object
+
+
+class StorageBackendTests(SimpleTestCase):
+    def check_backend(self, storage):
+        data = bytes(range(256)) * 1024
+        storage.save("documents/cas/ab/cd/abcd", io.BytesIO(data))
+
+        self.assertTrue(storage.exists("documents/cas/ab/cd/abcd"))
+        self.assertEqual(storage.size("documents/cas/ab/cd/abcd"), len(data))
+        with storage.open("documents/cas/ab/cd/abcd") as fh:
+            self.assertEqual(fh.read(), data)
+        self.assertEqual(b"".join(storage.stream("documents/cas/ab/cd/abcd", 10, 99_999)), data[10:100_000])
+        self.assertEqual(b"".join(storage.stream("documents/cas/ab/cd/abcd", 1000)), data[1000:])
+
+        storage.delete("documents/cas/ab/cd/abcd")
+        storage.delete("documents/cas/ab/cd/abcd")     # deleting twice is harmless
+        self.assertFalse(storage.exists("documents/cas/ab/cd/abcd"))
+        with self.assertRaises(FileNotFoundError):
+            storage.open("documents/cas/ab/cd/abcd")
+        with self.assertRaises(FileNotFoundError):
+            storage.size("documents/cas/ab/cd/abcd")
+
+    def test_in_memory_storage(self):
+        self.check_backend(InMemoryStorage())
+
+    def test_in_memory_storage_save_from_path(self):
+        storage = InMemoryStorage()
+        with tempfile.NamedTemporaryFile(delete=False) as staged:
+            staged.write(PDF)
+        storage.save_from_path("doc", staged.name)
+
+        self.assertFalse(Path(staged.name).exists())
+        self.assertEqual(storage.open("doc").read(), PDF)
+        self.assertIsNone(storage.local_path("doc"))
+
+    def test_object_store_with_local_client(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.check_backend(ObjectStoreStorage(client=LocalObjectStoreClient(root), prefix="evisa/"))
+
+    def test_object_store_translates_s3_not_found(self):
+        for code in ("404", "NoSuchKey"):
+            storage = ObjectStoreStorage(client=_MissingObjectClient(code))
+            self.assertFalse(storage.exists("missing"))
+            with self.assertRaises(FileNotFoundError):
+                storage.size("missing")
+            with self.assertRaises(FileNotFoundError):
+                storage.open("missing")
+
+    def test_object_store_passes_other_errors_through(self):
+        storage = ObjectStoreStorage(client=_MissingObjectClient("AccessDenied"))
+        with self.assertRaises(_S3ClientError):
+            storage.exists("secret")
+
+    def test_contract_is_abstract(self):
+        with self.assertRaises(TypeError):
+            DocumentStorage()
+
+
+class DocumentDownloadTests(DocumentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("passport.pdf", PDF))
+        self.url = reverse("documents:download", kwargs={"pk": self.document.pk})
+        self.client.force_login(self.applicant)
+
+    def body(self, response) -> bytes:
+        return b"".join(response.streaming_content)
+
+    def test_access(self):
+        officer = User.objects.create_user("officer@example.com", "pw", role=UserRole.OFFICER)
+        stranger = User.objects.create_user("stranger@example.com", "pw")
+
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.force_login(officer)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.force_login(stranger)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_soft_deleted_application_is_gone(self):
+        VisaApplication.objects.filter(pk=self.application.pk).update(soft_deleted_at=timezone.now())
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(self.body(response), PDF)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], str(len(PDF)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["ETag"], f'"{self.document.sha256}"')
+        self.assertEqual(response["Content-Disposition"], 'inline; filename="passport.pdf"')
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, headers={"If-None-Match": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_ranges(self):
+        size = len(PDF)
+        cases = [
+            ("bytes=0-9", 206, PDF[:10], f"bytes 0-9/{size}"),
+            ("bytes=100-", 206, PDF[100:], f"bytes 100-{size - 1}/{size}"),
+            ("bytes=-5", 206, PDF[-5:], f"bytes {size - 5}-{size - 1}/{size}"),
+            ("bytes=5-100000", 206, PDF[5:], f"bytes 5-{size - 1}/{size}"),
+            ("bytes=0-1,4-5", 200, PDF, None),      # multi-range: whole file
+        ]
+        for header, status, body, content_range in cases:
+            with self.subTest(range=header):
+                response = self.client.get(self.url, headers={"Range": header})
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(self.body(response), body)
+                self.assertEqual(response.get("Content-Range"), content_range)
+
+        response = self.client.get(self.url, headers={"Range": f"bytes={size}-"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{size}")
+
+    def test_if_range(self):
+        etag = f'"{self.document.sha256}"'
+        response = self.client.get(self.url, headers={"Range": "bytes=0-9", "If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+        response = self.client.get(self.url, headers={"Range": "bytes=0-9", "If-Range": '"old-version"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), PDF)
+
+    def test_renditions_wait_for_previews(self):
+        response = self.client.get(reverse("documents:thumbnail", kwargs={"pk": self.document.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_type_comes_from_content_not_filename(self):
+        # Regression: a PDF-signed file named x.html used to go out as
+        # text/html, inline, on our origin.
+        payload = b"%PDF-1.4\n<script>alert(document.cookie)</script>"
+        document = save_application_document(self.application, "OTHER", SimpleUploadedFile("x.html", payload))
+
+        response = self.client.get(reverse("documents:download", kwargs={"pk": document.pk}))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Disposition"], 'inline; filename="x.pdf"')
+
+    def test_unknown_kind_is_an_attachment(self):
+        ApplicationDocument.objects.filter(pk=self.document.pk).update(original_name="x.html", file_kind="")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="x"')
+
+
+def _png(color="red", size=(600, 400)) -> bytes:
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, format="PNG")
+    return out.getvalue()
+
+
+class PreviewWorkerTests(DocumentTestCase):
+    def upload_photo(self, data=None) -> ApplicationDocument:
+        return save_application_document(self.application, "PHOTO", SimpleUploadedFile("photo.png", data or _png()))
+
+    def test_renders_pending_document(self):
+        document = self.upload_photo()
+
+        self.assertEqual(process_next_pending_preview().pk, document.pk)
+        document.refresh_from_db()
+        self.assertEqual(document.preview_status, PreviewStatus.READY)
+        self.assertTrue(get_document_storage().exists(document.thumbnail_path))
+        self.assertTrue(get_document_storage().exists(document.preview_path))
+        self.assertIsNone(process_next_pending_preview())
+
+    def test_unrenderable_content_is_marked_unsupported(self):
+        document = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        with mock.patch("apps.documents.previews.shutil.which", return_value=None):
+            process_next_pending_preview()
+        document.refresh_from_db()
+        self.assertEqual(document.preview_status, PreviewStatus.UNSUPPORTED)
+
+    def test_claim_hides_the_row_from_other_workers(self):
+        document = self.upload_photo()
+
+        self.assertEqual(_claim_next_document().pk, document.pk)
+        document.refresh_from_db()
+        self.assertEqual(document.preview_status, PreviewStatus.PROCESSING)
+        self.assertIsNone(_claim_next_document())
+
+    def test_stale_claim_is_taken_over(self):
+        document = self.upload_photo()
+        _claim_next_document()
+        ApplicationDocument.objects.filter(pk=document.pk).update(
+            preview_claimed_at=timezone.now() - PREVIEW_CLAIM_TIMEOUT - datetime.timedelta(seconds=1),
+        )
+        self.assertEqual(_claim_next_document().pk, document.pk)
+
+    def test_reupload_while_rendering_stays_pending(self):
+        self.upload_photo()
+        claimed = _claim_next_document()
+        replacement = self.upload_photo(_png("blue"))     # lands while the worker renders
+
+        generate_renditions(claimed)
+        replacement.refresh_from_db()
+        self.assertEqual(replacement.preview_status, PreviewStatus.PENDING)
+        self.assertEqual(replacement.thumbnail_path, "")
+
+        self.assertEqual(process_next_pending_preview().sha256, replacement.sha256)
+        replacement.refresh_from_db()
+        self.assertEqual(replacement.preview_status, PreviewStatus.READY)
+
+
+class BulkVerifyTests(DocumentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        self.client.force_login(User.objects.create_user("officer@example.com", "pw", role=UserRole.OFFICER))
+
+    def post(self, payload):
+        return self.client.post(reverse("documents:bulk_verify"), json.dumps(payload), content_type="application/json")
+
+    def test_verify_and_unverify(self):
+        response = self.post({"document_ids": [self.document.pk], "verified": True})
+        self.assertEqual(response.json(), {"updated": 1, "verified": True})
+        response = self.post({"document_ids": [self.document.pk], "verified": False})
+        self.assertEqual(response.json(), {"updated": 1, "verified": False})
+        self.document.refresh_from_db()
+        self.assertFalse(self.document.verified)
+
+    def test_verified_must_be_a_json_boolean(self):
+        for value in ("false", "0", 0, 1, None):
+            with self.subTest(verified=value):
+                response = self.post({"document_ids": [self.document.pk], "verified": value})
+                self.assertEqual(response.status_code, 400)
+        self.document.refresh_from_db()
+        self.assertFalse(self.document.verified)
+
+
+class DocumentGcTests(DocumentTestCase):
+    GRACE = datetime.timedelta(hours=48)
+
+    def setUp(self):
+        super().setUp()
+        self.quarantine = Path(settings.MEDIA_ROOT) / "documents-quarantine"
+        settings_override = override_settings(DOCUMENT_GC_QUARANTINE_DIR=self.quarantine)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = get_document_storage()
+
+    def age(self, path: Path, hours=72):
+        stamp = time.time() - hours * 3600
+        os.utime(path, (stamp, stamp))
+
+    def write_orphan(self, data=PDF, hours=72) -> Path:
+        path = self.storage.local_path(cas_path_for(_sha256(data)))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self.age(path, hours)
+        return path
+
+    def orphan_paths(self, report):
+        return [orphan.path for orphan in report.orphans]
+
+    def test_referenced_file_is_kept(self):
+        document = save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        path = self.storage.local_path(document.file_path)
+        self.age(path)
+
+        report = find_orphans(self.storage, grace=self.GRACE, workers=2)
+        self.assertEqual(report.orphans, [])
+        self.assertEqual(report.scanned_files, 1)
+
+    def test_young_orphan_is_kept(self):
+        path = self.write_orphan(hours=1)
+        self.assertEqual(find_orphans(self.storage, grace=self.GRACE, workers=2).orphans, [])
+
+        self.age(path)
+        self.assertEqual(self.orphan_paths(find_orphans(self.storage, grace=self.GRACE, workers=2)), [path])
+
+    def test_dedup_hit_after_the_scan_is_skipped(self):
+        path = self.write_orphan()
+        report = find_orphans(self.storage, grace=self.GRACE, workers=2)
+        self.assertEqual(self.orphan_paths(report), [path])
+
+        save_application_document(self.application, "PASSPORT", SimpleUploadedFile("a.pdf", PDF))
+        reclaim(report, self.storage, quarantine=False)
+        self.assertEqual((report.reclaimed, report.skipped), (0, 1))
+        self.assertTrue(path.exists())
+
+    def test_touched_after_the_scan_is_skipped(self):
+        # The dedup path refreshes the mtime before its document row commits.
+        path = self.write_orphan()
+        report = find_orphans(self.storage, grace=self.GRACE, workers=2)
+        os.utime(path)
+
+        reclaim(report, self.storage, quarantine=False)
+        self.assertEqual((report.reclaimed, report.skipped), (0, 1))
+        self.assertTrue(path.exists())
+
+    def test_quarantine_keeps_the_relative_path(self):
+        path = self.write_orphan()
+        reclaim(find_orphans(self.storage, grace=self.GRACE, workers=2), self.storage)
+
+        self.assertFalse(path.exists())
+        moved = self.quarantine / path.relative_to(settings.MEDIA_ROOT)
+        self.assertEqual(moved.read_bytes(), PDF)
+
+    def test_delete_removes_the_file(self):
+        path = self.write_orphan()
+        report = find_orphans(self.storage, grace=self.GRACE, workers=2)
+        reclaim(report, self.storage, quarantine=False)
+
+        self.assertEqual(report.reclaimed, 1)
+        self.assertFalse(path.exists())
+        self.assertFalse(self.quarantine.exists())
+
+    def test_command(self):
+        path = self.write_orphan()
+        out = io.StringIO()
+        call_command("gc_documents", "--dry-run", stdout=out)
+        self.assertIn("[dry run] Scanned 1 file(s); 1 orphan(s)", out.getvalue())
+        self.assertTrue(path.exists())
+
+        out = io.StringIO()
+        call_command("gc_documents", "--delete", stdout=out)
+        self.assertIn("Deleted 1 file(s).", out.getvalue())
+        self.assertFalse(path.exists())
+
+
+class _TrickleStream:
+    # Hands out at most one byte per read, like a slow socket.
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._data.read(1 if size < 0 else min(size, 1))
+
+
+@override_settings(DOCUMENT_UPLOAD_CHUNK_BYTES=16)
+class UploadTypeCheckTests(DocumentTestCase):
+    def start(self, data, document_type="PASSPORT"):
+        return start_upload_session(self.application, self.applicant, document_type, "f", len(data))
+
+    def test_short_reads_are_sniffed_whole(self):
+        data = PDF[:16]
+        session = self.start(data)
+        write_upload_chunk(session, 0, _TrickleStream(data), len(data), _sha256(data))
+        self.assertEqual(missing_chunk_indices(session), [])
+
+    def test_wrong_type_on_first_chunk_kills_the_session(self):
+        data = b"<html><script>" + b"x" * 2
+        session = self.start(data)
+        with self.assertRaisesMessage(UploadError, "Unsupported file type"):
+            write_upload_chunk(session, 0, io.BytesIO(data), len(data), _sha256(data))
+        self.assertFalse(UploadSession.objects.filter(pk=session.pk).exists())
+
+    def test_photo_must_be_an_image(self):
+        session = self.start(PDF[:16], document_type="PHOTO")
+        with self.assertRaisesMessage(UploadError, "PHOTO must be one of: JPEG, PNG."):
+            write_upload_chunk(session, 0, io.BytesIO(PDF[:16]), 16, _sha256(PDF[:16]))
+
+    def test_truncated_first_chunk_keeps_the_session(self):
+        session = self.start(PDF[:16])
+        with self.assertRaisesMessage(UploadError, "was truncated"):
+            write_upload_chunk(session, 0, io.BytesIO(b"%PD"), 16, _sha256(PDF[:16]))
+        self.assertTrue(UploadSession.objects.filter(pk=session.pk).exists())
+
+    def test_declared_size_over_the_type_limit_is_refused(self):
+        with override_settings(DOCUMENT_UPLOAD_LIMITS={"PHOTO": 10}):
+            with self.assertRaisesMessage(UploadError, "limit for PHOTO is 10 bytes"):
+                self.start(PNG, document_type="PHOTO")
+
+
+class DocumentMaskTests(DocumentTestCase):
+    # TOURIST_30 requires PASSPORT, PHOTO, BANK_STATEMENT and TRAVEL_ITINERARY.
+    REQUIRED = ["PASSPORT", "PHOTO", "BANK_STATEMENT", "TRAVEL_ITINERARY"]
+
+    def upload(self, document_type, data=PDF):
+        if document_type == "PHOTO":
+            data = PNG
+        return save_application_document(self.application, document_type, SimpleUploadedFile("f", data))
+
+    def masks(self):
+        self.application.refresh_from_db()
+        return (
+            self.application.documents_supplied_mask,
+            self.application.documents_verified_mask,
+            self.application.documents_complete,
+        )
+
+    def test_upload_verify_and_delete(self):
+        officer = User.objects.create_user("officer@example.com", "pw", role=UserRole.OFFICER)
+        passport = self.upload("PASSPORT")
+        self.assertEqual(self.masks(), (DOCUMENT_TYPE_BITS["PASSPORT"], 0, False))
+
+        for document_type in self.REQUIRED[1:]:
+            self.upload(document_type)
+        self.assertEqual(self.masks(), (document_mask(self.REQUIRED), 0, True))
+
+        bulk_set_verified([passport.pk], verified=True, actor=officer)
+        self.assertEqual(self.masks()[1], DOCUMENT_TYPE_BITS["PASSPORT"])
+
+        # A re-upload is a new, unverified version.
+        self.upload("PASSPORT", PDF + b"v2")
+        self.assertEqual(self.masks()[1], 0)
+
+        ApplicationDocument.objects.get(application=self.application, document_type="PHOTO").delete()
+        supplied, _, complete = self.masks()
+        self.assertFalse(supplied & DOCUMENT_TYPE_BITS["PHOTO"])
+        self.assertFalse(complete)
+
+    def test_extra_documents_do_not_complete(self):
+        self.upload("PASSPORT")
+        self.upload("OTHER")
+        self.assertFalse(self.masks()[2])
+
+    def create(self, code):
+        visa_type, _ = VisaType.objects.get_or_create(
+            code=code, defaults={"name": code, "fee_amount": 10, "max_stay_days": 30},
+        )
+        return create_application(VisaApplication(
+            visa_type=visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+        ), self.applicant)
+
+    def test_new_application_without_required_documents_is_complete(self):
+        with mock.patch("apps.documents.masks.get_required_documents", return_value=[]):
+            self.assertTrue(self.create("TRANSIT").documents_complete)
+        self.assertFalse(self.create("TOURIST_30").documents_complete)
+
+    def test_rule_changes_are_picked_up(self):
+        refresh_required_masks()
+        self.upload("PASSPORT")
+        self.assertFalse(self.masks()[2])
+        self.assertEqual(refresh_required_masks(), 0)     # rules unchanged: nothing to do
+
+        with mock.patch("apps.documents.masks.get_required_documents", return_value=["PASSPORT"]):
+            self.assertEqual(refresh_required_masks(), 1)
+        self.assertTrue(self.masks()[2])
+
+        self.assertEqual(refresh_required_masks(), 1)     # and back again
+        self.assertFalse(self.masks()[2])
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from apps.applications.exceptions import UploadError
+from apps.documents.choices import DocumentType
+from apps.documents.validation import StreamingUploadValidator
+
+
+class StagedUploadedFile(TemporaryUploadedFile):
+    """
+    Upload already written to the document staging dir, with its SHA-256 and
+    sniffed kind computed on the way in, so storing it is a single rename.
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        # Skip TemporaryUploadedFile.__init__: it hard-codes FILE_UPLOAD_TEMP_DIR.
+        staging = os.fspath(settings.DOCUMENT_UPLOAD_TMP_DIR)
+        os.makedirs(staging, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix=".upload", dir=staging)
+        super(TemporaryUploadedFile, self).__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = ""
+        self.kind = None
+
+
+class ValidatingUploadHandler(FileUploadHandler):
+    """
+    Streams uploaded files straight into staging while hashing and validating
+    them. A wrong type is detected on the first chunk and an oversized file as
+    soon as it crosses the limit; the staging file is dropped at once and the
+    rest of that file is discarded unwritten, while the remaining form fields
+    (CSRF token included) still parse normally.
+
+    Meant to be the request's only upload handler. The per-type limit applies
+    when the form posts ?document_type=…; otherwise the most generous limit is
+    used here and the form re-checks the exact one.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        document_type = request.GET.get("document_type") if request is not None else None
+        self.document_type = document_type if document_type in DocumentType.values else None
+        self.file = None
+        self.rejected = False
+
+    def _reject(self, exc: UploadError):
+        self.file.close()   # NamedTemporaryFile: closing deletes it
+        self.rejected = True
+        self.request.upload_rejection = str(exc)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.rejected = False
+        self.validator = StreamingUploadValidator(self.document_type)
+        self.hasher = hashlib.sha256()
+        self.file = StagedUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rejected:
+            return None
+        try:
+            self.validator.feed(raw_data)
+        except UploadError as exc:
+            self._reject(exc)
+            return None
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.rejected:
+            return None
+        try:
+            self.validator.finish()
+        except UploadError as exc:
+            self._reject(exc)
+            return None
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+        self.file.kind = self.validator.kind
+        return self.file
@@ -0,0 +1,25 @@
+from django.urls import path
+
+from apps.documents.views import (
+    BulkVerifyDocumentsView,
+    CompleteUploadView,
+    DocumentDownloadView,
+    StartUploadView,
+    UploadChunkView,
+    UploadStatusView,
+    VerificationQueueView,
+)
+
+app_name = "documents"
+
+urlpatterns = [
+    path("verification/", VerificationQueueView.as_view(), name="verification_queue"),
+    path("verification/bulk/", BulkVerifyDocumentsView.as_view(), name="bulk_verify"),
+    path("<int:pk>/download/", DocumentDownloadView.as_view(), name="download"),
+    path("<int:pk>/thumbnail/", DocumentDownloadView.as_view(), {"variant": "thumbnail"}, name="thumbnail"),
+    path("<int:pk>/preview/", DocumentDownloadView.as_view(), {"variant": "preview"}, name="preview"),
+    path("applications/<uuid:pk>/uploads/", StartUploadView.as_view(), name="upload_start"),
+    path("uploads/<uuid:upload_id>/", UploadStatusView.as_view(), name="upload_status"),
+    path("uploads/<uuid:upload_id>/chunks/<int:offset>/", UploadChunkView.as_view(), name="upload_chunk"),
+    path("uploads/<uuid:upload_id>/complete/", CompleteUploadView.as_view(), name="upload_complete"),
+]
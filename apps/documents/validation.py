@@ -0,0 +1,96 @@
+from django.conf import settings
+
+from apps.applications.exceptions import UploadError
+from apps.documents.choices import DocumentType
+
+# Magic bytes of the formats we accept; checked against the first chunk only.
+FILE_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    "pdf": (b"%PDF-",),
+    "jpeg": (b"\xff\xd8\xff",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+}
+SNIFF_BYTES = max(len(sig) for sigs in FILE_SIGNATURES.values() for sig in sigs)
+
+# How each kind is served back. Anything else goes out as a download.
+KIND_CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+KIND_EXTENSIONS = {"pdf": ".pdf", "jpeg": ".jpg", "png": ".png"}
+
+IMAGE_KINDS = frozenset({"jpeg", "png"})
+ALL_KINDS = frozenset(FILE_SIGNATURES)
+
+# Photos must be images; everything else may be a scan or a PDF.
+ALLOWED_KINDS: dict[str, frozenset[str]] = {
+    DocumentType.PHOTO: IMAGE_KINDS,
+}
+
+
+def sniff_kind(head: bytes) -> str | None:
+    for kind, signatures in FILE_SIGNATURES.items():
+        if head.startswith(signatures):
+            return kind
+    return None
+
+
+def allowed_kinds(document_type: str | None) -> frozenset[str]:
+    return ALLOWED_KINDS.get(document_type, ALL_KINDS)
+
+
+def max_upload_bytes(document_type: str | None = None) -> int:
+    # Unknown type (e.g. not yet parsed from the form) → the most generous limit.
+    limits = settings.DOCUMENT_UPLOAD_LIMITS
+    if document_type in limits:
+        return limits[document_type]
+    return max(limits.values(), default=settings.DOCUMENT_UPLOAD_MAX_BYTES)
+
+
+def check_declared_size(size: int, document_type: str | None) -> None:
+    limit = max_upload_bytes(document_type)
+    if size > limit:
+        raise UploadError(
+            f"File is {size} bytes; the limit for {document_type or 'documents'} is {limit} bytes."
+        )
+
+
+def check_kind(kind: str | None, document_type: str | None) -> None:
+    if kind is None:
+        raise UploadError("Unsupported file type. Upload a PDF, JPG or PNG.")
+    if kind not in allowed_kinds(document_type):
+        accepted = ", ".join(sorted(k.upper() for k in allowed_kinds(document_type)))
+        raise UploadError(f"{document_type} must be one of: {accepted}.")
+
+
+class StreamingUploadValidator:
+    """
+    Fed every chunk of an upload as it arrives. The first chunk is sniffed
+    and every chunk counts toward the size limit, so a bad upload is refused
+    before the rest of it is written anywhere.
+    """
+
+    def __init__(self, document_type: str | None = None):
+        self.document_type = document_type
+        self.limit = max_upload_bytes(document_type)
+        self.kind: str | None = None
+        self.received = 0
+        self._head = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if self.kind is None:
+            self._head += chunk[:SNIFF_BYTES]
+            if len(self._head) >= SNIFF_BYTES or not chunk:
+                check_kind(sniff_kind(self._head), self.document_type)
+                self.kind = sniff_kind(self._head)
+        self.received += len(chunk)
+        if self.received > self.limit:
+            raise UploadError(
+                f"Upload exceeds the {self.limit}-byte limit for {self.document_type or 'documents'}."
+            )
+
+    def finish(self) -> None:
+        # Files shorter than the longest signature are sniffed here.
+        if self.kind is None:
+            check_kind(sniff_kind(self._head), self.document_type)
+            self.kind = sniff_kind(self._head)
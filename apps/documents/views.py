@@ -1,3 +1,324 @@
-from django.shortcuts import render
+import json
+import re
+from pathlib import Path
 
-# Create your views here.
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from django.urls import reverse
+from django.views.generic import View
+
+from apps.accounts.choices import UserRole
+from apps.accounts.mixins import RoleRequiredMixin
+from apps.applications.choices import ApplicationStatus
+from apps.applications.exceptions import UploadError
+from apps.applications.models import VisaApplication
+from apps.documents.choices import DocumentType, PreviewStatus, UploadSessionStatus
+from apps.documents.models import ApplicationDocument, UploadSession
+from apps.documents.selectors import get_unverified_documents, parse_verification_cursor
+from apps.documents.services import (
+    BULK_VERIFY_MAX,
+    bulk_set_verified,
+    complete_upload_session,
+    missing_chunk_indices,
+    start_upload_session,
+    write_upload_chunk,
+)
+from apps.documents.storage import get_document_storage
+from apps.documents.validation import KIND_CONTENT_TYPES, KIND_EXTENSIONS
+
+
+UPLOADABLE_STATUSES = (ApplicationStatus.DRAFT, ApplicationStatus.PENDING_INFO)
+REVIEWER_ROLES = (UserRole.OFFICER, UserRole.SUPERVISOR, UserRole.ADMIN)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _session_payload(session: UploadSession) -> dict:
+    return {
+        "upload_id": str(session.id),
+        "status": session.status,
+        "total_size": session.total_size,
+        "chunk_size": session.chunk_size,
+        "chunk_count": session.chunk_count,
+        "missing_chunks": missing_chunk_indices(session)
+        if session.status == UploadSessionStatus.OPEN else [],
+    }
+
+
+class ChunkedUploadMixin(LoginRequiredMixin, RoleRequiredMixin):
+    allowed_roles = [UserRole.APPLICANT]
+
+    def _get_session(self, request, upload_id):
+        return get_object_or_404(
+            UploadSession.objects.select_related("application"),
+            pk=upload_id,
+            uploader=request.user,
+            application__soft_deleted_at__isnull=True,
+        )
+
+
+class StartUploadView(ChunkedUploadMixin, View):
+    """Initiate a resumable upload; the client then PUTs chunks by offset."""
+
+    def post(self, request, pk):
+        app = get_object_or_404(
+            VisaApplication, pk=pk, applicant=request.user, soft_deleted_at__isnull=True
+        )
+        if app.status not in UPLOADABLE_STATUSES:
+            return JsonResponse({"error": "Documents cannot be changed at this stage."}, status=409)
+
+        document_type = request.POST.get("document_type", "")
+        if document_type not in DocumentType.values:
+            return JsonResponse({"error": f"Unknown document type {document_type!r}."}, status=400)
+        try:
+            total_size = int(request.POST.get("total_size", ""))
+        except ValueError:
+            return JsonResponse({"error": "total_size must be an integer."}, status=400)
+
+        try:
+            session = start_upload_session(
+                app,
+                uploader=request.user,
+                document_type=document_type,
+                original_name=request.POST.get("filename", ""),
+                total_size=total_size,
+                expected_sha256=request.POST.get("sha256", ""),
+            )
+        except UploadError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        return JsonResponse(_session_payload(session), status=201)
+
+
+class UploadStatusView(ChunkedUploadMixin, View):
+    """Resume point: reports which chunks still need to be sent."""
+
+    def get(self, request, upload_id):
+        return JsonResponse(_session_payload(self._get_session(request, upload_id)))
+
+
+class UploadChunkView(ChunkedUploadMixin, View):
+    def put(self, request, upload_id, offset):
+        session = self._get_session(request, upload_id)
+        if session.application.status not in UPLOADABLE_STATUSES:
+            return JsonResponse({"error": "Documents cannot be changed at this stage."}, status=409)
+        checksum = request.headers.get("X-Chunk-SHA256", "")
+        if not checksum:
+            return JsonResponse({"error": "X-Chunk-SHA256 header is required."}, status=400)
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+
+        try:
+            chunk = write_upload_chunk(session, offset, request, length, checksum)
+        except UploadError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        return JsonResponse({"index": chunk.index, "size": chunk.size, "sha256": chunk.sha256})
+
+
+class CompleteUploadView(ChunkedUploadMixin, View):
+    def post(self, request, upload_id):
+        session = self._get_session(request, upload_id)
+        if session.application.status not in UPLOADABLE_STATUSES:
+            return JsonResponse({"error": "Documents cannot be changed at this stage."}, status=409)
+        try:
+            document = complete_upload_session(session)
+        except UploadError as exc:
+            return JsonResponse({"error": str(exc), **_session_payload(session)}, status=409)
+        return JsonResponse({
+            "document_id": document.pk,
+            "document_type": document.document_type,
+            "sha256": document.sha256,
+            "size_bytes": document.size_bytes,
+        })
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Return an inclusive (start, end) for a single byte range, None to serve the
+    whole file (no/multi/garbled range), or raise ValueError when unsatisfiable.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class DocumentDownloadView(LoginRequiredMixin, View):
+    """
+    Serves an uploaded document, or one of its renditions, to its applicant
+    or to review staff. Conditional requests are answered from the stored hash
+    without touching storage; the bytes themselves go out via the front proxy
+    when configured, otherwise streamed with single-range support.
+    """
+
+    RENDITIONS = {"thumbnail": "thumbnail_path", "preview": "preview_path"}
+
+    def get(self, request, pk, variant="original"):
+        document = get_object_or_404(
+            ApplicationDocument.objects.select_related("application"),
+            pk=pk,
+            application__soft_deleted_at__isnull=True,
+        )
+        is_owner = document.application.applicant_id == request.user.pk
+        if not is_owner and request.user.role not in REVIEWER_ROLES:
+            return render(request, "auth/access_denied.html", status=403)
+
+        as_attachment = False
+        if variant == "original":
+            key = document.file_path
+            # The applicant's filename is only a label: the type and the
+            # extension come from the content sniffed on upload, so nothing
+            # but a PDF or an image is ever rendered inline on our origin.
+            stem = Path(document.original_name).stem or document.document_type.lower()
+            if document.file_kind in KIND_CONTENT_TYPES:
+                content_type = KIND_CONTENT_TYPES[document.file_kind]
+                filename = stem + KIND_EXTENSIONS[document.file_kind]
+            else:
+                content_type, filename, as_attachment = "application/octet-stream", stem, True
+            tag = document.sha256 or f"doc-{document.pk}-{document.uploaded_at.timestamp():.0f}"
+        elif variant in self.RENDITIONS and document.preview_status == PreviewStatus.READY:
+            key = getattr(document, self.RENDITIONS[variant])
+            filename = f"{document.document_type.lower()}-{variant}.jpg"
+            content_type = "image/jpeg"     # always rendered by us
+            tag = f"{document.sha256}-{variant}"
+        else:
+            raise Http404
+
+        etag = quote_etag(tag)
+        last_modified = document.uploaded_at.timestamp()
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        size = document.size_bytes if variant == "original" else None
+        response = self._offload(key, content_type) or self._stream(request, key, size, content_type, etag)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+        return response
+
+    def _offload(self, key, content_type):
+        # The proxy handles Range/If-Range itself once it owns the file.
+        mode = getattr(settings, "DOCUMENT_SENDFILE_MODE", "")
+        storage = get_document_storage()
+        if mode == "x-accel-redirect":
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = settings.DOCUMENT_ACCEL_REDIRECT_PREFIX + key
+            return response
+        if mode == "x-sendfile":
+            path = storage.local_path(key)
+            if path is not None:
+                response = HttpResponse(content_type=content_type)
+                response["X-Sendfile"] = str(path)
+                return response
+        return None
+
+    def _stream(self, request, key, size, content_type, etag):
+        storage = get_document_storage()
+        size = size or storage.size(key)
+
+        byte_range = None
+        range_header = request.headers.get("Range", "")
+        if_range = request.headers.get("If-Range", "")
+        if range_header and (not if_range or if_range == etag):
+            try:
+                byte_range = _parse_range(range_header, size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+
+        if byte_range is None:
+            # FileResponse lets the WSGI server use sendfile() where it can.
+            response = FileResponse(storage.open(key), content_type=content_type)
+            response["Content-Length"] = size
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                storage.stream(key, start, end),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+
+class VerificationQueueView(LoginRequiredMixin, RoleRequiredMixin, View):
+    allowed_roles = [UserRole.OFFICER, UserRole.SUPERVISOR]
+    template_name = "officer/verification_queue.html"
+    page_size = 100
+
+    def get(self, request):
+        after = parse_verification_cursor(request.GET.get("after", ""))
+        documents, next_cursor = get_unverified_documents(after=after, limit=self.page_size)
+        return render(request, self.template_name, {
+            "documents": documents,
+            "next_cursor": next_cursor,
+            "is_first_page": after is None,
+        })
+
+
+class BulkVerifyDocumentsView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """
+    Accepts either the queue page form (document_ids + action) or a JSON body
+    {"document_ids": [...], "verified": true|false}; JSON callers get JSON back.
+    """
+
+    allowed_roles = [UserRole.OFFICER, UserRole.SUPERVISOR]
+
+    def post(self, request):
+        wants_json = request.content_type == "application/json"
+        if wants_json:
+            try:
+                payload = json.loads(request.body)
+                ids = [int(i) for i in payload.get("document_ids", [])]
+                verified = payload.get("verified", True)
+            except (ValueError, TypeError, AttributeError):
+                return JsonResponse({"error": "Malformed request body."}, status=400)
+            # Strictly a JSON boolean: bool("false") would verify.
+            if not isinstance(verified, bool):
+                return JsonResponse({"error": "verified must be true or false."}, status=400)
+        else:
+            try:
+                ids = [int(i) for i in request.POST.getlist("document_ids")]
+            except ValueError:
+                ids = []
+            verified = request.POST.get("action", "verify") == "verify"
+
+        if len(ids) > BULK_VERIFY_MAX:
+            error = f"At most {BULK_VERIFY_MAX} documents can be updated per request."
+            if wants_json:
+                return JsonResponse({"error": error}, status=400)
+            messages.error(request, error)
+            return redirect("documents:verification_queue")
+
+        updated = bulk_set_verified(ids, verified=verified, actor=request.user) if ids else 0
+        if wants_json:
+            return JsonResponse({"updated": updated, "verified": verified})
+        label = "verified" if verified else "marked unverified"
+        messages.success(request, f"{updated} document(s) {label}.")
+        # Verified rows drop out of the queue, so reloading the same page shows the next batch.
+        after = request.POST.get("after", "")
+        url = reverse("documents:verification_queue")
+        return redirect(f"{url}?after={after}" if parse_verification_cursor(after) else url)
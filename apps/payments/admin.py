@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Payment
+from .models import Payment, PaymentNotification
 
 
 @admin.register(Payment)
@@ -27,3 +27,23 @@ class PaymentAdmin(admin.ModelAdmin):
         # Payments are created exclusively via the service layer; disallow
         # manual inserts from the admin to prevent bypassing business rules.
         return False
+
+
+@admin.register(PaymentNotification)
+class PaymentNotificationAdmin(admin.ModelAdmin):
+    """Read-only view of the webhook inbox, for chasing FAILED events."""
+
+    list_display = ("event_id", "event_type", "reference", "status", "attempts", "received_at", "processed_at")
+    list_filter = ("status", "event_type")
+    search_fields = ("event_id", "reference")
+    ordering = ("-id",)
+    readonly_fields = (
+        "event_id", "event_type", "reference", "payload", "status",
+        "attempts", "last_error", "next_attempt_at", "received_at", "processed_at",
+    )
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        return False
@@ -6,3 +6,10 @@ class PaymentStatus(models.TextChoices):
     PAID = "PAID", "Paid"
     FAILED = "FAILED", "Failed"
     REFUNDED = "REFUNDED", "Refunded"
+
+
+class NotificationStatus(models.TextChoices):
+    RECEIVED = "RECEIVED", "Received"
+    PROCESSED = "PROCESSED", "Processed"
+    IGNORED = "IGNORED", "Ignored"      # duplicate outcome or unhandled event type
+    FAILED = "FAILED", "Failed"
@@ -0,0 +1,62 @@
+import json
+import random
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.payments.gateway import EVENT_PAYMENT_FAILED, EVENT_PAYMENT_SUCCEEDED, SIGNATURE_HEADER, sign
+
+
+class FakeGateway:
+    """
+    Local stand-in for the payment gateway, for load-testing the webhook
+    inbox. Builds signed notifications for a set of payments and delivers
+    them in bursts, redelivering a share of them the way real gateways do
+    after a timeout.
+    """
+
+    def __init__(self, secret: str, deliver):
+        # deliver(body: bytes, headers: dict) -> int HTTP status
+        self.secret = secret
+        self.deliver = deliver
+
+    def build_events(self, payments, count: int, duplicate_ratio: float = 0.0, fail_ratio: float = 0.0, seed=None):
+        rng = random.Random(seed)
+        events = []
+        for i in range(count):
+            if events and rng.random() < duplicate_ratio:
+                events.append(rng.choice(events))
+                continue
+            reference, amount = payments[i % len(payments)]
+            events.append(json.dumps({
+                "id": f"evt_{uuid.uuid4().hex}",
+                "type": EVENT_PAYMENT_FAILED if rng.random() < fail_ratio else EVENT_PAYMENT_SUCCEEDED,
+                "data": {"reference": reference, "amount": str(amount)},
+            }).encode())
+        return events
+
+    def send(self, body: bytes) -> int:
+        return self.deliver(body, {SIGNATURE_HEADER: sign(self.secret, body), "Content-Type": "application/json"})
+
+    def burst(self, events, workers: int = 16) -> dict[int, int]:
+        """Deliver *events* concurrently; returns a count per HTTP status."""
+        statuses: dict[int, int] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for status in pool.map(self.send, events):
+                statuses[status] = statuses.get(status, 0) + 1
+        return statuses
+
+
+def http_deliverer(url: str, timeout: float = 10.0):
+    def deliver(body: bytes, headers: dict) -> int:
+        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+        except OSError:
+            return 0
+    return deliver
+
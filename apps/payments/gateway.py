@@ -0,0 +1,63 @@
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+# Gateway webhook contract. The body is JSON:
+#   {"id": "evt_…", "type": "payment.succeeded", "data": {"reference": "…", "amount": "50.00"}}
+# signed as  X-Gateway-Signature: t=<unix ts>,v1=<hex HMAC-SHA256 of "<ts>.<body>">
+SIGNATURE_HEADER = "X-Gateway-Signature"
+EVENT_PAYMENT_SUCCEEDED = "payment.succeeded"
+EVENT_PAYMENT_FAILED = "payment.failed"
+EVENT_PAYMENT_REFUNDED = "payment.refunded"
+
+
+@dataclass
+class GatewayEvent:
+    event_id: str
+    event_type: str
+    reference: str
+    amount: Decimal | None
+
+
+def _digest(secret: str, timestamp: int, body: bytes) -> str:
+    message = str(timestamp).encode() + b"." + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign(secret: str, body: bytes, timestamp: int | None = None) -> str:
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    return f"t={timestamp},v1={_digest(secret, timestamp, body)}"
+
+
+def verify_signature(secret: str, body: bytes, header: str, tolerance: int, now: float | None = None) -> bool:
+    # The timestamp is part of the signed message, so a captured request
+    # cannot be replayed once it falls outside the tolerance window.
+    try:
+        parts = dict(item.split("=", 1) for item in header.split(","))
+        timestamp = int(parts["t"])
+        signature = parts["v1"]
+    except (KeyError, ValueError):
+        return False
+    if abs((time.time() if now is None else now) - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(_digest(secret, timestamp, body), signature)
+
+
+def parse_event(body: bytes) -> GatewayEvent:
+    try:
+        data = json.loads(body)
+        event_id = str(data["id"])
+        event_type = str(data["type"])
+        reference = str(data["data"]["reference"])
+        amount = data["data"].get("amount")
+        amount = Decimal(str(amount)) if amount is not None else None
+    except (ValueError, KeyError, TypeError, AttributeError, InvalidOperation) as exc:
+        raise ValueError(f"Malformed gateway notification: {exc}") from exc
+    if not event_id or not reference:
+        raise ValueError("Gateway notification is missing its id or reference.")
+    if len(event_id) > 100 or len(reference) > 100 or len(event_type) > 50:
+        raise ValueError("Gateway notification field exceeds its maximum length.")
+    return GatewayEvent(event_id, event_type, reference, amount)
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from apps.payments.choices import PaymentStatus
+from apps.payments.models import Payment, PaymentDailyRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the PAID rows of the daily payment rollup from payments.paid_at. "
+        "Other statuses carry no timestamp and accumulate from deployment onwards."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                counts = self._rebuild()
+        except IntegrityError:
+            # A payment opened a new day's bucket while the rebuild ran.
+            raise CommandError("A PAID rollup row was created during the rebuild; run it again.")
+        self.stdout.write(self.style.SUCCESS(
+            "Rebuilt PAID rollups: {} created, {} updated, {} removed.".format(*counts)
+        ))
+
+    def _rebuild(self) -> tuple[int, int, int]:
+        # Locked before the aggregate: a confirmation that has not committed
+        # yet waits on its bucket and then adds to the rebuilt value, instead
+        # of being missed by the GROUP BY and overwritten.
+        existing = {
+            (row.day, row.visa_type_id): row
+            for row in PaymentDailyRollup.objects.select_for_update().filter(status=PaymentStatus.PAID)
+        }
+        # One GROUP BY over payments; refunded payments were paid on paid_at too.
+        buckets = (
+            Payment.objects
+            .filter(paid_at__isnull=False)
+            .annotate(day=TruncDate("paid_at"))
+            .values("day", "application__visa_type_id")
+            .annotate(payment_count=Count("id"), amount_total=Sum("amount"))
+            .order_by()
+        )
+        to_create, to_update = [], []
+        for bucket in buckets.iterator():
+            row = existing.pop((bucket["day"], bucket["application__visa_type_id"]), None)
+            if row is None:
+                to_create.append(PaymentDailyRollup(
+                    day=bucket["day"],
+                    visa_type_id=bucket["application__visa_type_id"],
+                    status=PaymentStatus.PAID,
+                    payment_count=bucket["payment_count"],
+                    amount_total=bucket["amount_total"],
+                ))
+            elif (row.payment_count, row.amount_total) != (bucket["payment_count"], bucket["amount_total"]):
+                row.payment_count = bucket["payment_count"]
+                row.amount_total = bucket["amount_total"]
+                to_update.append(row)
+        # Rows are rewritten in place, so waiting bumps still find them.
+        PaymentDailyRollup.objects.bulk_update(to_update, ["payment_count", "amount_total"], batch_size=1000)
+        PaymentDailyRollup.objects.filter(pk__in=[row.pk for row in existing.values()]).delete()
+        PaymentDailyRollup.objects.bulk_create(to_create, batch_size=1000)
+        return len(to_create), len(to_update), len(existing)
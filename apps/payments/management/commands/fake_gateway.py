@@ -0,0 +1,92 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from apps.payments.choices import PaymentStatus
+from apps.payments.fake_gateway import FakeGateway, http_deliverer
+from apps.payments.models import Payment
+from apps.payments.views import PaymentWebhookView
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a burst of signed gateway notifications for PENDING payments "
+        "against the webhook, for local and load testing. Never point this at production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000, help="Notifications to send.")
+        parser.add_argument(
+            "--duplicate-ratio",
+            type=float,
+            default=0.1,
+            help="Share of notifications that redeliver an earlier event.",
+        )
+        parser.add_argument(
+            "--fail-ratio",
+            type=float,
+            default=0.0,
+            help="Share of new events that report a failed payment.",
+        )
+        parser.add_argument(
+            "--url",
+            default="",
+            help="Webhook URL of a running server. Without it, the view is called in-process.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=16,
+            help="Concurrent deliveries (--url only; in-process delivery is sequential).",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        secret = settings.PAYMENT_WEBHOOK_SECRET
+        if not secret:
+            raise CommandError("PAYMENT_WEBHOOK_SECRET is not set.")
+        payments = list(
+            Payment.objects.filter(status=PaymentStatus.PENDING).values_list("reference", "amount")
+        )
+        if not payments:
+            raise CommandError("No PENDING payments to send notifications for.")
+
+        if options["url"]:
+            deliver, workers = http_deliverer(options["url"]), options["workers"]
+        else:
+            deliver, workers = self._in_process_deliverer(), 1
+
+        gateway = FakeGateway(secret, deliver)
+        events = gateway.build_events(
+            payments,
+            options["count"],
+            duplicate_ratio=options["duplicate_ratio"],
+            fail_ratio=options["fail_ratio"],
+            seed=options["seed"],
+        )
+        started = time.perf_counter()
+        statuses = gateway.burst(events, workers=workers)
+        elapsed = time.perf_counter() - started
+
+        summary = ", ".join(f"{status}: {n}" for status, n in sorted(statuses.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Delivered {len(events)} notification(s) in {elapsed:.2f}s "
+            f"({len(events) / elapsed if elapsed else 0:.0f}/s) — {summary}."
+        ))
+
+    def _in_process_deliverer(self):
+        factory = RequestFactory()
+        view = PaymentWebhookView.as_view()
+
+        def deliver(body: bytes, headers: dict) -> int:
+            request = factory.post(
+                "/payments/webhook/",
+                data=body,
+                content_type=headers["Content-Type"],
+                headers={k: v for k, v in headers.items() if k != "Content-Type"},
+            )
+            return view(request).status_code
+
+        return deliver
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.payments.services import process_payment_notifications
+
+
+class Command(BaseCommand):
+    help = "Apply payment gateway notifications waiting in the webhook inbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running as a worker, polling for new notifications.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls when the inbox is empty (with --loop).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Notifications claimed and applied per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            count = process_payment_notifications(batch_size=options["batch_size"])
+            processed += count
+            if count:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} notification(s)."))
@@ -0,0 +1,66 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.reconciliation import reconcile_settlement_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile a gateway settlement file (.csv or .jsonl, optionally .gz) "
+        "against Payment.reference, marking settled PENDING payments as PAID."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Settlement file to stream.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Rows matched and settled per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Match and report without changing any payment.",
+        )
+        parser.add_argument(
+            "--report",
+            default="",
+            help="Write every mismatch to this CSV file as it is found.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"Settlement file {path} does not exist.")
+
+        report_file = open(options["report"], "w", newline="", encoding="utf-8") if options["report"] else None
+        try:
+            if report_file is not None:
+                writer = csv.writer(report_file)
+                writer.writerow(["line", "reference", "kind", "detail"])
+                on_mismatch = lambda m: writer.writerow([m.line, m.reference, m.kind, m.detail])  # noqa: E731
+            else:
+                on_mismatch = lambda m: None  # noqa: E731
+            report = reconcile_settlement_file(
+                path,
+                on_mismatch,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if report_file is not None:
+                report_file.close()
+
+        prefix = "[dry run] " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}{report.rows} row(s): {report.matched} matched, {report.issued} visa(s) issued."
+        )
+        for kind, count in sorted(report.mismatches.items()):
+            self.stdout.write(f"  {kind}: {count}")
+        if not report.mismatches:
+            self.stdout.write(self.style.SUCCESS("No mismatches."))
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(help_text='Event id assigned by the payment gateway.', max_length=100, unique=True)),
+                ('event_type', models.CharField(max_length=50)),
+                ('reference', models.CharField(db_index=True, max_length=100)),
+                ('payload', models.TextField(help_text='Raw notification body as received.')),
+                ('status', models.CharField(choices=[('RECEIVED', 'Received'), ('PROCESSED', 'Processed'), ('IGNORED', 'Ignored'), ('FAILED', 'Failed')], default='RECEIVED', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Payment Notification',
+                'verbose_name_plural': 'Payment Notifications',
+                'db_table': 'payments_notification',
+                'indexes': [models.Index(fields=['status', 'id'], name='idx_notification_status_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_payment_notifications'),
+        ('visas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PAID', 'Paid'), ('FAILED', 'Failed'), ('REFUNDED', 'Refunded')], max_length=10)),
+                ('payment_count', models.PositiveIntegerField(default=0)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('visa_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payment_rollups', to='visas.visatype')),
+            ],
+            options={
+                'verbose_name': 'Payment Daily Rollup',
+                'verbose_name_plural': 'Payment Daily Rollups',
+                'db_table': 'payments_daily_rollup',
+                'indexes': [models.Index(fields=['status', 'day'], name='idx_rollup_status_day')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'visa_type', 'status'), name='uq_rollup_day_type_status')],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_payment_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentnotification',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, help_text='Earliest retry for a RECEIVED notification whose payment was not found yet.', null=True),
+        ),
+    ]
@@ -1,7 +1,7 @@
 import uuid
 from django.db import models
 
-from .choices import PaymentStatus
+from .choices import NotificationStatus, PaymentStatus
 
 
 class Payment(models.Model):
@@ -50,3 +50,85 @@ class Payment(models.Model):
     def __str__(self) -> str:
         return f"Payment {self.reference} [{self.status}]"
 
+
+class PaymentNotification(models.Model):
+    """
+    Webhook inbox. Gateway notifications are stored verbatim and acknowledged
+    straight away; process_payment_notifications applies them in batches.
+    """
+
+    event_id = models.CharField(
+        max_length=100,
+        unique=True,                # gateways redeliver; one row per event keeps receipt idempotent
+        help_text="Event id assigned by the payment gateway.",
+    )
+    event_type = models.CharField(max_length=50)
+    reference = models.CharField(
+        max_length=100,
+        db_index=True,              # joins the inbox to Payment.reference
+    )
+    payload = models.TextField(help_text="Raw notification body as received.")
+    status = models.CharField(
+        max_length=10,
+        choices=NotificationStatus.choices,
+        default=NotificationStatus.RECEIVED,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Earliest retry for a RECEIVED notification whose payment was not found yet.",
+    )
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "payments_notification"
+        verbose_name = "Payment Notification"
+        verbose_name_plural = "Payment Notifications"
+        indexes = [
+            # Worker drains RECEIVED rows oldest first.
+            models.Index(fields=["status", "id"], name="idx_notification_status_id"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_type} {self.event_id} [{self.status}]"
+
+
+class PaymentDailyRollup(models.Model):
+    """
+    Payments that entered each status, per day and visa type. Bumped in the
+    same transaction as the status change (see payments.services.bump_rollups),
+    so finance reports read O(days × visa types) rows instead of scanning
+    payments. PAID rows are gross revenue; REFUNDED rows are deducted on the
+    day of the refund.
+    """
+
+    day = models.DateField()
+    visa_type = models.ForeignKey(
+        "visas.VisaType",
+        on_delete=models.PROTECT,   # PROTECT: financial history outlives retired visa types
+        related_name="payment_rollups",
+    )
+    status = models.CharField(max_length=10, choices=PaymentStatus.choices)
+    payment_count = models.PositiveIntegerField(default=0)
+    amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "payments_daily_rollup"
+        verbose_name = "Payment Daily Rollup"
+        verbose_name_plural = "Payment Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "visa_type", "status"],
+                name="uq_rollup_day_type_status",
+            ),
+        ]
+        indexes = [
+            # Report range scans: WHERE status = … AND day BETWEEN … .
+            models.Index(fields=["status", "day"], name="idx_rollup_status_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.visa_type_id} {self.status}: {self.payment_count} / {self.amount_total}"
@@ -0,0 +1,208 @@
+import csv
+import gzip
+import io
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.applications.choices import ALLOWED_TRANSITIONS, ApplicationStatus
+from apps.applications.models import VisaApplication
+from apps.applications.services import write_status
+from apps.payments.choices import PaymentStatus
+from apps.payments.models import Payment
+from apps.payments.services import bump_rollups
+
+# Mismatch kinds reported back to finance.
+UNKNOWN_REFERENCE = "unknown_reference"
+AMOUNT_MISMATCH = "amount_mismatch"
+ALREADY_PAID = "already_paid"
+NOT_PENDING = "not_pending"         # FAILED or REFUNDED on our side
+INVALID_ROW = "invalid_row"
+
+
+@dataclass
+class SettlementRow:
+    line: int
+    reference: str
+    amount: Decimal | None
+    error: str = ""
+
+
+@dataclass
+class Mismatch:
+    line: int
+    reference: str
+    kind: str
+    detail: str
+
+
+@dataclass
+class ReconciliationReport:
+    rows: int = 0
+    matched: int = 0
+    issued: int = 0
+    mismatches: dict[str, int] = field(default_factory=dict)
+
+    def add(self, other: "ReconciliationReport") -> None:
+        self.rows += other.rows
+        self.matched += other.matched
+        self.issued += other.issued
+        for kind, count in other.mismatches.items():
+            self.mismatches[kind] = self.mismatches.get(kind, 0) + count
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return path.open(encoding="utf-8", newline="")
+
+
+def _parse_amount(value) -> Decimal | None:
+    if value in (None, ""):
+        return None
+    return Decimal(str(value))
+
+
+def iter_settlement_rows(path: Path):
+    """
+    Yield SettlementRow objects one at a time from a CSV (header row with
+    reference and amount columns) or JSONL settlement file, optionally
+    gzipped. Nothing beyond the current line is held in memory.
+    """
+    name = path.name[:-3] if path.suffix == ".gz" else path.name
+    with _open_text(path) as fh:
+        if name.endswith(".jsonl"):
+            for line_no, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    yield SettlementRow(line_no, str(record["reference"]), _parse_amount(record.get("amount")))
+                except (ValueError, KeyError, TypeError, InvalidOperation) as exc:
+                    yield SettlementRow(line_no, "", None, error=f"{type(exc).__name__}: {exc}")
+        elif name.endswith(".csv"):
+            reader = csv.DictReader(fh)
+            if not reader.fieldnames or "reference" not in reader.fieldnames:
+                raise ValueError("Settlement CSV needs a header row with a 'reference' column.")
+            for record in reader:
+                line_no = reader.line_num
+                try:
+                    yield SettlementRow(line_no, record["reference"].strip(), _parse_amount(record.get("amount")))
+                except (InvalidOperation, AttributeError) as exc:
+                    yield SettlementRow(line_no, record.get("reference") or "", None, error=f"Bad amount: {exc}")
+        else:
+            raise ValueError(f"Unsupported settlement file {path.name!r}; expected .csv or .jsonl (optionally .gz).")
+
+
+def iter_batches(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+@transaction.atomic
+def reconcile_batch(rows: list[SettlementRow], on_mismatch, dry_run: bool = False) -> ReconciliationReport:
+    """
+    Settle one batch: a single locking in_bulk lookup by reference, one UPDATE
+    for every matched PENDING payment, one status write (with its counters)
+    for the visas that become issuable, one INSERT for all their audit rows
+    and one bump per rollup bucket.
+    """
+    report = ReconciliationReport(rows=len(rows))
+
+    def mismatch(row, kind, detail):
+        report.mismatches[kind] = report.mismatches.get(kind, 0) + 1
+        on_mismatch(Mismatch(row.line, row.reference, kind, detail))
+
+    references = {row.reference for row in rows if not row.error}
+    payments = Payment.objects.select_for_update().in_bulk(references, field_name="reference")
+
+    to_pay: dict = {}   # reference -> Payment
+    for row in rows:
+        if row.error:
+            mismatch(row, INVALID_ROW, row.error)
+            continue
+        payment = payments.get(row.reference)
+        if payment is None:
+            mismatch(row, UNKNOWN_REFERENCE, "No payment with this reference.")
+        elif row.amount is not None and row.amount != payment.amount:
+            mismatch(row, AMOUNT_MISMATCH, f"Expected {payment.amount}, settled {row.amount}.")
+        elif payment.status == PaymentStatus.PAID or row.reference in to_pay:
+            mismatch(row, ALREADY_PAID, f"Already paid at {payment.paid_at or 'this run'}.")
+        elif payment.status != PaymentStatus.PENDING:
+            mismatch(row, NOT_PENDING, f"Payment is {payment.status}.")
+        else:
+            to_pay[row.reference] = payment
+
+    report.matched = len(to_pay)
+    if dry_run or not to_pay:
+        return report
+
+    now = timezone.now()
+    payment_ids = [payment.pk for payment in to_pay.values()]
+    Payment.objects.filter(pk__in=payment_ids, status=PaymentStatus.PENDING).update(
+        status=PaymentStatus.PAID, paid_at=now
+    )
+
+    # Same outcome as the webhook path: once paid, an approved application is issued.
+    application_ids = [payment.application_id for payment in to_pay.values()]
+    applications = {
+        pk: (status, visa_type_id)
+        for pk, status, visa_type_id in VisaApplication.objects.select_for_update()
+        .filter(pk__in=application_ids)
+        .values_list("pk", "status", "visa_type_id")
+    }
+    statuses = {pk: status for pk, (status, _) in applications.items()}
+    issuable = [
+        pk for pk, status in statuses.items()
+        if ApplicationStatus.ISSUED in ALLOWED_TRANSITIONS.get(status, set())
+    ]
+    by_status: dict = {}
+    for pk in issuable:
+        by_status.setdefault(statuses[pk], []).append(pk)
+    for status, pks in by_status.items():
+        write_status(pks, status, ApplicationStatus.ISSUED)
+    report.issued = len(issuable)
+    paid_day = timezone.localdate(now)
+    bump_rollups(
+        (paid_day, applications[payment.application_id][1], PaymentStatus.PAID, payment.amount)
+        for payment in to_pay.values()
+    )
+
+    from apps.audit.services import log_events
+
+    events = []
+    issuable_set = set(issuable)
+    for reference, payment in to_pay.items():
+        status = statuses[payment.application_id]
+        events.append({
+            "application_id": payment.application_id,
+            "previous_status": status,
+            "new_status": status,   # status unchanged; payment event only
+            "actor": None,
+            "reason": f"Payment confirmed by settlement reconciliation. Reference: {reference}.",
+        })
+        if payment.application_id in issuable_set:
+            events.append({
+                "application_id": payment.application_id,
+                "previous_status": status,
+                "new_status": ApplicationStatus.ISSUED,
+                "actor": None,
+                "reason": "Payment confirmed — visa issued.",
+            })
+    log_events(events)
+    return report
+
+
+def reconcile_settlement_file(path: Path, on_mismatch, batch_size: int = 2000, dry_run: bool = False) -> ReconciliationReport:
+    # One transaction per batch: a failure part-way leaves earlier batches
+    # settled, and re-running the file reports them as already_paid.
+    report = ReconciliationReport()
+    for batch in iter_batches(iter_settlement_rows(path), batch_size):
+        report.add(reconcile_batch(batch, on_mismatch, dry_run=dry_run))
+    return report
@@ -1,11 +1,52 @@
+import datetime
 import decimal
+import logging
 
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
-from apps.applications.exceptions import PaymentError
-from apps.payments.choices import PaymentStatus
-from apps.payments.models import Payment
+from apps.applications.exceptions import InvalidStateTransition, PaymentError, PaymentNotFound
+from apps.payments.choices import NotificationStatus, PaymentStatus
+from apps.payments.gateway import (
+    EVENT_PAYMENT_FAILED,
+    EVENT_PAYMENT_REFUNDED,
+    EVENT_PAYMENT_SUCCEEDED,
+    GatewayEvent,
+    parse_event,
+)
+from apps.payments.models import Payment, PaymentDailyRollup, PaymentNotification
+
+logger = logging.getLogger(__name__)
+
+
+def bump_rollups(changes) -> None:
+    """
+    Count payments into PaymentDailyRollup. *changes* yields one
+    (day, visa_type_id, status, amount) per payment entering *status*; call
+    it inside the transaction that changes those payments.
+    """
+    totals: dict = {}
+    for day, visa_type_id, status, amount in changes:
+        count, total = totals.get((day, visa_type_id, status), (0, decimal.Decimal("0")))
+        totals[(day, visa_type_id, status)] = (count + 1, total + amount)
+
+    # Sorted so concurrent transactions take row locks in the same order.
+    for (day, visa_type_id, status), (count, total) in sorted(totals.items()):
+        bucket = PaymentDailyRollup.objects.filter(day=day, visa_type_id=visa_type_id, status=status)
+        increment = {"payment_count": F("payment_count") + count, "amount_total": F("amount_total") + total}
+        if bucket.update(**increment):
+            continue
+        try:
+            with transaction.atomic():
+                PaymentDailyRollup.objects.create(
+                    day=day, visa_type_id=visa_type_id, status=status,
+                    payment_count=count, amount_total=total,
+                )
+        except IntegrityError:
+            # Another transaction created the bucket first; add to it instead.
+            bucket.update(**increment)
 
 
 @transaction.atomic
@@ -33,6 +74,7 @@ def mark_as_paid(application, reference: str) -> Payment:
     payment.status = PaymentStatus.PAID
     payment.paid_at = timezone.now()
     payment.save(update_fields=["status", "paid_at"])
+    bump_rollups([(timezone.localdate(payment.paid_at), application.visa_type_id, PaymentStatus.PAID, payment.amount)])
 
     from apps.audit.services import log_event
 
@@ -47,6 +89,119 @@ def mark_as_paid(application, reference: str) -> Payment:
     return payment
 
 
+@transaction.atomic
+def confirm_payment_and_issue(application, reference: str) -> Payment:
+    """
+    Confirm the payment and issue the visa in one transaction under one lock.
+    Replaces mark_as_paid() followed by issue_visa(), which took two
+    transactions and left a window where an application was paid but not
+    issued. Fixed cost: one locking SELECT, the payment and status UPDATEs,
+    one audit INSERT, plus the status counter and revenue rollup bumps.
+    """
+    # Locks the payment and (via the join) its application, so concurrent
+    # confirmations of the same application serialise on this statement.
+    try:
+        payment = (
+            Payment.objects
+            .select_for_update()
+            .select_related("application")
+            .get(application_id=application.pk)
+        )
+    except Payment.DoesNotExist:
+        raise PaymentError(
+            f"No payment record found for application {application.id}. "
+            "A payment record must be created before it can be confirmed."
+        )
+
+    if payment.status == PaymentStatus.PAID:
+        raise PaymentError(
+            f"Application {application.id} has already been marked as paid "
+            f"(reference: {payment.reference!r}). Double-payment prevented."
+        )
+    if payment.reference != reference:
+        raise PaymentError(
+            f"Reference mismatch for application {application.id}. "
+            f"Expected {payment.reference!r}, received {reference!r}."
+        )
+
+    from apps.applications.choices import ALLOWED_TRANSITIONS, ApplicationStatus
+    from apps.applications.services import write_status
+
+    current = payment.application.status
+    if ApplicationStatus.ISSUED not in ALLOWED_TRANSITIONS.get(current, set()):
+        raise InvalidStateTransition(
+            f"Cannot transition '{application.id}' from {current!r} to "
+            f"{ApplicationStatus.ISSUED!r}."
+        )
+
+    payment.status = PaymentStatus.PAID
+    payment.paid_at = timezone.now()
+    payment.save(update_fields=["status", "paid_at"])
+
+    locked_application = payment.application
+    write_status([locked_application.pk], current, ApplicationStatus.ISSUED)
+    locked_application.status = ApplicationStatus.ISSUED
+    bump_rollups([
+        (timezone.localdate(payment.paid_at), locked_application.visa_type_id, PaymentStatus.PAID, payment.amount),
+    ])
+
+    from apps.audit.services import log_events
+
+    log_events([
+        {
+            "application_id": application.pk,
+            "previous_status": current,
+            "new_status": current,      # status unchanged; payment event only
+            "actor": None,
+            "reason": f"Payment confirmed. Reference: {reference}.",
+        },
+        {
+            "application_id": application.pk,
+            "previous_status": current,
+            "new_status": ApplicationStatus.ISSUED,
+            "actor": None,              # SYSTEM action
+            "reason": "Payment confirmed — visa issued.",
+        },
+    ])
+
+    # Keep the caller's instance in step with what was written.
+    application.status = ApplicationStatus.ISSUED
+    return payment
+
+
+@transaction.atomic
+def refund_payment(application, reference: str) -> Payment:
+    # The refund is deducted from revenue on the day it happens; the PAID
+    # rollup for the day of payment is left as it was.
+    try:
+        payment = Payment.objects.select_for_update().get(application=application)
+    except Payment.DoesNotExist:
+        raise PaymentError(f"No payment record found for application {application.id}.")
+
+    if payment.reference != reference:
+        raise PaymentError(
+            f"Reference mismatch for application {application.id}. "
+            f"Expected {payment.reference!r}, received {reference!r}."
+        )
+    if payment.status != PaymentStatus.PAID:
+        raise PaymentError(f"Only a paid payment can be refunded; {payment.reference!r} is {payment.status}.")
+
+    payment.status = PaymentStatus.REFUNDED
+    payment.save(update_fields=["status"])
+    bump_rollups([(timezone.localdate(), application.visa_type_id, PaymentStatus.REFUNDED, payment.amount)])
+
+    from apps.audit.services import log_event
+
+    log_event(
+        application=application,
+        previous_status=application.status,
+        new_status=application.status,  # status unchanged; payment event only
+        actor=None,
+        reason=f"Payment refunded. Reference: {reference}.",
+    )
+    return payment
+
+
 @transaction.atomic
 def create_payment_record(application, amount: decimal.Decimal, reference: str) -> Payment:
     if Payment.objects.filter(application=application).exists():
@@ -59,9 +214,142 @@ def create_payment_record(application, amount: decimal.Decimal, reference: str)
             f"Payment amount must be positive. Received: {amount}."
         )
 
-    return Payment.objects.create(
+    payment = Payment.objects.create(
         application=application,
         amount=amount,
         reference=reference,
         status=PaymentStatus.PENDING,
     )
+    bump_rollups([(timezone.localdate(), application.visa_type_id, PaymentStatus.PENDING, amount)])
+    return payment
+
+
+def record_notification(event: GatewayEvent, body: bytes) -> bool:
+    """Store a verified webhook in the inbox; False when the event was already received."""
+    try:
+        with transaction.atomic():
+            PaymentNotification.objects.create(
+                event_id=event.event_id,
+                event_type=event.event_type,
+                reference=event.reference,
+                payload=body.decode("utf-8", errors="replace"),
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def _apply_notification(notification: PaymentNotification, payment: Payment | None) -> str:
+    if payment is None:
+        raise PaymentNotFound(f"No payment record with reference {notification.reference!r}.")
+    event = parse_event(notification.payload.encode("utf-8"))
+
+    if event.event_type == EVENT_PAYMENT_SUCCEEDED:
+        if payment.status == PaymentStatus.PAID:
+            # Already confirmed, by an earlier event or by the applicant's own request.
+            return NotificationStatus.IGNORED
+        if event.amount is not None and event.amount != payment.amount:
+            raise PaymentError(
+                f"Amount mismatch for {payment.reference!r}: "
+                f"expected {payment.amount}, gateway reported {event.amount}."
+            )
+        confirm_payment_and_issue(payment.application, reference=payment.reference)
+        return NotificationStatus.PROCESSED
+
+    if event.event_type == EVENT_PAYMENT_FAILED:
+        if payment.status != PaymentStatus.PENDING:
+            return NotificationStatus.IGNORED
+        payment.status = PaymentStatus.FAILED
+        payment.save(update_fields=["status"])
+        application = payment.application
+        bump_rollups([(timezone.localdate(), application.visa_type_id, PaymentStatus.FAILED, payment.amount)])
+
+        from apps.audit.services import log_event
+
+        log_event(
+            application=application,
+            previous_status=application.status,
+            new_status=application.status,  # status unchanged; payment event only
+            actor=None,
+            reason=f"Payment failed at gateway. Reference: {payment.reference}.",
+        )
+        return NotificationStatus.PROCESSED
+
+    if event.event_type == EVENT_PAYMENT_REFUNDED:
+        if payment.status == PaymentStatus.REFUNDED:
+            return NotificationStatus.IGNORED
+        refund_payment(payment.application, reference=payment.reference)
+        return NotificationStatus.PROCESSED
+
+    return NotificationStatus.IGNORED
+
+
+def _retry_delay(attempts: int) -> datetime.timedelta:
+    """Backoff before the next try of a notification that has failed *attempts* times."""
+    return datetime.timedelta(seconds=settings.PAYMENT_NOTIFICATION_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def process_payment_notifications(batch_size: int = 200) -> int:
+    """
+    Apply one batch of due inbox notifications in a single transaction. Rows
+    are claimed with SKIP LOCKED so several workers can drain the inbox
+    together; each notification runs in its own savepoint, so one bad event,
+    whatever it raises, is marked FAILED without undoing the rest of the batch. An event whose
+    payment record does not exist yet stays RECEIVED and is retried with
+    backoff until PAYMENT_NOTIFICATION_MAX_ATTEMPTS.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            PaymentNotification.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=NotificationStatus.RECEIVED)
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+            .order_by("id")[:batch_size]
+        )
+        if not batch:
+            return 0
+
+        payments = {
+            payment.reference: payment
+            for payment in Payment.objects
+            .select_for_update()
+            .select_related("application")
+            .filter(reference__in={n.reference for n in batch})
+        }
+        for notification in batch:
+            notification.attempts += 1
+            notification.next_attempt_at = None
+            try:
+                with transaction.atomic():
+                    notification.status = _apply_notification(
+                        notification, payments.get(notification.reference)
+                    )
+                notification.last_error = ""
+            except PaymentNotFound as exc:
+                # The gateway can call back before the payment record is
+                # committed; only give up once the retries are spent.
+                notification.last_error = str(exc)
+                if notification.attempts < settings.PAYMENT_NOTIFICATION_MAX_ATTEMPTS:
+                    notification.next_attempt_at = now + _retry_delay(notification.attempts)
+                else:
+                    notification.status = NotificationStatus.FAILED
+            except (PaymentError, InvalidStateTransition, ValueError) as exc:
+                notification.status = NotificationStatus.FAILED
+                notification.last_error = str(exc)
+            except Exception as exc:
+                # Anything unexpected fails this event alone; left to escape it
+                # would roll back the batch and block the inbox on every run.
+                logger.exception("Payment notification %s failed", notification.event_id)
+                notification.status = NotificationStatus.FAILED
+                notification.last_error = f"{type(exc).__name__}: {exc}"
+            notification.processed_at = now
+            payment = payments.get(notification.reference)
+            if payment is not None and notification.status != NotificationStatus.IGNORED:
+                # Later events for the same payment must see this one's outcome.
+                payment.refresh_from_db(fields=["status", "paid_at"])
+
+        PaymentNotification.objects.bulk_update(
+            batch, ["status", "attempts", "last_error", "next_attempt_at", "processed_at"]
+        )
+    return len(batch)
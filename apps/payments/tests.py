@@ -1,3 +1,610 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.choices import UserRole
+from apps.accounts.models import User
+from apps.applications.choices import ApplicationStatus
+from apps.applications.counters import get_status_counts, reconcile_counters
+from apps.applications.exceptions import PaymentError
+from apps.applications.models import VisaApplication
+from apps.audit.models import AuditOutbox
+from apps.payments import services
+from apps.payments.choices import NotificationStatus, PaymentStatus
+from apps.payments.gateway import (
+    EVENT_PAYMENT_FAILED,
+    EVENT_PAYMENT_REFUNDED,
+    EVENT_PAYMENT_SUCCEEDED,
+    SIGNATURE_HEADER,
+    parse_event,
+    sign,
+    verify_signature,
+)
+from apps.payments.models import Payment, PaymentDailyRollup, PaymentNotification
+from apps.payments.reconciliation import (
+    ALREADY_PAID,
+    AMOUNT_MISMATCH,
+    INVALID_ROW,
+    NOT_PENDING,
+    UNKNOWN_REFERENCE,
+    SettlementRow,
+    iter_settlement_rows,
+    reconcile_batch,
+)
+from apps.payments.services import (
+    confirm_payment_and_issue,
+    mark_as_paid,
+    process_payment_notifications,
+    record_notification,
+    refund_payment,
+)
+from apps.visas.models import VisaType
+
+SECRET = "whsec_test"
+
+
+def event_body(event_id="evt_1", reference="ref-1", event_type=EVENT_PAYMENT_SUCCEEDED, amount="50.00") -> bytes:
+    return json.dumps({
+        "id": event_id,
+        "type": event_type,
+        "data": {"reference": reference, "amount": amount},
+    }).encode()
+
+
+class SignatureTests(SimpleTestCase):
+    def test_valid_signature(self):
+        body = event_body()
+        self.assertTrue(verify_signature(SECRET, body, sign(SECRET, body), tolerance=300))
+
+    def test_tampered_body_is_rejected(self):
+        header = sign(SECRET, event_body(amount="50.00"))
+        self.assertFalse(verify_signature(SECRET, event_body(amount="0.01"), header, tolerance=300))
+
+    def test_wrong_secret_is_rejected(self):
+        body = event_body()
+        self.assertFalse(verify_signature(SECRET, body, sign("other", body), tolerance=300))
+
+    def test_replay_outside_tolerance_is_rejected(self):
+        body = event_body()
+        signed_at = int(time.time()) - 301
+        header = sign(SECRET, body, timestamp=signed_at)
+        self.assertFalse(verify_signature(SECRET, body, header, tolerance=300))
+        self.assertTrue(verify_signature(SECRET, body, header, tolerance=300, now=signed_at + 300))
+
+    def test_timestamp_cannot_be_swapped(self):
+        # Re-dating a captured request breaks the signature, since t is signed.
+        body = event_body()
+        old = sign(SECRET, body, timestamp=int(time.time()) - 3600)
+        forged = f"t={int(time.time())},{old.split(',', 1)[1]}"
+        self.assertFalse(verify_signature(SECRET, body, forged, tolerance=300))
+
+    def test_malformed_header_is_rejected(self):
+        for header in ("", "garbage", "t=abc,v1=00", "v1=00"):
+            with self.subTest(header=header):
+                self.assertFalse(verify_signature(SECRET, event_body(), header, tolerance=300))
+
+    def test_parse_event(self):
+        event = parse_event(event_body(amount="12.50"))
+        self.assertEqual((event.event_id, event.reference, event.amount), ("evt_1", "ref-1", Decimal("12.50")))
+        with self.assertRaises(ValueError):
+            parse_event(b'{"id": "evt_1"}')
+
+
+class PaymentTestCase(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("applicant@example.com", "pw")
+        self.visa_type = VisaType.objects.create(code="TOURIST_30", name="Tourist", fee_amount=50, max_stay_days=30)
+
+    def make_application(self, **fields) -> VisaApplication:
+        return VisaApplication.objects.create(
+            applicant=self.applicant,
+            visa_type=self.visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+            **fields,
+        )
+
+    def make_payment(self, reference="ref-1", amount=Decimal("50.00")) -> Payment:
+        application = self.make_application(status=ApplicationStatus.APPROVED)
+        return Payment.objects.create(application=application, amount=amount, reference=reference)
+
+
+class ConfirmPaymentTests(PaymentTestCase):
+    def test_confirm_issues_and_audits_once(self):
+        payment = self.make_payment()
+        confirm_payment_and_issue(payment.application, reference="ref-1")
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.PAID)
+        self.assertEqual(payment.application.status, ApplicationStatus.ISSUED)
+        self.assertEqual(
+            AuditOutbox.objects.filter(
+                application_id=payment.application_id, new_status=ApplicationStatus.ISSUED
+            ).count(),
+            1,
+        )
+        rollup = PaymentDailyRollup.objects.get(status=PaymentStatus.PAID)
+        self.assertEqual((rollup.payment_count, rollup.amount_total), (1, Decimal("50.00")))
+
+    def test_second_confirmation_is_refused(self):
+        payment = self.make_payment()
+        confirm_payment_and_issue(payment.application, reference="ref-1")
+        with self.assertRaisesMessage(PaymentError, "Double-payment prevented"):
+            confirm_payment_and_issue(VisaApplication.objects.get(pk=payment.application_id), reference="ref-1")
+
+    def test_reference_mismatch_changes_nothing(self):
+        payment = self.make_payment()
+        with self.assertRaisesMessage(PaymentError, "Reference mismatch"):
+            confirm_payment_and_issue(payment.application, reference="ref-other")
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.PENDING)
+        self.assertEqual(payment.application.status, ApplicationStatus.APPROVED)
+
+
+class IssueCounterTests(PaymentTestCase):
+    """Issuing a visa on payment moves it APPROVED -> ISSUED in the status counters."""
+
+    def test_confirmation_moves_the_counts(self):
+        payment = self.make_payment()
+        reconcile_counters()
+        confirm_payment_and_issue(payment.application, reference="ref-1")
+
+        self.assertEqual(get_status_counts(), {ApplicationStatus.ISSUED: 1})
+        self.assertEqual(reconcile_counters(dry_run=True), {})
+
+    def test_settlement_moves_the_counts(self):
+        for n in range(3):
+            self.make_payment(reference=f"ref-{n}")
+        soft_deleted = self.make_payment(reference="ref-deleted")
+        VisaApplication.objects.filter(pk=soft_deleted.application_id).update(soft_deleted_at=timezone.now())
+        reconcile_counters()
+
+        rows = [SettlementRow(n + 1, f"ref-{n}", Decimal("50.00")) for n in range(3)]
+        rows.append(SettlementRow(4, "ref-deleted", Decimal("50.00")))
+        report = reconcile_batch(rows, on_mismatch=self.fail)
+
+        self.assertEqual(report.issued, 4)
+        self.assertEqual(get_status_counts(), {ApplicationStatus.ISSUED: 3})
+        self.assertEqual(reconcile_counters(dry_run=True), {})
+
+
+class ConcurrentConfirmPaymentTests(TransactionTestCase):
+    """Double-submits from two threads must serialise on the payment row lock."""
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_concurrent_confirmations_issue_once(self):
+        applicant = User.objects.create_user("applicant@example.com", "pw")
+        visa_type = VisaType.objects.create(code="TOURIST_30", name="Tourist", fee_amount=50, max_stay_days=30)
+        application = VisaApplication.objects.create(
+            applicant=applicant,
+            visa_type=visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+            status=ApplicationStatus.APPROVED,
+        )
+        Payment.objects.create(application=application, amount=Decimal("50.00"), reference="ref-1")
+
+        barrier = threading.Barrier(2)
+        outcomes = []
+
+        def submit():
+            try:
+                own_copy = VisaApplication.objects.get(pk=application.pk)
+                barrier.wait()
+                confirm_payment_and_issue(own_copy, reference="ref-1")
+                outcomes.append("issued")
+            except PaymentError:
+                outcomes.append("refused")
+            except Exception as exc:
+                outcomes.append(repr(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ["issued", "refused"])
+        application.refresh_from_db()
+        self.assertEqual(application.status, ApplicationStatus.ISSUED)
+        self.assertEqual(
+            AuditOutbox.objects.filter(
+                application_id=application.pk, new_status=ApplicationStatus.ISSUED
+            ).count(),
+            1,
+        )
+        rollup = PaymentDailyRollup.objects.get(status=PaymentStatus.PAID)
+        self.assertEqual(rollup.payment_count, 1)
+
+
+@override_settings(PAYMENT_WEBHOOK_SECRET=SECRET, PAYMENT_WEBHOOK_TOLERANCE_SECONDS=300)
+class WebhookViewTests(PaymentTestCase):
+    def post(self, body, header=None):
+        header = sign(SECRET, body) if header is None else header
+        return self.client.post(
+            reverse("payments:webhook"), body, content_type="application/json",
+            headers={SIGNATURE_HEADER: header},
+        )
+
+    def test_signed_event_is_stored(self):
+        response = self.post(event_body())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"received": True, "duplicate": False})
+        self.assertEqual(PaymentNotification.objects.get().status, NotificationStatus.RECEIVED)
+
+    def test_redelivery_is_acknowledged_once(self):
+        self.post(event_body())
+        response = self.post(event_body())
+        self.assertEqual(response.json(), {"received": True, "duplicate": True})
+        self.assertEqual(PaymentNotification.objects.count(), 1)
+
+    def test_bad_signature_is_refused(self):
+        response = self.post(event_body(), header=sign("other", event_body()))
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(PaymentNotification.objects.exists())
+
+    def test_stale_signature_is_refused(self):
+        body = event_body()
+        response = self.post(body, header=sign(SECRET, body, timestamp=int(time.time()) - 3600))
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(PAYMENT_WEBHOOK_SECRET="")
+    def test_unconfigured_secret_refuses_everything(self):
+        self.assertEqual(self.post(event_body()).status_code, 401)
+
+    def test_malformed_event_is_a_bad_request(self):
+        self.assertEqual(self.post(b'{"id": "evt_1"}').status_code, 400)
+
+
+@override_settings(PAYMENT_NOTIFICATION_MAX_ATTEMPTS=3, PAYMENT_NOTIFICATION_RETRY_SECONDS=30)
+class NotificationProcessingTests(PaymentTestCase):
+    def receive(self, **kwargs) -> PaymentNotification:
+        body = event_body(**kwargs)
+        event = parse_event(body)
+        return PaymentNotification.objects.create(
+            event_id=event.event_id, event_type=event.event_type,
+            reference=event.reference, payload=body.decode(),
+        )
+
+    def make_due(self, notification):
+        PaymentNotification.objects.filter(pk=notification.pk).update(next_attempt_at=timezone.now())
+
+    def test_success_issues_the_visa(self):
+        payment = self.make_payment()
+        notification = self.receive()
+        self.assertEqual(process_payment_notifications(), 1)
+
+        notification.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual(notification.status, NotificationStatus.PROCESSED)
+        self.assertEqual(payment.status, PaymentStatus.PAID)
+        self.assertEqual(payment.application.status, ApplicationStatus.ISSUED)
+
+    def test_duplicate_success_is_ignored(self):
+        self.make_payment()
+        first = self.receive(event_id="evt_1")
+        second = self.receive(event_id="evt_2")
+        process_payment_notifications()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, NotificationStatus.PROCESSED)
+        self.assertEqual(second.status, NotificationStatus.IGNORED)
+
+    def test_failure_event_marks_payment_failed(self):
+        payment = self.make_payment()
+        self.receive(event_type=EVENT_PAYMENT_FAILED)
+        process_payment_notifications()
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.FAILED)
+
+    def test_unknown_reference_is_retried_with_backoff(self):
+        notification = self.receive(reference="ref-late")
+        before = timezone.now()
+        process_payment_notifications()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, NotificationStatus.RECEIVED)
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn("ref-late", notification.last_error)
+        self.assertGreaterEqual(notification.next_attempt_at, before + datetime.timedelta(seconds=30))
+
+        # Not due yet: the worker leaves it alone.
+        self.assertEqual(process_payment_notifications(), 0)
+
+        self.make_due(notification)
+        process_payment_notifications()
+        notification.refresh_from_db()
+        self.assertEqual(notification.attempts, 2)
+        self.assertGreaterEqual(notification.next_attempt_at, timezone.now() + datetime.timedelta(seconds=59))
+
+    def test_retry_succeeds_once_the_payment_exists(self):
+        notification = self.receive(reference="ref-late")
+        process_payment_notifications()
+
+        payment = self.make_payment(reference="ref-late")
+        self.make_due(notification)
+        process_payment_notifications()
+
+        notification.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual(notification.status, NotificationStatus.PROCESSED)
+        self.assertIsNone(notification.next_attempt_at)
+        self.assertEqual(notification.last_error, "")
+        self.assertEqual(payment.status, PaymentStatus.PAID)
+
+    def test_unknown_reference_fails_after_max_attempts(self):
+        notification = self.receive(reference="ref-never")
+        for _ in range(3):
+            self.make_due(notification)
+            process_payment_notifications()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, NotificationStatus.FAILED)
+        self.assertEqual(notification.attempts, 3)
+        self.assertIsNone(notification.next_attempt_at)
+
+    def test_amount_mismatch_fails_at_once(self):
+        payment = self.make_payment()
+        notification = self.receive(amount="1.00")
+        process_payment_notifications()
+
+        notification.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual(notification.status, NotificationStatus.FAILED)
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn("Amount mismatch", notification.last_error)
+        self.assertEqual(payment.status, PaymentStatus.PENDING)
+
+    def test_unexpected_error_fails_only_that_event(self):
+        poison = self.receive(event_id="evt_poison", reference="ref-poison")
+        payment = self.make_payment()
+        good = self.receive(event_id="evt_good")
+        apply = services._apply_notification
+
+        def explode_on_poison(notification, payment):
+            if notification.event_id == "evt_poison":
+                raise KeyError("data")
+            return apply(notification, payment)
+
+        with mock.patch.object(services, "_apply_notification", explode_on_poison), \
+                self.assertLogs("apps.payments.services", "ERROR"):
+            self.assertEqual(process_payment_notifications(), 2)
+
+        poison.refresh_from_db()
+        good.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual((poison.status, poison.last_error), (NotificationStatus.FAILED, "KeyError: 'data'"))
+        self.assertEqual(good.status, NotificationStatus.PROCESSED)
+        self.assertEqual(payment.status, PaymentStatus.PAID)
+        self.assertEqual(process_payment_notifications(), 0)
+
+
+class ReconciliationTests(PaymentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def settle(self, rows, dry_run=False):
+        mismatches = []
+        report = reconcile_batch(rows, on_mismatch=mismatches.append, dry_run=dry_run)
+        return report, {(m.line, m.kind) for m in mismatches}
+
+    def test_each_mismatch_kind(self):
+        self.make_payment(reference="ref-ok")
+        self.make_payment(reference="ref-wrong-amount")
+        paid = self.make_payment(reference="ref-paid")
+        Payment.objects.filter(pk=paid.pk).update(status=PaymentStatus.PAID, paid_at=timezone.now())
+        failed = self.make_payment(reference="ref-failed")
+        Payment.objects.filter(pk=failed.pk).update(status=PaymentStatus.FAILED)
+
+        report, mismatches = self.settle([
+            SettlementRow(1, "ref-ok", Decimal("50.00")),
+            SettlementRow(2, "ref-nobody", Decimal("50.00")),
+            SettlementRow(3, "ref-wrong-amount", Decimal("5.00")),
+            SettlementRow(4, "ref-paid", Decimal("50.00")),
+            SettlementRow(5, "ref-ok", Decimal("50.00")),     # settled twice in one file
+            SettlementRow(6, "ref-failed", Decimal("50.00")),
+            SettlementRow(7, "", None, error="Bad amount: x"),
+        ])
+
+        self.assertEqual(mismatches, {
+            (2, UNKNOWN_REFERENCE), (3, AMOUNT_MISMATCH), (4, ALREADY_PAID),
+            (5, ALREADY_PAID), (6, NOT_PENDING), (7, INVALID_ROW),
+        })
+        self.assertEqual((report.rows, report.matched, report.issued), (7, 1, 1))
+        self.assertEqual(report.mismatches, {
+            UNKNOWN_REFERENCE: 1, AMOUNT_MISMATCH: 1, ALREADY_PAID: 2, NOT_PENDING: 1, INVALID_ROW: 1,
+        })
+        statuses = dict(Payment.objects.values_list("reference", "status"))
+        self.assertEqual(statuses["ref-ok"], PaymentStatus.PAID)
+        self.assertEqual(statuses["ref-wrong-amount"], PaymentStatus.PENDING)
+        self.assertEqual(statuses["ref-failed"], PaymentStatus.FAILED)
+
+    def test_settlement_issues_and_audits(self):
+        payment = self.make_payment()
+        self.settle([SettlementRow(1, "ref-1", None)])   # no amount: reference alone matches
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.PAID)
+        self.assertEqual(payment.application.status, ApplicationStatus.ISSUED)
+        self.assertEqual(
+            AuditOutbox.objects.filter(
+                application_id=payment.application_id, new_status=ApplicationStatus.ISSUED
+            ).count(),
+            1,
+        )
+        rollup = PaymentDailyRollup.objects.get(status=PaymentStatus.PAID)
+        self.assertEqual((rollup.payment_count, rollup.amount_total), (1, Decimal("50.00")))
+
+    def test_dry_run_changes_nothing(self):
+        payment = self.make_payment()
+        report, mismatches = self.settle([SettlementRow(1, "ref-1", Decimal("50.00"))], dry_run=True)
+
+        self.assertEqual((report.matched, report.issued, mismatches), (1, 0, set()))
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.PENDING)
+        self.assertEqual(payment.application.status, ApplicationStatus.APPROVED)
+        self.assertFalse(PaymentDailyRollup.objects.exists())
+        self.assertFalse(AuditOutbox.objects.exists())
+
+    def test_file_formats(self):
+        self.make_payment(reference="ref-1")
+        self.make_payment(reference="ref-2")
+        csv_path = self.tmp / "settlement.csv"
+        csv_path.write_text("reference,amount\nref-1,50.00\nref-x,abc\n")
+        jsonl_path = self.tmp / "settlement.jsonl.gz"
+        with gzip.open(jsonl_path, "wt") as fh:
+            fh.write('{"reference": "ref-2", "amount": "50.00"}\n\nnot json\n')
+
+        self.assertEqual(
+            [(r.line, r.reference, r.amount, bool(r.error)) for r in iter_settlement_rows(csv_path)],
+            [(2, "ref-1", Decimal("50.00"), False), (3, "ref-x", None, True)],
+        )
+        self.assertEqual(
+            [(r.line, r.reference, bool(r.error)) for r in iter_settlement_rows(jsonl_path)],
+            [(1, "ref-2", False), (3, "", True)],
+        )
+        txt_path = self.tmp / "settlement.txt"
+        txt_path.write_text("ref-1\n")
+        with self.assertRaisesMessage(ValueError, "expected .csv or .jsonl"):
+            list(iter_settlement_rows(txt_path))
+
+    def test_command_report(self):
+        self.make_payment(reference="ref-1")
+        path = self.tmp / "settlement.csv"
+        path.write_text("reference,amount\nref-1,50.00\nref-nobody,10.00\n")
+        report_path = self.tmp / "mismatches.csv"
+
+        out = io.StringIO()
+        call_command("reconcile_settlements", str(path), "--dry-run", stdout=out)
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            ["[dry run] 2 row(s): 1 matched, 0 visa(s) issued.", f"  {UNKNOWN_REFERENCE}: 1"],
+        )
+
+        out = io.StringIO()
+        call_command("reconcile_settlements", str(path), "--report", str(report_path), stdout=out)
+        self.assertIn("2 row(s): 1 matched, 1 visa(s) issued.", out.getvalue())
+        with report_path.open(newline="") as fh:
+            self.assertEqual(list(csv.reader(fh)), [
+                ["line", "reference", "kind", "detail"],
+                ["3", "ref-nobody", UNKNOWN_REFERENCE, "No payment with this reference."],
+            ])
+
+        out = io.StringIO()
+        call_command("reconcile_settlements", str(path), stdout=out)
+        self.assertIn(f"  {ALREADY_PAID}: 1", out.getvalue())
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            call_command("reconcile_settlements", str(self.tmp / "missing.csv"))
+
+
+class RevenueRollupTests(PaymentTestCase):
+    def rollup(self, status, day=None):
+        row = PaymentDailyRollup.objects.filter(
+            day=day or timezone.localdate(), visa_type=self.visa_type, status=status,
+        ).first()
+        return (row.payment_count, row.amount_total) if row else (0, Decimal("0"))
+
+    def test_mark_as_paid_and_refund_move_the_day(self):
+        payment = self.make_payment()
+        mark_as_paid(payment.application, reference="ref-1")
+        self.assertEqual(self.rollup(PaymentStatus.PAID), (1, Decimal("50.00")))
+
+        refund_payment(payment.application, reference="ref-1")
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.REFUNDED)
+        self.assertEqual(self.rollup(PaymentStatus.REFUNDED), (1, Decimal("50.00")))
+        self.assertEqual(self.rollup(PaymentStatus.PAID), (1, Decimal("50.00")))   # gross revenue stays
+
+        with self.assertRaisesMessage(PaymentError, "Only a paid payment can be refunded"):
+            refund_payment(payment.application, reference="ref-1")
+        self.assertEqual(self.rollup(PaymentStatus.REFUNDED), (1, Decimal("50.00")))
+
+    def test_refund_event(self):
+        payment = self.make_payment()
+        confirm_payment_and_issue(payment.application, reference="ref-1")
+        body = event_body(event_id="evt_refund", event_type=EVENT_PAYMENT_REFUNDED)
+        record_notification(parse_event(body), body)
+        process_payment_notifications()
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.REFUNDED)
+        self.assertEqual(self.rollup(PaymentStatus.REFUNDED), (1, Decimal("50.00")))
+
+    def test_report_reads_only_the_rollups(self):
+        supervisor = User.objects.create_user("supervisor@example.com", "pw", role=UserRole.SUPERVISOR)
+        self.client.force_login(supervisor)
+        today = timezone.localdate()
+        # A payment with no rollup is invisible to the report...
+        Payment.objects.create(
+            application=self.make_application(), amount=Decimal("999.00"), reference="ref-unrolled",
+            status=PaymentStatus.PAID, paid_at=timezone.now(),
+        )
+        # ...and rollups with no payments behind them are reported as they stand.
+        PaymentDailyRollup.objects.create(
+            day=today, visa_type=self.visa_type, status=PaymentStatus.PAID,
+            payment_count=3, amount_total=Decimal("150.00"),
+        )
+        PaymentDailyRollup.objects.create(
+            day=today, visa_type=self.visa_type, status=PaymentStatus.REFUNDED,
+            payment_count=1, amount_total=Decimal("50.00"),
+        )
+
+        # The session and user, then the one rollup query.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("payments:revenue_report"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.context["total_count"], response.context["total_paid"], response.context["total_net"]),
+            (3, Decimal("150.00"), Decimal("100.00")),
+        )
+        [row] = response.context["rows"]
+        self.assertEqual((row["day"], row["refunded"]), (today, Decimal("50.00")))
+
+    def test_backfill_rebuilds_from_payments(self):
+        day = datetime.date(2025, 3, 1)
+        paid_at = timezone.make_aware(datetime.datetime(2025, 3, 1, 12, 0))
+        for n, status in enumerate((PaymentStatus.PAID, PaymentStatus.PAID, PaymentStatus.REFUNDED)):
+            Payment.objects.create(
+                application=self.make_application(), amount=Decimal("50.00"), reference=f"ref-{n}",
+                status=status, paid_at=paid_at,
+            )
+        PaymentDailyRollup.objects.create(
+            day=day, visa_type=self.visa_type, status=PaymentStatus.PAID,
+            payment_count=1, amount_total=Decimal("1.00"),
+        )
+        stale_day = datetime.date(2025, 2, 1)
+        PaymentDailyRollup.objects.create(
+            day=stale_day, visa_type=self.visa_type, status=PaymentStatus.PAID, payment_count=5,
+        )
+        PaymentDailyRollup.objects.create(
+            day=stale_day, visa_type=self.visa_type, status=PaymentStatus.FAILED, payment_count=2,
+        )
+
+        out = io.StringIO()
+        call_command("backfill_payment_rollups", stdout=out)
+        self.assertIn("0 created, 1 updated, 1 removed", out.getvalue())
+        self.assertEqual(self.rollup(PaymentStatus.PAID, day), (3, Decimal("150.00")))
+        self.assertEqual(self.rollup(PaymentStatus.PAID, stale_day), (0, Decimal("0")))
+        self.assertEqual(self.rollup(PaymentStatus.FAILED, stale_day)[0], 2)   # other statuses untouched
@@ -1,9 +1,11 @@
 from django.urls import path
 
-from apps.payments.views import PaymentView
+from apps.payments.views import PaymentView, PaymentWebhookView, RevenueReportView
 
 app_name = "payments"
 
 urlpatterns = [
     path("<uuid:pk>/", PaymentView.as_view(), name="payment"),
+    path("webhook/", PaymentWebhookView.as_view(), name="webhook"),
+    path("reports/revenue/", RevenueReportView.as_view(), name="revenue_report"),
 ]
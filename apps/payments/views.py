@@ -1,6 +1,15 @@
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import View
 
 from apps.accounts.choices import UserRole
@@ -8,8 +17,10 @@ from apps.accounts.mixins import RoleRequiredMixin
 from apps.applications.choices import ApplicationStatus
 from apps.applications.exceptions import InvalidStateTransition, PaymentError
 from apps.applications.models import VisaApplication
-from apps.applications.services import issue_visa
-from apps.payments.services import mark_as_paid
+from apps.payments.choices import PaymentStatus
+from apps.payments.gateway import SIGNATURE_HEADER, parse_event, verify_signature
+from apps.payments.models import PaymentDailyRollup
+from apps.payments.services import confirm_payment_and_issue, record_notification
 
 
 class PaymentView(LoginRequiredMixin, RoleRequiredMixin, View):
@@ -40,10 +51,91 @@ class PaymentView(LoginRequiredMixin, RoleRequiredMixin, View):
             messages.error(request, "No payment record found for this application.")
             return redirect("payments:payment", pk=pk)
         try:
-            mark_as_paid(app, reference=payment.reference)
-            issue_visa(app)
+            confirm_payment_and_issue(app, reference=payment.reference)
         except (PaymentError, InvalidStateTransition) as exc:
             messages.error(request, str(exc))
             return redirect("payments:payment", pk=pk)
         messages.success(request, "Payment confirmed. Your visa has been issued!")
         return redirect("applications:status", pk=pk)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class PaymentWebhookView(View):
+    """
+    Gateway callback. Only verifies the signature and stores the event in the
+    inbox, so the gateway gets its 200 without waiting on payment processing;
+    redelivered events are acknowledged without a second row.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request):
+        secret = settings.PAYMENT_WEBHOOK_SECRET
+        header = request.headers.get(SIGNATURE_HEADER, "")
+        if not secret or not verify_signature(
+            secret, request.body, header, settings.PAYMENT_WEBHOOK_TOLERANCE_SECONDS
+        ):
+            return JsonResponse({"error": "Invalid signature."}, status=401)
+        try:
+            event = parse_event(request.body)
+        except ValueError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        created = record_notification(event, request.body)
+        return JsonResponse({"received": True, "duplicate": not created})
+
+
+def _revenue_bucket(visa_type, day=None) -> dict:
+    return {
+        "day": day,
+        "visa_type": visa_type,
+        "paid_count": 0,
+        "paid": Decimal("0"),
+        "refunded": Decimal("0"),
+    }
+
+
+class RevenueReportView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """Revenue per visa type per day, read from the daily rollup only."""
+
+    allowed_roles = [UserRole.ADMIN, UserRole.SUPERVISOR]
+    template_name = "admin/revenue_report.html"
+    default_days = 30
+    max_days = 366
+
+    def get(self, request):
+        today = timezone.localdate()
+        end = parse_date(request.GET.get("end", "")) or today
+        start = parse_date(request.GET.get("start", "")) or end - datetime.timedelta(days=self.default_days - 1)
+        start = max(start, end - datetime.timedelta(days=self.max_days - 1))
+
+        rollups = (
+            PaymentDailyRollup.objects
+            .filter(day__range=(start, end), status__in=[PaymentStatus.PAID, PaymentStatus.REFUNDED])
+            .select_related("visa_type")
+            .order_by("-day", "visa_type__name")
+        )
+        rows: dict = {}
+        by_type: dict = {}
+        for rollup in rollups:
+            day_bucket = rows.setdefault(
+                (rollup.day, rollup.visa_type_id), _revenue_bucket(rollup.visa_type, rollup.day)
+            )
+            type_bucket = by_type.setdefault(rollup.visa_type_id, _revenue_bucket(rollup.visa_type))
+            for bucket in (day_bucket, type_bucket):
+                if rollup.status == PaymentStatus.PAID:
+                    bucket["paid_count"] += rollup.payment_count
+                    bucket["paid"] += rollup.amount_total
+                else:
+                    bucket["refunded"] += rollup.amount_total
+        for bucket in (*rows.values(), *by_type.values()):
+            bucket["net"] = bucket["paid"] - bucket["refunded"]
+
+        return render(request, self.template_name, {
+            "start": start,
+            "end": end,
+            "rows": list(rows.values()),
+            "by_type": sorted(by_type.values(), key=lambda b: b["visa_type"].name),
+            "total_paid": sum((b["paid"] for b in by_type.values()), Decimal("0")),
+            "total_net": sum((b["net"] for b in by_type.values()), Decimal("0")),
+            "total_count": sum(b["paid_count"] for b in by_type.values()),
+        })
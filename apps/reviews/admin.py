@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import ReviewDecision
+from .models import ReviewDecision, ReviewerDailyStats
 
 
 @admin.register(ReviewDecision)
@@ -36,3 +36,22 @@ class ReviewDecisionAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None) -> bool:
         # Review decisions are immutable; block edits entirely.
         return False
+
+
+@admin.register(ReviewerDailyStats)
+class ReviewerDailyStatsAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the workload counters. They are maintained by the
+    review services and rebuilt by backfill_reviewer_stats, never by hand.
+    """
+
+    list_display = ("day", "reviewer", "approved", "rejected", "info_requested", "timed_decisions")
+    list_filter = ("day",)
+    search_fields = ("reviewer__email",)
+    ordering = ("-day",)
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
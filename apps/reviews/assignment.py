@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.accounts.choices import UserRole
+from apps.applications.choices import ApplicationStatus
+from apps.applications.models import VisaApplication
+from apps.reviews.feed import bump_queue_versions
+
+LEAST_LOADED = "least_loaded"
+ROUND_ROBIN = "round_robin"
+STRATEGIES = (LEAST_LOADED, ROUND_ROBIN)
+
+
+class OfficerLoadTable:
+    """
+    Open UNDER_REVIEW cases per active officer, and the visa types each one
+    is skilled for, held in memory. Built from one aggregate query, then kept
+    current locally as this process's assignments commit; get_load_table()
+    rebuilds it every REVIEW_ASSIGNMENT_REFRESH_SECONDS to pick up decisions,
+    staff changes and other processes' assignments.
+    """
+
+    def __init__(self, loads: dict, skills: dict):
+        self.loads = loads      # officer id -> open cases assigned to them
+        self.skills = skills    # officer id -> visa type ids; empty means any
+        self.built_at = time.monotonic()
+        self._order = sorted(loads, key=str)    # stable order for ties and turns
+        self._turns = defaultdict(int)          # round-robin position per candidate pool
+
+    @classmethod
+    def build(cls) -> "OfficerLoadTable":
+        User = get_user_model()
+        officers = (
+            User.objects
+            .filter(role=UserRole.OFFICER, is_active=True)
+            .annotate(open_cases=Count(
+                "assigned_applications",
+                filter=Q(
+                    assigned_applications__status=ApplicationStatus.UNDER_REVIEW,
+                    assigned_applications__soft_deleted_at__isnull=True,
+                ),
+            ))
+            .values_list("id", "open_cases")
+        )
+        loads = dict(officers)
+        skills = {officer_id: set() for officer_id in loads}
+        if loads and settings.REVIEW_ASSIGNMENT_SKILL_ROUTING:
+            through = User.visa_type_skills.through.objects.filter(user_id__in=list(loads))
+            for officer_id, visa_type_id in through.values_list("user_id", "visatype_id"):
+                skills[officer_id].add(visa_type_id)
+        return cls(loads, skills)
+
+    def candidates(self, visa_type_id, skill_routing: bool) -> list:
+        if not skill_routing:
+            return self._order
+        # Officers skilled for the type; failing that, generalists (no skills
+        # set); failing that, anyone rather than leaving the case unassigned.
+        skilled = [o for o in self._order if visa_type_id in self.skills[o]]
+        return skilled or [o for o in self._order if not self.skills[o]] or self._order
+
+    def pick(self, visa_type_id, strategy: str, skill_routing: bool, pending: dict | None = None):
+        """
+        Choose an officer. *pending* holds assignments made in the current
+        transaction, which are not in the loads until it commits.
+        """
+        officers = self.candidates(visa_type_id, skill_routing)
+        if not officers:
+            return None
+        if strategy == ROUND_ROBIN:
+            pool = visa_type_id if skill_routing else None
+            officer_id = officers[self._turns[pool] % len(officers)]
+            self._turns[pool] += 1
+        else:
+            pending = pending or {}
+            officer_id = min(officers, key=lambda o: self.loads[o] + pending.get(o, 0))
+        return officer_id
+
+    def add(self, counts: dict) -> None:
+        with _table_lock:
+            for officer_id, count in counts.items():
+                if officer_id in self.loads:
+                    self.loads[officer_id] += count
+
+
+def _count_on_commit(table: OfficerLoadTable, counts: dict) -> None:
+    # A rolled-back transaction then leaves the loads alone. If the table is
+    # rebuilt before the commit, the new one misses these until its refresh.
+    transaction.on_commit(lambda: table.add(counts))
+
+
+_table: OfficerLoadTable | None = None
+_table_lock = threading.Lock()
+
+
+def get_load_table(refresh: bool = False) -> OfficerLoadTable:
+    global _table
+    with _table_lock:
+        stale = _table is None or time.monotonic() - _table.built_at > settings.REVIEW_ASSIGNMENT_REFRESH_SECONDS
+        if refresh or stale:
+            _table = OfficerLoadTable.build()
+        return _table
+
+
+def _strategy() -> str:
+    strategy = settings.REVIEW_ASSIGNMENT_STRATEGY
+    if strategy not in STRATEGIES:
+        raise ValueError(f"REVIEW_ASSIGNMENT_STRATEGY must be one of {STRATEGIES}, not {strategy!r}.")
+    return strategy
+
+
+def assign_application(application: VisaApplication):
+    """
+    Give an application that has just entered UNDER_REVIEW an officer, and
+    return the officer id (None when there are no active officers). A case
+    coming back from PENDING_INFO stays with its officer if they are still
+    active. Call inside the transaction of the transition.
+    """
+    table = get_load_table()
+    with _table_lock:
+        kept = application.assigned_officer_id in table.loads
+        if kept:
+            officer_id = application.assigned_officer_id
+        else:
+            officer_id = table.pick(application.visa_type_id, _strategy(), settings.REVIEW_ASSIGNMENT_SKILL_ROUTING)
+    if officer_id is None:
+        return None
+    _count_on_commit(table, {officer_id: 1})
+    if kept:
+        return officer_id
+    application.assigned_officer_id = officer_id
+    application.save(update_fields=["assigned_officer"])
+    bump_queue_versions([officer_id])
+    return officer_id
+
+
+def assign_review_queue(batch_size: int = 1000) -> int:
+    """
+    Assign every UNDER_REVIEW application without an active officer: never
+    assigned, or owned by someone since deactivated or moved off OFFICER.
+    Oldest submissions first; each batch is picked in memory and written
+    with one UPDATE per officer. Returns the number assigned.
+    """
+    table = get_load_table(refresh=True)
+    if not table.loads:
+        return 0
+    strategy, skill_routing = _strategy(), settings.REVIEW_ASSIGNMENT_SKILL_ROUTING
+    orphaned = (
+        VisaApplication.objects
+        .filter(status=ApplicationStatus.UNDER_REVIEW, soft_deleted_at__isnull=True)
+        .filter(Q(assigned_officer__isnull=True) | ~Q(assigned_officer__in=list(table.loads)))
+        .order_by("submitted_at", "id")
+    )
+    assigned = 0
+    while True:
+        with transaction.atomic():
+            batch = list(orphaned.select_for_update().values_list("pk", "visa_type_id")[:batch_size])
+            if not batch:
+                return assigned
+            by_officer = defaultdict(list)
+            pending = defaultdict(int)
+            with _table_lock:
+                for pk, visa_type_id in batch:
+                    officer_id = table.pick(visa_type_id, strategy, skill_routing, pending)
+                    by_officer[officer_id].append(pk)
+                    pending[officer_id] += 1
+            for officer_id, pks in by_officer.items():
+                VisaApplication.objects.filter(pk__in=pks).update(assigned_officer_id=officer_id)
+            bump_queue_versions(by_officer)
+            _count_on_commit(table, pending)
+        assigned += len(batch)
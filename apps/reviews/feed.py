@@ -0,0 +1,162 @@
+import asyncio
+import json
+import weakref
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F
+
+from apps.applications.choices import ApplicationStatus
+from apps.reviews.models import QueueVersion
+
+ALL_QUEUES = "all"
+# Statuses whose entry or exit changes what the review queues show.
+QUEUE_STATUSES = frozenset({ApplicationStatus.UNDER_REVIEW, ApplicationStatus.PENDING_INFO})
+
+
+def officer_scope(officer_id) -> str:
+    return officer_id.hex
+
+
+def queue_scope(user) -> str:
+    # Officers follow their own assigned cases; supervisors every queue.
+    from apps.accounts.choices import UserRole
+
+    return officer_scope(user.pk) if user.role == UserRole.OFFICER else ALL_QUEUES
+
+
+def bump_queue_versions(officer_ids=()) -> None:
+    """
+    Bump the all-queues counter and those of the given officers. Call inside
+    the transaction that changes the queue, so watchers never see a version
+    before the change it announces is committed.
+    """
+    scopes = sorted({ALL_QUEUES} | {officer_scope(o) for o in officer_ids if o is not None})
+    updated = QueueVersion.objects.filter(scope__in=scopes).update(version=F("version") + 1)
+    if updated == len(scopes):
+        return
+    # First change in a scope: create its row, in the bump_rollups style.
+    existing = set(QueueVersion.objects.filter(scope__in=scopes).values_list("scope", flat=True))
+    for scope in scopes:
+        if scope in existing:
+            continue
+        try:
+            with transaction.atomic():
+                QueueVersion.objects.create(scope=scope, version=1)
+        except IntegrityError:
+            # Another transaction created the row first; bump it instead.
+            QueueVersion.objects.filter(scope=scope).update(version=F("version") + 1)
+
+
+def live_feed_available(request) -> bool:
+    """
+    Whether reviews:queue_events can stream to this request. Under WSGI the
+    async body is drained to completion before anything is sent, so the
+    page polls reviews:queue_version instead.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def get_queue_version(scope: str) -> int:
+    return QueueVersion.objects.filter(scope=scope).values_list("version", flat=True).first() or 0
+
+
+class VersionWatcher:
+    """
+    One poller per event loop shared by every open stream: it reads all
+    counters in a single query each QUEUE_FEED_POLL_SECONDS while anyone is
+    listening, and wakes the streams when something changed. An idle
+    officer's stream costs a parked coroutine, not a query.
+    """
+
+    def __init__(self):
+        self.versions: dict[str, int] = {}
+        self._ready = asyncio.Event()       # set once the first poll is in
+        self._changed = asyncio.Event()     # replaced each time versions change
+        self._listeners = 0
+        self._task = None
+
+    async def _poll(self):
+        try:
+            while self._listeners:
+                try:
+                    versions = {
+                        scope: version
+                        async for scope, version in QueueVersion.objects.values_list("scope", "version")
+                    }
+                except DatabaseError:
+                    versions = self.versions    # keep serving the last snapshot
+                if versions != self.versions or not self._ready.is_set():
+                    self.versions = versions
+                    self._ready.set()
+                    changed, self._changed = self._changed, asyncio.Event()
+                    changed.set()
+                await asyncio.sleep(settings.QUEUE_FEED_POLL_SECONDS)
+        finally:
+            self._task = None
+
+    @asynccontextmanager
+    async def listening(self):
+        self._listeners += 1
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._poll())
+        try:
+            await self._ready.wait()
+            yield self
+        finally:
+            self._listeners -= 1
+
+    async def wait(self, scope: str, seen: int, timeout: float) -> int:
+        # The scope's version once it differs from seen, or after timeout.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.versions.get(scope, 0) == seen:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.versions.get(scope, 0)
+
+
+_watchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, VersionWatcher]" = weakref.WeakKeyDictionary()
+
+
+def get_watcher() -> VersionWatcher:
+    loop = asyncio.get_running_loop()
+    watcher = _watchers.get(loop)
+    if watcher is None:
+        watcher = _watchers[loop] = VersionWatcher()
+    return watcher
+
+
+def _event(version: int) -> str:
+    return f"id: {version}\nevent: queue\ndata: {json.dumps({'version': version})}\n\n"
+
+
+async def stream_queue_events(scope: str, last_seen: int | None):
+    """
+    Server-sent events for one queue scope: an event whenever its version
+    moves off last_seen (the version the page was rendered at, or the
+    client's Last-Event-ID on reconnect), a comment line as a heartbeat
+    otherwise. Ends after QUEUE_FEED_STREAM_SECONDS; EventSource reconnects
+    and resumes from the last id it saw.
+    """
+    watcher = get_watcher()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.QUEUE_FEED_STREAM_SECONDS
+    yield f"retry: {settings.QUEUE_FEED_RETRY_MS}\n\n"
+    async with watcher.listening():
+        if last_seen is None:
+            last_seen = watcher.versions.get(scope, 0)
+        while (remaining := deadline - loop.time()) > 0:
+            version = await watcher.wait(scope, last_seen, min(remaining, settings.QUEUE_FEED_HEARTBEAT_SECONDS))
+            if version != last_seen:
+                last_seen = version
+                yield _event(version)
+            else:
+                yield ": keep-alive\n\n"
@@ -1,5 +1,8 @@
 from django import forms
 
+from apps.reviews.choices import ReviewDecisionChoice
+from apps.visas.models import VisaType
+
 
 class DecisionReasonForm(forms.Form):
     reason = forms.CharField(
@@ -14,3 +17,56 @@ class RequestInfoForm(forms.Form):
         max_length=2000,
         label="Information requested",
     )
+
+
+class BulkDecisionForm(forms.Form):
+    decision = forms.ChoiceField(choices=ReviewDecisionChoice.choices)
+    reason = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 2, "placeholder": "Required to reject or request information..."}),
+        max_length=2000,
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        decision = cleaned.get("decision")
+        if decision and decision != ReviewDecisionChoice.APPROVED and not cleaned.get("reason", "").strip():
+            self.add_error("reason", "A written reason is required for this decision.")
+        return cleaned
+
+
+class DecisionHistoryFilterForm(forms.Form):
+    decision = forms.ChoiceField(
+        required=False,
+        choices=[("", "Any decision")] + list(ReviewDecisionChoice.choices),
+    )
+    visa_type = forms.ModelChoiceField(
+        required=False,
+        queryset=VisaType.objects.order_by("name"),
+        empty_label="Any visa type",
+    )
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    application = forms.UUIDField(
+        required=False,
+        label="Application ID",
+        widget=forms.TextInput(attrs={"placeholder": "Full application ID"}),
+    )
+    officer = forms.EmailField(
+        required=False,
+        label="Officer email",
+        widget=forms.EmailInput(attrs={"placeholder": "officer@example.com"}),
+    )
+
+    def __init__(self, *args, is_supervisor: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not is_supervisor:
+            # Officers only ever see their own decisions.
+            del self.fields["officer"]
+
+    def clean(self):
+        cleaned = super().clean()
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            self.add_error("date_to", "End date is before the start date.")
+        return cleaned
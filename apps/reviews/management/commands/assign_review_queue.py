@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reviews.assignment import assign_review_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign UNDER_REVIEW applications that have no active officer: the "
+        "backlog from before automatic assignment, cases that arrived while "
+        "no officer was active, and cases of deactivated officers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Applications assigned per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        try:
+            assigned = assign_review_queue(batch_size=options["batch_size"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Assigned {assigned} application(s)."))
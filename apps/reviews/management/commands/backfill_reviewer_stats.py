@@ -0,0 +1,38 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from apps.reviews.stats import backfill_review_started_at, rebuild_reviewer_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-reviewer daily statistics from recorded decisions and "
+        "the audit log. Run once after deploying the stats table, and whenever "
+        "the counters need repairing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            help="Only rebuild days from this date (YYYY-MM-DD) onwards.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Decisions read per query.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        started = backfill_review_started_at()
+        self.stdout.write(f"Set review start time on {started} application(s) under review.")
+        try:
+            rows = rebuild_reviewer_stats(since=options["since"], chunk_size=options["chunk_size"])
+        except IntegrityError:
+            raise CommandError("A reviewer-day row was created during the rebuild; run it again.")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} reviewer-day row(s)."))
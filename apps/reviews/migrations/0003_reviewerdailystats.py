@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_review_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('info_requested', models.PositiveIntegerField(default=0)),
+                ('review_seconds', models.BigIntegerField(default=0)),
+                ('timed_decisions', models.PositiveIntegerField(default=0)),
+                ('reviewer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='daily_review_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reviewer Daily Stats',
+                'verbose_name_plural': 'Reviewer Daily Stats',
+                'db_table': 'reviews_reviewerdailystats',
+                'indexes': [models.Index(fields=['day'], name='idx_reviewer_stats_day')],
+                'constraints': [models.UniqueConstraint(fields=('reviewer', 'day'), name='uniq_reviewer_stats_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_reviewerdailystats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueVersion',
+            fields=[
+                ('scope', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Queue Version',
+                'verbose_name_plural': 'Queue Versions',
+                'db_table': 'reviews_queueversion',
+            },
+        ),
+    ]
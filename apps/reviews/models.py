@@ -40,8 +40,74 @@ class ReviewDecision(models.Model):
                 fields=["reviewer", "created_at"],
                 name="idx_review_reviewer_created",
             ),
+            # Supervisors page through every officer's decisions by date.
+            models.Index(
+                fields=["created_at"],
+                name="idx_review_created",
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.decision} on {self.application_id} by {self.reviewer_id}"
 
+
+class ReviewerDailyStats(models.Model):
+    """
+    Per-reviewer, per-day decision counts, incremented by the review services
+    in the same transaction as each decision so the workload dashboard never
+    aggregates over ReviewDecision. Rebuilt by backfill_reviewer_stats.
+    """
+
+    reviewer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="daily_review_stats",
+    )
+    day = models.DateField()        # local date of the decisions
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    info_requested = models.PositiveIntegerField(default=0)
+    # Seconds from entering UNDER_REVIEW to the decision, summed over the
+    # timed_decisions whose start is known; average = sum / count.
+    review_seconds = models.BigIntegerField(default=0)
+    timed_decisions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "reviews_reviewerdailystats"
+        verbose_name = "Reviewer Daily Stats"
+        verbose_name_plural = "Reviewer Daily Stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reviewer", "day"],
+                name="uniq_reviewer_stats_day",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["day"],
+                name="idx_reviewer_stats_day",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.reviewer_id} on {self.day}"
+
+
+class QueueVersion(models.Model):
+    """
+    Change counter for the review queues: bumped in the same transaction as
+    anything that moves an application into or out of UNDER_REVIEW or
+    PENDING_INFO. Scope "all" covers every queue; an officer's id (hex)
+    covers the cases assigned to them. Read by the queue change feed.
+    """
+
+    scope = models.CharField(max_length=32, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "reviews_queueversion"
+        verbose_name = "Queue Version"
+        verbose_name_plural = "Queue Versions"
+
+    def __str__(self) -> str:
+        return f"{self.scope} @ {self.version}"
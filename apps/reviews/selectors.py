@@ -0,0 +1,145 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.applications.choices import ApplicationStatus
+from apps.applications.models import VisaApplication
+from apps.reviews.models import ReviewDecision, ReviewerDailyStats
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+# Assigned applications still waiting on their officer.
+OPEN_CASE_STATUSES = (ApplicationStatus.UNDER_REVIEW, ApplicationStatus.PENDING_INFO)
+
+
+def parse_decision_cursor(cursor: str) -> tuple[datetime.datetime, int] | None:
+    micros, _, decision_id = (cursor or "").partition(":")
+    try:
+        return EPOCH + datetime.timedelta(microseconds=int(micros)), int(decision_id)
+    except (ValueError, OverflowError):
+        return None
+
+
+def _decision_cursor(decision: ReviewDecision) -> str:
+    return f"{(decision.created_at - EPOCH) // datetime.timedelta(microseconds=1)}:{decision.pk}"
+
+
+def _day_start(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def get_decision_history(
+    reviewer=None,
+    officer_email: str = "",
+    decision: str = "",
+    visa_type=None,
+    application_id=None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    before: tuple[datetime.datetime, int] | None = None,
+    limit: int = 50,
+):
+    """
+    One page of review decisions, newest first, and the cursor of the next.
+
+    Keyset pagination on (created_at, id): a reviewer's history rides
+    idx_review_reviewer_created, one application's idx_review_app_created
+    and the unscoped supervisor view idx_review_created, so a page a year
+    back costs the same as the first.
+    """
+    decisions = ReviewDecision.objects.all()
+    if reviewer is None and officer_email:
+        reviewer = get_user_model().objects.filter(email__iexact=officer_email).first()
+        if reviewer is None:
+            return [], None
+    if reviewer is not None:
+        decisions = decisions.filter(reviewer=reviewer)
+    if application_id is not None:
+        decisions = decisions.filter(application_id=application_id)
+    if decision:
+        decisions = decisions.filter(decision=decision)
+    if visa_type is not None:
+        decisions = decisions.filter(application__visa_type=visa_type)
+    if date_from:
+        decisions = decisions.filter(created_at__gte=_day_start(date_from))
+    if date_to:
+        decisions = decisions.filter(created_at__lt=_day_start(date_to + datetime.timedelta(days=1)))
+    if before is not None:
+        created_at, decision_id = before
+        decisions = decisions.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=decision_id))
+
+    page = list(
+        decisions
+        .select_related("application__visa_type", "reviewer")
+        .only(
+            "id", "decision", "reason", "created_at",
+            "application__id", "application__visa_type__name",
+            "reviewer__email",
+        )
+        .order_by("-created_at", "-id")[: limit + 1]
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = _decision_cursor(page[-1])
+    return page, next_cursor
+
+
+def get_open_cases_by_officer() -> dict[str, int]:
+    """
+    Current open cases per officer email: one grouped count over
+    idx_app_officer_queue (assigned_officer, status, ...).
+    """
+    return dict(
+        VisaApplication.objects
+        .filter(
+            assigned_officer__isnull=False,
+            status__in=OPEN_CASE_STATUSES,
+            soft_deleted_at__isnull=True,
+        )
+        .values("assigned_officer__email")
+        .annotate(open_cases=Count("pk"))
+        .order_by()
+        .values_list("assigned_officer__email", "open_cases")
+    )
+
+
+def get_reviewer_workload(since: datetime.date) -> tuple[list[dict], list[dict]]:
+    """
+    Per-reviewer totals and per-day totals from ReviewerDailyStats for every
+    day from since onwards. Reads only the aggregate rows, through
+    idx_reviewer_stats_day; never ReviewDecision itself. Each reviewer also
+    carries their current open cases, and officers with open cases but no
+    decisions in the period get a row of their own.
+    """
+    stats = ReviewerDailyStats.objects.filter(day__gte=since)
+    sums = {
+        "approved": Sum("approved"),
+        "rejected": Sum("rejected"),
+        "info_requested": Sum("info_requested"),
+        "review_seconds": Sum("review_seconds"),
+        "timed_decisions": Sum("timed_decisions"),
+    }
+    reviewers = list(stats.values("reviewer__email").annotate(**sums).order_by("reviewer__email"))
+    days = list(stats.values("day").annotate(**sums).order_by("-day"))
+    for row in reviewers + days:
+        row["decisions"] = row["approved"] + row["rejected"] + row["info_requested"]
+        row["average_review"] = (
+            datetime.timedelta(seconds=row["review_seconds"] // row["timed_decisions"])
+            if row["timed_decisions"] else None
+        )
+
+    open_cases = get_open_cases_by_officer()
+    idle = open_cases.keys() - {row["reviewer__email"] for row in reviewers}
+    reviewers += [
+        {
+            "reviewer__email": email, "decisions": 0, "approved": 0, "rejected": 0,
+            "info_requested": 0, "review_seconds": 0, "timed_decisions": 0, "average_review": None,
+        }
+        for email in idle
+    ]
+    for row in reviewers:
+        row["open_cases"] = open_cases.get(row["reviewer__email"], 0)
+    reviewers.sort(key=lambda row: row["reviewer__email"])
+    return reviewers, days
@@ -1,11 +1,13 @@
 from django.db import transaction
 
 from apps.accounts.choices import UserRole
-from apps.applications.choices import ApplicationStatus
-from apps.applications.exceptions import InvalidStateTransition, PermissionDenied
+from apps.applications.choices import ALLOWED_TRANSITIONS, ApplicationStatus
+from apps.applications.exceptions import InvalidStateTransition, PermissionDenied, RuleViolation
 from apps.applications.models import VisaApplication
 from apps.reviews.choices import ReviewDecisionChoice
+from apps.reviews.feed import bump_queue_versions
 from apps.reviews.models import ReviewDecision
+from apps.reviews.stats import record_bulk_decision_stats, record_decision_stats
 
 
 def _assert_under_review(application: VisaApplication) -> None:
@@ -31,18 +33,22 @@ def _record_decision(
     decision: str,
     reason: str,
 ) -> ReviewDecision:
-    return ReviewDecision.objects.create(
+    record = ReviewDecision.objects.create(
         application=application,
         reviewer=reviewer,
         decision=decision,
         reason=reason,
     )
+    # Same transaction as the decision: the counters never drift from it.
+    record_decision_stats(record, application.review_started_at)
+    return record
 
 
 @transaction.atomic
 def approve_application(application: VisaApplication, reviewer) -> ReviewDecision:
-    # Approval and issuance are intentionally separate steps: issue_visa() is
-    # called only after payment is confirmed, keeping both events auditable.
+    # Approval and issuance are intentionally separate steps: the visa is issued
+    # by confirm_payment_and_issue() once payment is confirmed, keeping both
+    # events auditable.
     _assert_under_review(application)
     _assert_reviewer_role(reviewer)
 
@@ -73,7 +79,6 @@ def reject_application(
     _assert_reviewer_role(reviewer)
 
     if not reason or not reason.strip():
-        from apps.applications.exceptions import RuleViolation
         raise RuleViolation(
             "A written reason is required when rejecting an application.",
             failure_codes=["REJECTION_REASON_MISSING"],
@@ -121,3 +126,92 @@ def request_more_info(
         ReviewDecisionChoice.REQUEST_INFO,
         reason=note,
     )
+
+
+BULK_DECISION_MAX = 1000
+# Status each decision moves an UNDER_REVIEW application to.
+DECISION_STATUSES = {
+    ReviewDecisionChoice.APPROVED: ApplicationStatus.APPROVED,
+    ReviewDecisionChoice.REJECTED: ApplicationStatus.REJECTED,
+    ReviewDecisionChoice.REQUEST_INFO: ApplicationStatus.PENDING_INFO,
+}
+
+
+@transaction.atomic
+def bulk_decide(application_ids, decision: str, reviewer, reason: str = "") -> dict:
+    """
+    Apply one decision to many applications in a fixed number of queries:
+    one locking SELECT to check states, one conditional status write for the
+    transition (see write_status), and one bulk INSERT each for decisions, audit events and
+    stats. Returns {application_id: outcome}, where outcome is the new status
+    or the reason the application was skipped; skipped applications do not
+    stop the others.
+    """
+    if reviewer.role != UserRole.SUPERVISOR:
+        raise PermissionDenied(
+            f"User {reviewer.id} has role {reviewer.role!r}. Only SUPERVISOR may make bulk decisions."
+        )
+    if decision not in DECISION_STATUSES:
+        raise RuleViolation(f"Unknown decision {decision!r}.", failure_codes=["DECISION_UNKNOWN"])
+    if len(application_ids) > BULK_DECISION_MAX:
+        raise RuleViolation(
+            f"At most {BULK_DECISION_MAX} applications can be decided per request.",
+            failure_codes=["BULK_LIMIT_EXCEEDED"],
+        )
+    if decision == ReviewDecisionChoice.APPROVED:
+        reason = f"Approved by {reviewer.email}."
+    elif not reason or not reason.strip():
+        raise RuleViolation(
+            "A written reason is required to reject or request information.",
+            failure_codes=["DECISION_REASON_MISSING"],
+        )
+    new_status = DECISION_STATUSES[decision]
+
+    outcomes = {pk: "Not found." for pk in application_ids}
+    rows = (
+        VisaApplication.objects
+        .select_for_update()
+        .filter(pk__in=application_ids, soft_deleted_at__isnull=True)
+        .values_list("pk", "status", "review_started_at", "assigned_officer_id")
+    )
+    started, officers = {}, set()
+    for pk, status, review_started_at, officer_id in rows:
+        if status != ApplicationStatus.UNDER_REVIEW or new_status not in ALLOWED_TRANSITIONS.get(status, set()):
+            outcomes[pk] = f"Skipped: status is {status}."
+        else:
+            started[pk] = review_started_at
+            officers.add(officer_id)
+    if not started:
+        return outcomes
+
+    from apps.applications.services import write_status
+
+    # The rows are locked, so the status condition only guards against a
+    # caller that skipped the check above.
+    updated = write_status(list(started), ApplicationStatus.UNDER_REVIEW, new_status)
+    if updated != len(started):
+        raise InvalidStateTransition("Applications changed status during the bulk decision; nothing was applied.")
+
+    decisions = ReviewDecision.objects.bulk_create([
+        ReviewDecision(application_id=pk, reviewer=reviewer, decision=decision, reason=reason)
+        for pk in started
+    ])
+
+    from apps.audit.services import log_events
+
+    log_events([
+        {
+            "application_id": pk,
+            "previous_status": ApplicationStatus.UNDER_REVIEW,
+            "new_status": new_status,
+            "actor": reviewer,
+            "reason": reason,
+        }
+        for pk in started
+    ])
+    record_bulk_decision_stats(decisions, started)
+    bump_queue_versions(officers)
+
+    for pk in started:
+        outcomes[pk] = new_status
+    return outcomes
@@ -0,0 +1,167 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from apps.applications.choices import ApplicationStatus
+from apps.applications.models import VisaApplication
+from apps.reviews.choices import ReviewDecisionChoice
+from apps.reviews.models import ReviewDecision, ReviewerDailyStats
+
+# ReviewerDailyStats counter bumped by each kind of decision.
+DECISION_COUNTERS = {
+    ReviewDecisionChoice.APPROVED: "approved",
+    ReviewDecisionChoice.REJECTED: "rejected",
+    ReviewDecisionChoice.REQUEST_INFO: "info_requested",
+}
+STATS_FIELDS = ("approved", "rejected", "info_requested", "review_seconds", "timed_decisions")
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def _review_seconds(started_at: datetime.datetime | None, decided_at: datetime.datetime) -> int | None:
+    if started_at is None or started_at > decided_at:
+        return None
+    return int((decided_at - started_at).total_seconds())
+
+
+def _increment_stats(reviewer_id, day: datetime.date, column: str, decisions: int, review_seconds: int,
+                     timed_decisions: int) -> None:
+    stats = ReviewerDailyStats.objects.filter(reviewer_id=reviewer_id, day=day)
+    increments = {column: F(column) + decisions}
+    if timed_decisions:
+        increments["review_seconds"] = F("review_seconds") + review_seconds
+        increments["timed_decisions"] = F("timed_decisions") + timed_decisions
+    if stats.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            ReviewerDailyStats.objects.create(
+                reviewer_id=reviewer_id, day=day, review_seconds=review_seconds,
+                timed_decisions=timed_decisions, **{column: decisions},
+            )
+    except IntegrityError:
+        # Another transaction created the row first; add to it instead.
+        stats.update(**increments)
+
+
+def record_decision_stats(decision: ReviewDecision, review_started_at: datetime.datetime | None) -> None:
+    """
+    Count the decision in its reviewer's row for the day. Must run inside the
+    transaction that records the decision, so the two commit or roll back
+    together; the increment is a single UPDATE, so concurrent decisions by
+    the same reviewer never lose a count.
+    """
+    seconds = _review_seconds(review_started_at, decision.created_at)
+    _increment_stats(
+        decision.reviewer_id,
+        timezone.localdate(decision.created_at),
+        DECISION_COUNTERS[decision.decision],
+        decisions=1,
+        review_seconds=seconds or 0,
+        timed_decisions=0 if seconds is None else 1,
+    )
+
+
+def record_bulk_decision_stats(decisions: list[ReviewDecision], review_started_at: dict) -> None:
+    # Bulk variant of record_decision_stats: one increment per reviewer, day
+    # and decision type however many decisions were made. review_started_at
+    # maps application_id to its UNDER_REVIEW entry time.
+    totals: dict[tuple, list[int]] = {}
+    for decision in decisions:
+        key = decision.reviewer_id, timezone.localdate(decision.created_at), DECISION_COUNTERS[decision.decision]
+        total = totals.setdefault(key, [0, 0, 0])
+        total[0] += 1
+        seconds = _review_seconds(review_started_at.get(decision.application_id), decision.created_at)
+        if seconds is not None:
+            total[1] += seconds
+            total[2] += 1
+    for (reviewer_id, day, column), (count, seconds, timed) in totals.items():
+        _increment_stats(reviewer_id, day, column, decisions=count, review_seconds=seconds, timed_decisions=timed)
+
+
+def _review_started_subquery(application, decided_at):
+    # Latest UNDER_REVIEW transition of the application up to the decision,
+    # served by idx_audit_app_timestamp. Months already detached from the
+    # audit table are not consulted.
+    from apps.audit.models import ApplicationAuditLog
+
+    return Subquery(
+        ApplicationAuditLog.objects
+        .filter(
+            application_id=application,
+            new_status=ApplicationStatus.UNDER_REVIEW,
+            timestamp__lte=decided_at,
+        )
+        .order_by("-timestamp")
+        .values("timestamp")[:1]
+    )
+
+
+def backfill_review_started_at() -> int:
+    # Applications already under review when review_started_at was added.
+    return (
+        VisaApplication.objects
+        .filter(status=ApplicationStatus.UNDER_REVIEW, review_started_at__isnull=True)
+        .update(review_started_at=_review_started_subquery(OuterRef("pk"), timezone.now()))
+    )
+
+
+@transaction.atomic
+def rebuild_reviewer_stats(since: datetime.date | None = None, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Recompute ReviewerDailyStats from ReviewDecision and the audit log for
+    every day from since onwards (all days when None), replacing what is
+    there. Decisions are read in keyset chunks on the primary key; memory
+    holds one chunk plus one counter row per reviewer and day.
+
+    The existing rows are locked before any decision is read, and rewritten
+    in place: a decision committing meanwhile waits on its row and then adds
+    to the rebuilt count. One that opens a new reviewer-day row during the
+    rebuild makes it fail with IntegrityError; run it again.
+    """
+    decisions = ReviewDecision.objects.all()
+    existing = ReviewerDailyStats.objects.all()
+    if since is not None:
+        start = timezone.make_aware(datetime.datetime.combine(since, datetime.time.min))
+        decisions = decisions.filter(created_at__gte=start)
+        existing = existing.filter(day__gte=since)
+    current = {(row.reviewer_id, row.day): row for row in existing.select_for_update()}
+    rows = (
+        decisions
+        .annotate(review_started_at=_review_started_subquery(OuterRef("application_id"), OuterRef("created_at")))
+        .order_by("id")
+        .values_list("id", "reviewer_id", "decision", "created_at", "review_started_at")
+    )
+
+    totals: dict[tuple, ReviewerDailyStats] = {}
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        for last_id, reviewer_id, decision, created_at, started_at in chunk:
+            key = reviewer_id, timezone.localdate(created_at)
+            stats = totals.get(key)
+            if stats is None:
+                stats = totals[key] = ReviewerDailyStats(reviewer_id=key[0], day=key[1])
+            column = DECISION_COUNTERS[decision]
+            setattr(stats, column, getattr(stats, column) + 1)
+            seconds = _review_seconds(started_at, created_at)
+            if seconds is not None:
+                stats.review_seconds += seconds
+                stats.timed_decisions += 1
+
+    to_create, to_update = [], []
+    for key, stats in totals.items():
+        row = current.pop(key, None)
+        if row is None:
+            to_create.append(stats)
+            continue
+        for name in STATS_FIELDS:
+            setattr(row, name, getattr(stats, name))
+        to_update.append(row)
+    ReviewerDailyStats.objects.bulk_update(to_update, STATS_FIELDS, batch_size=chunk_size)
+    ReviewerDailyStats.objects.filter(pk__in=[row.pk for row in current.values()]).delete()
+    ReviewerDailyStats.objects.bulk_create(to_create, batch_size=chunk_size)
+    return len(totals)
@@ -1,3 +1,504 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import uuid
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.choices import UserRole
+from apps.accounts.models import User
+from apps.applications.choices import ApplicationStatus
+from apps.applications.counters import get_status_counts, reconcile_counters
+from apps.applications.exceptions import PermissionDenied, RuleViolation
+from apps.applications.models import VisaApplication
+from apps.applications.services import move_to_under_review
+from apps.audit.models import ApplicationAuditLog, AuditOutbox
+from apps.reviews.assignment import assign_application, assign_review_queue, get_load_table
+from apps.reviews.choices import ReviewDecisionChoice
+from apps.reviews.feed import ALL_QUEUES, bump_queue_versions, get_queue_version, officer_scope
+from apps.reviews.models import QueueVersion, ReviewDecision, ReviewerDailyStats
+from apps.reviews.selectors import get_decision_history, get_reviewer_workload, parse_decision_cursor
+from apps.reviews.services import bulk_decide
+from apps.reviews.stats import (
+    STATS_FIELDS,
+    backfill_review_started_at,
+    rebuild_reviewer_stats,
+    record_decision_stats,
+)
+from apps.visas.models import VisaType
+
+T0 = datetime.datetime(2025, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+class ReviewTestCase(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("applicant@example.com", "pw")
+        self.officer = User.objects.create_user("officer@example.com", "pw", role=UserRole.OFFICER)
+        self.other_officer = User.objects.create_user("other@example.com", "pw", role=UserRole.OFFICER)
+        self.supervisor = User.objects.create_user("supervisor@example.com", "pw", role=UserRole.SUPERVISOR)
+        self.visa_type = VisaType.objects.create(code="TOURIST_30", name="Tourist", fee_amount=50, max_stay_days=30)
+        self.business = VisaType.objects.create(code="BUSINESS_90", name="Business", fee_amount=120, max_stay_days=90)
+
+    def make_application(self, visa_type=None, **fields) -> VisaApplication:
+        return VisaApplication.objects.create(
+            applicant=self.applicant,
+            visa_type=visa_type or self.visa_type,
+            nationality="NG",
+            purpose_of_travel="Tourism",
+            intended_entry_date=datetime.date(2030, 1, 1),
+            **fields,
+        )
+
+    def make_decision(self, created_at, reviewer=None, application=None,
+                      decision=ReviewDecisionChoice.APPROVED) -> ReviewDecision:
+        review = ReviewDecision.objects.create(
+            application=application or self.make_application(),
+            reviewer=reviewer or self.officer,
+            decision=decision,
+            reason="Checked.",
+        )
+        # created_at is auto_now_add; set the time the test needs afterwards.
+        ReviewDecision.objects.filter(pk=review.pk).update(created_at=created_at)
+        review.created_at = created_at
+        return review
+
+
+class DecisionHistoryTests(ReviewTestCase):
+    def walk(self, **filters) -> list[int]:
+        seen, before = [], None
+        while True:
+            page, next_cursor = get_decision_history(before=before, limit=2, **filters)
+            seen.extend(review.pk for review in page)
+            if next_cursor is None:
+                return seen
+            before = parse_decision_cursor(next_cursor)
+
+    def newest_first(self, reviews) -> list[int]:
+        return [r.pk for r in sorted(reviews, key=lambda r: (r.created_at, r.pk), reverse=True)]
+
+    def test_pages_cover_every_decision_once_newest_first(self):
+        # Pairs share a timestamp, so pages have to break ties on id.
+        reviews = [self.make_decision(T0 + datetime.timedelta(minutes=i // 2)) for i in range(7)]
+        self.assertEqual(self.walk(), self.newest_first(reviews))
+
+    def test_filters(self):
+        mine = [self.make_decision(T0 + datetime.timedelta(days=i)) for i in range(3)]
+        theirs = self.make_decision(T0, reviewer=self.other_officer, decision=ReviewDecisionChoice.REJECTED)
+        business = self.make_decision(
+            T0 + datetime.timedelta(days=5), application=self.make_application(visa_type=self.business),
+        )
+
+        self.assertEqual(self.walk(reviewer=self.officer), self.newest_first(mine + [business]))
+        self.assertEqual(self.walk(officer_email="OTHER@example.com"), [theirs.pk])
+        self.assertEqual(self.walk(officer_email="nobody@example.com"), [])
+        self.assertEqual(self.walk(decision=ReviewDecisionChoice.REJECTED), [theirs.pk])
+        self.assertEqual(self.walk(visa_type=self.business), [business.pk])
+        self.assertEqual(self.walk(application_id=mine[1].application_id), [mine[1].pk])
+        self.assertEqual(
+            self.walk(date_from=datetime.date(2025, 6, 2), date_to=datetime.date(2025, 6, 3)),
+            self.newest_first(mine[1:]),
+        )
+
+    def test_garbage_cursor_starts_from_the_top(self):
+        for cursor in ("", "abc", "1:x"):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(parse_decision_cursor(cursor))
+
+
+class DecisionHistoryViewTests(ReviewTestCase):
+    def test_officers_see_only_their_own_decisions(self):
+        mine = self.make_decision(T0)
+        self.make_decision(T0, reviewer=self.other_officer)
+        self.client.force_login(self.officer)
+        response = self.client.get(reverse("reviews:history"), {"officer": self.other_officer.email})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r.pk for r in response.context["decisions"]], [mine.pk])
+        self.assertNotIn("officer", response.context["form"].fields)
+
+    def test_supervisors_page_through_everyone(self):
+        reviews = [self.make_decision(T0 + datetime.timedelta(minutes=i)) for i in range(3)]
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse("reviews:history"))
+        self.assertEqual({r.pk for r in response.context["decisions"]}, {r.pk for r in reviews})
+        self.assertTrue(response.context["is_first_page"])
+
+    def test_invalid_filters_show_nothing(self):
+        self.make_decision(T0)
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse("reviews:history"), {"date_from": "2025-06-05", "date_to": "2025-06-01"})
+        self.assertEqual(response.context["decisions"], [])
+        self.assertIn("date_to", response.context["form"].errors)
+
+
+class ReviewerStatsTests(ReviewTestCase):
+    def test_decisions_are_counted_per_reviewer_and_day(self):
+        decided_at = timezone.now()
+        for decision in (ReviewDecisionChoice.APPROVED, ReviewDecisionChoice.APPROVED, ReviewDecisionChoice.REJECTED):
+            review = self.make_decision(decided_at, decision=decision)
+            record_decision_stats(review, review_started_at=decided_at - datetime.timedelta(minutes=10))
+
+        stats = ReviewerDailyStats.objects.get()
+        self.assertEqual((stats.approved, stats.rejected, stats.info_requested), (2, 1, 0))
+        self.assertEqual((stats.review_seconds, stats.timed_decisions), (1800, 3))
+
+    def test_row_created_by_a_concurrent_decision_is_added_to(self):
+        decided_at = timezone.now()
+        first = self.make_decision(decided_at)
+        record_decision_stats(first, review_started_at=None)
+
+        # The first UPDATE misses, as if the row were committed between it and
+        # the INSERT; the INSERT then hits the unique constraint.
+        update = QuerySet.update
+        missed = []
+
+        def miss_once(queryset, **kwargs):
+            if not missed:
+                missed.append(True)
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", miss_once):
+            record_decision_stats(self.make_decision(decided_at), review_started_at=None)
+        stats = ReviewerDailyStats.objects.get()
+        self.assertEqual((stats.approved, stats.timed_decisions), (2, 0))
+
+    def test_workload_shows_open_cases(self):
+        today = timezone.localdate()
+        review = self.make_decision(timezone.now())
+        record_decision_stats(review, review_started_at=None)
+        self.make_application(status=ApplicationStatus.UNDER_REVIEW, assigned_officer=self.officer)
+        self.make_application(status=ApplicationStatus.PENDING_INFO, assigned_officer=self.officer)
+        self.make_application(status=ApplicationStatus.APPROVED, assigned_officer=self.officer)
+        self.make_application(
+            status=ApplicationStatus.UNDER_REVIEW, assigned_officer=self.officer, soft_deleted_at=timezone.now(),
+        )
+        self.make_application(status=ApplicationStatus.UNDER_REVIEW, assigned_officer=self.other_officer)
+
+        reviewers, _ = get_reviewer_workload(today)
+        rows = {row["reviewer__email"]: row for row in reviewers}
+        self.assertEqual((rows["officer@example.com"]["open_cases"], rows["officer@example.com"]["decisions"]), (2, 1))
+        # No decisions in the period, but still carrying a case.
+        self.assertEqual((rows["other@example.com"]["open_cases"], rows["other@example.com"]["decisions"]), (1, 0))
+
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse("reviews:stats"))
+        self.assertContains(response, "Open Cases")
+        self.assertEqual([row["reviewer__email"] for row in response.context["reviewers"]],
+                         ["officer@example.com", "other@example.com"])
+
+
+class ReviewerStatsRebuildTests(ReviewTestCase):
+    def decide(self, decided_at, reviewer=None, decision=ReviewDecisionChoice.APPROVED, review_minutes=None):
+        application = self.make_application(status=ApplicationStatus.UNDER_REVIEW)
+        started_at = None
+        if review_minutes is not None:
+            started_at = decided_at - datetime.timedelta(minutes=review_minutes)
+            ApplicationAuditLog.objects.create(
+                application=application, previous_status=ApplicationStatus.PRE_SCREENING,
+                new_status=ApplicationStatus.UNDER_REVIEW, timestamp=started_at,
+            )
+        review = self.make_decision(decided_at, reviewer=reviewer, application=application, decision=decision)
+        record_decision_stats(review, review_started_at=started_at)
+        return review
+
+    def stats(self) -> dict:
+        return {
+            (row["reviewer_id"], row["day"]): tuple(row[name] for name in STATS_FIELDS)
+            for row in ReviewerDailyStats.objects.values("reviewer_id", "day", *STATS_FIELDS)
+        }
+
+    def test_rebuild_matches_the_live_counters(self):
+        self.decide(T0, review_minutes=30)
+        self.decide(T0 + datetime.timedelta(hours=1), decision=ReviewDecisionChoice.REJECTED, review_minutes=10)
+        self.decide(T0 + datetime.timedelta(days=1), decision=ReviewDecisionChoice.REQUEST_INFO)
+        self.decide(T0, reviewer=self.other_officer, review_minutes=5)
+        live = self.stats()
+        pks = set(ReviewerDailyStats.objects.values_list("pk", flat=True))
+
+        # Drift: a wrong count and a row with no decisions behind it.
+        ReviewerDailyStats.objects.filter(reviewer=self.officer).update(approved=99)
+        ReviewerDailyStats.objects.create(reviewer=self.officer, day=datetime.date(2025, 1, 1), approved=3)
+
+        self.assertEqual(rebuild_reviewer_stats(chunk_size=2), 3)
+        self.assertEqual(self.stats(), live)
+        # Rewritten in place, so increments waiting on a row still land on it.
+        self.assertEqual(set(ReviewerDailyStats.objects.values_list("pk", flat=True)), pks)
+
+    def test_rebuild_since_leaves_earlier_days(self):
+        self.decide(T0)
+        self.decide(T0 + datetime.timedelta(days=2))
+        ReviewerDailyStats.objects.update(approved=7)
+
+        since = timezone.localdate(T0 + datetime.timedelta(days=1))
+        rebuild_reviewer_stats(since=since)
+        self.assertEqual(
+            dict(ReviewerDailyStats.objects.values_list("day", "approved")),
+            {timezone.localdate(T0): 7, timezone.localdate(T0 + datetime.timedelta(days=2)): 1},
+        )
+
+    def test_backfill_review_started_at(self):
+        started_at = T0 - datetime.timedelta(hours=2)
+        application = self.make_application(status=ApplicationStatus.UNDER_REVIEW)
+        for timestamp in (started_at - datetime.timedelta(days=3), started_at):
+            ApplicationAuditLog.objects.create(
+                application=application, previous_status=ApplicationStatus.PENDING_INFO,
+                new_status=ApplicationStatus.UNDER_REVIEW, timestamp=timestamp,
+            )
+        already = self.make_application(status=ApplicationStatus.UNDER_REVIEW, review_started_at=T0)
+        self.make_application(status=ApplicationStatus.UNDER_REVIEW)   # no audit row to go by
+
+        self.assertEqual(backfill_review_started_at(), 2)
+        application.refresh_from_db()
+        already.refresh_from_db()
+        self.assertEqual(application.review_started_at, started_at)   # the latest entry
+        self.assertEqual(already.review_started_at, T0)
+
+    def test_command(self):
+        self.decide(T0, review_minutes=30)
+        ReviewerDailyStats.objects.update(approved=5)
+        out = io.StringIO()
+        call_command("backfill_reviewer_stats", stdout=out)
+        self.assertIn("Rebuilt 1 reviewer-day row(s).", out.getvalue())
+        self.assertEqual(ReviewerDailyStats.objects.get().approved, 1)
+
+
+class BulkDecideTests(ReviewTestCase):
+    def setUp(self):
+        super().setUp()
+        started = timezone.now() - datetime.timedelta(hours=1)
+        self.reviewable = [
+            self.make_application(
+                status=ApplicationStatus.UNDER_REVIEW, assigned_officer=self.officer, review_started_at=started,
+            )
+            for _ in range(3)
+        ]
+        self.approved = self.make_application(status=ApplicationStatus.APPROVED)
+        self.deleted = self.make_application(status=ApplicationStatus.UNDER_REVIEW, soft_deleted_at=timezone.now())
+        reconcile_counters()
+
+    def test_mixed_batch_reports_each_outcome(self):
+        missing = uuid.uuid4()
+        ids = [a.pk for a in self.reviewable] + [self.approved.pk, self.deleted.pk, missing]
+        outcomes = bulk_decide(ids, ReviewDecisionChoice.APPROVED, reviewer=self.supervisor)
+
+        self.assertEqual({outcomes[a.pk] for a in self.reviewable}, {ApplicationStatus.APPROVED})
+        self.assertEqual(outcomes[self.approved.pk], "Skipped: status is APPROVED.")
+        self.assertEqual(outcomes[self.deleted.pk], "Not found.")
+        self.assertEqual(outcomes[missing], "Not found.")
+
+        self.assertEqual(
+            VisaApplication.objects.filter(status=ApplicationStatus.APPROVED).count(), 4,
+        )
+        self.assertEqual(ReviewDecision.objects.filter(reviewer=self.supervisor).count(), 3)
+        self.assertEqual(
+            AuditOutbox.objects.filter(actor=self.supervisor, new_status=ApplicationStatus.APPROVED).count(), 3,
+        )
+        stats = ReviewerDailyStats.objects.get(reviewer=self.supervisor)
+        self.assertEqual((stats.approved, stats.timed_decisions), (3, 3))
+        self.assertEqual(reconcile_counters(dry_run=True), {})
+        self.assertEqual(get_status_counts()[ApplicationStatus.APPROVED], 4)
+        self.assertEqual(get_queue_version(ALL_QUEUES), 1)
+        self.assertEqual(get_queue_version(officer_scope(self.officer.pk)), 1)
+
+    def test_reject_needs_a_reason(self):
+        with self.assertRaises(RuleViolation) as caught:
+            bulk_decide([self.reviewable[0].pk], ReviewDecisionChoice.REJECTED, reviewer=self.supervisor, reason=" ")
+        self.assertEqual(caught.exception.failure_codes, ["DECISION_REASON_MISSING"])
+
+        outcomes = bulk_decide(
+            [self.reviewable[0].pk], ReviewDecisionChoice.REQUEST_INFO, reviewer=self.supervisor, reason="Need a bank statement.",
+        )
+        self.assertEqual(outcomes[self.reviewable[0].pk], ApplicationStatus.PENDING_INFO)
+        self.assertEqual(reconcile_counters(dry_run=True), {})
+
+    def test_nothing_to_decide_changes_nothing(self):
+        outcomes = bulk_decide([self.approved.pk], ReviewDecisionChoice.APPROVED, reviewer=self.supervisor)
+        self.assertEqual(outcomes, {self.approved.pk: "Skipped: status is APPROVED."})
+        self.assertFalse(ReviewDecision.objects.exists())
+        self.assertEqual(get_queue_version(ALL_QUEUES), 0)
+
+    def test_only_supervisors_decide_in_bulk(self):
+        with self.assertRaises(PermissionDenied):
+            bulk_decide([self.reviewable[0].pk], ReviewDecisionChoice.APPROVED, reviewer=self.officer)
+        with self.assertRaises(RuleViolation):
+            bulk_decide([self.reviewable[0].pk], "ESCALATE", reviewer=self.supervisor)
+
+    def test_batch_size_is_capped(self):
+        with mock.patch("apps.reviews.services.BULK_DECISION_MAX", 2):
+            with self.assertRaises(RuleViolation) as caught:
+                bulk_decide([a.pk for a in self.reviewable], ReviewDecisionChoice.APPROVED, reviewer=self.supervisor)
+        self.assertEqual(caught.exception.failure_codes, ["BULK_LIMIT_EXCEEDED"])
+        self.assertEqual(VisaApplication.objects.filter(status=ApplicationStatus.UNDER_REVIEW).count(), 4)
+
+    def test_form_skips_only_malformed_ids(self):
+        self.client.force_login(self.supervisor)
+        url = reverse("visas:supervisor_override")
+        response = self.client.post(url, {
+            "application_ids": [str(self.reviewable[0].pk), "not-a-uuid"],
+            "decision": ReviewDecisionChoice.APPROVED,
+        }, follow=True)
+
+        self.reviewable[0].refresh_from_db()
+        self.assertEqual(self.reviewable[0].status, ApplicationStatus.APPROVED)
+        notes = [str(m) for m in response.context["messages"]]
+        self.assertIn("Decision applied to 1 of 1 application(s).", notes)
+        self.assertIn("Not applied — not-a-uuid: Not a valid application ID.", notes)
+
+        response = self.client.post(url, {
+            "application_ids": ["not-a-uuid"], "decision": ReviewDecisionChoice.APPROVED,
+        }, follow=True)
+        self.assertEqual([str(m) for m in response.context["messages"]], ["Not valid application IDs: not-a-uuid."])
+
+    def test_json_endpoint(self):
+        self.client.force_login(self.supervisor)
+        response = self.client.post(
+            reverse("visas:supervisor_override"),
+            json.dumps({
+                "application_ids": [str(self.reviewable[0].pk), str(self.approved.pk)],
+                "decision": ReviewDecisionChoice.APPROVED,
+            }),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["applied"], 1)
+        self.assertEqual(response.json()["outcomes"][str(self.approved.pk)], "Skipped: status is APPROVED.")
+
+
+@override_settings(
+    QUEUE_FEED_POLL_SECONDS=0.05, QUEUE_FEED_HEARTBEAT_SECONDS=0.1, QUEUE_FEED_STREAM_SECONDS=0.3,
+)
+class QueueFeedTests(ReviewTestCase):
+    def test_versions_are_created_then_bumped(self):
+        bump_queue_versions([self.officer.pk])
+        bump_queue_versions([self.officer.pk, None])
+        bump_queue_versions()
+        self.assertEqual(get_queue_version(ALL_QUEUES), 3)
+        self.assertEqual(get_queue_version(officer_scope(self.officer.pk)), 2)
+        self.assertEqual(get_queue_version(officer_scope(self.other_officer.pk)), 0)
+
+    def test_wsgi_pages_poll(self):
+        self.client.force_login(self.officer)
+        response = self.client.get(reverse("reviews:queue"))
+        self.assertFalse(response.context["live_feed"])
+        self.assertContains(response, "const liveFeed = false;")
+        self.assertEqual(self.client.get(reverse("reviews:queue_events")).status_code, 204)
+
+    async def test_asgi_pages_stream(self):
+        await self.async_client.aforce_login(self.officer)
+        response = await self.async_client.get(reverse("reviews:queue"))
+        self.assertTrue(response.context["live_feed"])
+        self.assertContains(response, "const liveFeed = true;")
+
+        response = await self.async_client.get(reverse("reviews:queue_events"), {"since": "0"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn(": keep-alive", body)
+
+    async def test_asgi_stream_announces_a_newer_version(self):
+        await self.async_client.aforce_login(self.officer)
+        await QueueVersion.objects.acreate(scope=officer_scope(self.officer.pk), version=4)
+        response = await self.async_client.get(reverse("reviews:queue_events"), {"since": "3"})
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertIn('id: 4\nevent: queue\ndata: {"version": 4}', body)
+
+    def test_version_endpoint_answers_304_while_unchanged(self):
+        self.client.force_login(self.officer)
+        first = self.client.get(reverse("reviews:queue_version"))
+        self.assertEqual(first.json()["version"], 0)
+        self.assertEqual(
+            self.client.get(reverse("reviews:queue_version"), headers={"If-None-Match": first["ETag"]}).status_code,
+            304,
+        )
+        bump_queue_versions([self.officer.pk])
+        changed = self.client.get(reverse("reviews:queue_version"), headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(changed.json()["version"], 1)
+
+
+@override_settings(REVIEW_ASSIGNMENT_STRATEGY="least_loaded", REVIEW_ASSIGNMENT_SKILL_ROUTING=True)
+class AssignmentTests(ReviewTestCase):
+    def under_review(self, visa_type=None, **fields) -> VisaApplication:
+        return self.make_application(visa_type=visa_type, status=ApplicationStatus.UNDER_REVIEW, **fields)
+
+    def assign(self, application):
+        with self.captureOnCommitCallbacks(execute=True):
+            officer_id = assign_application(application)
+        return officer_id
+
+    def test_least_loaded_officer_is_chosen(self):
+        for _ in range(2):
+            self.under_review(assigned_officer=self.officer)
+        get_load_table(refresh=True)
+
+        self.assertEqual(self.assign(self.under_review()), self.other_officer.pk)
+        self.assertEqual(get_load_table().loads, {self.officer.pk: 2, self.other_officer.pk: 1})
+
+    @override_settings(REVIEW_ASSIGNMENT_STRATEGY="round_robin", REVIEW_ASSIGNMENT_SKILL_ROUTING=False)
+    def test_round_robin_takes_turns(self):
+        for _ in range(3):
+            self.under_review(assigned_officer=self.officer)
+        get_load_table(refresh=True)
+
+        picked = [self.assign(self.under_review()) for _ in range(4)]
+        self.assertEqual(picked[:2], picked[2:])
+        self.assertEqual(set(picked), {self.officer.pk, self.other_officer.pk})
+
+    def test_skill_routing_and_fallbacks(self):
+        self.other_officer.visa_type_skills.add(self.business)
+        for _ in range(3):
+            self.under_review(assigned_officer=self.other_officer)
+        get_load_table(refresh=True)
+
+        # Skilled beats less loaded; unskilled types go to the generalist.
+        self.assertEqual(self.assign(self.under_review(visa_type=self.business)), self.other_officer.pk)
+        self.assertEqual(self.assign(self.under_review()), self.officer.pk)
+
+        # With no generalist left, anyone takes the case.
+        self.officer.visa_type_skills.add(self.business)
+        get_load_table(refresh=True)
+        self.assertIn(self.assign(self.under_review()), {self.officer.pk, self.other_officer.pk})
+
+    def test_case_back_from_pending_info_keeps_its_officer(self):
+        self.under_review(assigned_officer=self.officer)
+        get_load_table(refresh=True)
+        application = self.make_application(status=ApplicationStatus.PENDING_INFO, assigned_officer=self.officer)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            move_to_under_review(application)
+        application.refresh_from_db()
+        self.assertEqual(application.assigned_officer_id, self.officer.pk)
+        self.assertEqual(get_load_table().loads[self.officer.pk], 2)
+
+    def test_rolled_back_assignment_is_not_counted(self):
+        get_load_table(refresh=True)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            assign_application(self.under_review())
+            raise RuntimeError
+        self.assertEqual(get_load_table().loads, {self.officer.pk: 0, self.other_officer.pk: 0})
+
+    def test_queue_reassigns_cases_of_deactivated_officers(self):
+        leaver = User.objects.create_user("leaver@example.com", "pw", role=UserRole.OFFICER)
+        owned = [self.under_review(assigned_officer=leaver) for _ in range(3)]
+        unassigned = self.under_review()
+        leaver.is_active = False
+        leaver.save(update_fields=["is_active"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(assign_review_queue(batch_size=2), 4)
+
+        owners = dict(
+            VisaApplication.objects.filter(pk__in=[a.pk for a in owned] + [unassigned.pk])
+            .values_list("pk", "assigned_officer_id")
+        )
+        self.assertNotIn(leaver.pk, owners.values())
+        # Least loaded: the four cases are split evenly.
+        self.assertEqual(sorted(Counter(owners.values()).values()), [2, 2])
+        self.assertEqual(get_load_table().loads, {self.officer.pk: 2, self.other_officer.pk: 2})
+        self.assertEqual(assign_review_queue(), 0)
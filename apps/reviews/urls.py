@@ -5,15 +5,21 @@ from apps.reviews.views import (
     ApplicationReviewView,
     DecisionHistoryView,
     OfficerQueueView,
+    QueueEventsView,
+    QueueVersionView,
     RejectApplicationView,
     RequestMoreInfoView,
+    ReviewerStatsView,
 )
 
 app_name = "reviews"
 
 urlpatterns = [
     path("queue/", OfficerQueueView.as_view(), name="queue"),
+    path("queue/events/", QueueEventsView.as_view(), name="queue_events"),
+    path("queue/version/", QueueVersionView.as_view(), name="queue_version"),
     path("history/", DecisionHistoryView.as_view(), name="history"),
+    path("stats/", ReviewerStatsView.as_view(), name="stats"),
     path("<uuid:pk>/", ApplicationReviewView.as_view(), name="review"),
     path("<uuid:pk>/approve/", ApproveApplicationView.as_view(), name="approve"),
     path("<uuid:pk>/reject/", RejectApplicationView.as_view(), name="reject"),
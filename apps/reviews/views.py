@@ -1,7 +1,12 @@
+import datetime
+
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.views.generic import View
 
 from apps.accounts.choices import UserRole
@@ -15,28 +20,96 @@ from apps.applications.selectors import (
     get_officer_queue,
     get_pending_info_queue,
 )
-from apps.reviews.forms import DecisionReasonForm, RequestInfoForm
-from apps.reviews.models import ReviewDecision
+from apps.reviews.feed import (
+    ALL_QUEUES,
+    get_queue_version,
+    live_feed_available,
+    queue_scope,
+    stream_queue_events,
+)
+from apps.reviews.forms import DecisionHistoryFilterForm, DecisionReasonForm, RequestInfoForm
+from apps.reviews.selectors import get_decision_history, get_reviewer_workload, parse_decision_cursor
 from apps.reviews.services import approve_application, reject_application, request_more_info
 
 
 REVIEWER_ROLES = [UserRole.OFFICER, UserRole.SUPERVISOR]
+HISTORY_PAGE_SIZE = 50
 
 
 class OfficerQueueView(LoginRequiredMixin, RoleRequiredMixin, View):
     allowed_roles = REVIEWER_ROLES
     template_name = "officer/queue.html"
 
+    DOCUMENT_FILTERS = {"complete": True, "incomplete": False}
+
     def get(self, request):
-        queue = get_officer_queue()
-        pending_info = get_pending_info_queue()
+        documents_filter = request.GET.get("documents", "")
+        is_supervisor = request.user.role == UserRole.SUPERVISOR
+        # Officers work their own assigned cases; supervisors see everyone's.
+        officer = None if is_supervisor else request.user
+        # Read before the queues, so the feed reports any change made after.
+        queue_version = get_queue_version(queue_scope(request.user))
+        queue = get_officer_queue(documents_complete=self.DOCUMENT_FILTERS.get(documents_filter), officer=officer)
+        pending_info = get_pending_info_queue(officer=officer)
         return render(request, self.template_name, {
             "queue": queue,
             "pending_info_queue": pending_info,
-            "is_supervisor": request.user.role == UserRole.SUPERVISOR,
+            "documents_filter": documents_filter if documents_filter in self.DOCUMENT_FILTERS else "",
+            "is_supervisor": is_supervisor,
+            "queue_version": queue_version,
+            "live_feed": live_feed_available(request),
         })
 
 
+class QueueEventsView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """
+    Server-sent events announcing changes to the caller's review queue. The
+    view itself is synchronous (authentication needs the ORM); the body is
+    an async iterator, so under ASGI an open stream holds no worker thread.
+    Under WSGI it answers 204, which tells EventSource not to reconnect.
+    """
+
+    allowed_roles = REVIEWER_ROLES
+
+    def get(self, request):
+        if not live_feed_available(request):
+            return HttpResponse(status=204)
+        last_seen = request.headers.get("Last-Event-ID") or request.GET.get("since", "")
+        response = StreamingHttpResponse(
+            stream_queue_events(queue_scope(request.user), int(last_seen) if last_seen.isdigit() else None),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"   # let nginx pass events straight through
+        return response
+
+
+class QueueVersionView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """
+    Polling fallback for QueueEventsView: answers If-None-Match with 304 for
+    the cost of one primary-key lookup while the caller's queue is unchanged,
+    and with the version and queue sizes when it has changed.
+    """
+
+    allowed_roles = REVIEWER_ROLES
+
+    def get(self, request):
+        scope = queue_scope(request.user)
+        version = get_queue_version(scope)
+        etag = quote_etag(f"queue-{scope}-{version}")
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            officer = None if scope == ALL_QUEUES else request.user
+            response = JsonResponse({
+                "version": version,
+                "under_review": get_officer_queue(officer=officer).count(),
+                "pending_info": get_pending_info_queue(officer=officer).count(),
+            })
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
 class ApplicationReviewView(LoginRequiredMixin, RoleRequiredMixin, View):
     allowed_roles = REVIEWER_ROLES
     template_name = "officer/review.html"
@@ -125,20 +198,58 @@ class DecisionHistoryView(LoginRequiredMixin, RoleRequiredMixin, View):
     template_name = "officer/history.html"
 
     def get(self, request):
-        if request.user.role == UserRole.SUPERVISOR:
-            decisions = (
-                ReviewDecision.objects
-                .select_related("application__visa_type", "reviewer")
-                .order_by("-created_at")[:200]
-            )
-        else:
-            decisions = (
-                ReviewDecision.objects
-                .filter(reviewer=request.user)
-                .select_related("application__visa_type")
-                .order_by("-created_at")[:200]
+        is_supervisor = request.user.role == UserRole.SUPERVISOR
+        form = DecisionHistoryFilterForm(request.GET, is_supervisor=is_supervisor)
+        before = parse_decision_cursor(request.GET.get("before", ""))
+        decisions, next_cursor, filters = [], None, {}
+        if form.is_valid():
+            data = form.cleaned_data
+            filters = {
+                "decision": data["decision"],
+                "visa_type": data["visa_type"],
+                "application_id": data["application"],
+                "date_from": data["date_from"],
+                "date_to": data["date_to"],
+                "officer_email": data.get("officer", ""),
+            }
+            decisions, next_cursor = get_decision_history(
+                reviewer=None if is_supervisor else request.user,
+                before=before,
+                limit=HISTORY_PAGE_SIZE,
+                **filters,
             )
+
+        # Filters carried into the pagination links.
+        params = request.GET.copy()
+        params.pop("before", None)
         return render(request, self.template_name, {
+            "form": form,
             "decisions": decisions,
-            "is_supervisor": request.user.role == UserRole.SUPERVISOR,
+            "is_supervisor": is_supervisor,
+            "filtering": any(value not in (None, "") for value in filters.values()),
+            "page_size": HISTORY_PAGE_SIZE,
+            "next_cursor": next_cursor,
+            "is_first_page": before is None,
+            "filter_query": params.urlencode(),
         })
+
+
+class ReviewerStatsView(LoginRequiredMixin, RoleRequiredMixin, View):
+    allowed_roles = [UserRole.SUPERVISOR]
+    template_name = "supervisor/reviewer_stats.html"
+
+    PERIODS = (7, 30, 90)
+
+    def get(self, request):
+        days = request.GET.get("days", "")
+        days = int(days) if days.isdigit() and int(days) in self.PERIODS else 30
+        since = timezone.localdate() - datetime.timedelta(days=days - 1)
+        reviewers, daily = get_reviewer_workload(since)
+        return render(request, self.template_name, {
+            "reviewers": reviewers,
+            "daily": daily,
+            "days": days,
+            "periods": self.PERIODS,
+            "since": since,
+        })
+
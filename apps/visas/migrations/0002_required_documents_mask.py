@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visatype',
+            name='required_documents_mask',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
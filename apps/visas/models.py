@@ -26,6 +26,10 @@ class VisaType(models.Model):
         default=True,
         db_index=True,          # queries for available visa types always filter on this
     )
+    # Required-documents bitmask (apps.documents.masks) that the applications'
+    # documents_complete flags were last computed against; NULL until the
+    # first refresh_required_masks run.
+    required_documents_mask = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         db_table = "visas_visatype"
@@ -1,8 +1,10 @@
 import datetime
+import json
+import uuid
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.generic import View
@@ -10,12 +12,24 @@ from django.views.generic import View
 from apps.accounts.choices import UserRole
 from apps.accounts.mixins import RoleRequiredMixin
 from apps.applications.choices import ApplicationStatus
+from apps.applications.counters import count_submissions_since, get_status_counts
+from apps.applications.exceptions import InvalidStateTransition, PermissionDenied, RuleViolation
 from apps.applications.models import VisaApplication
+from apps.reviews.forms import BulkDecisionForm
+from apps.reviews.services import BULK_DECISION_MAX, DECISION_STATUSES, bulk_decide
 from apps.visas.forms import VisaTypeForm
 from apps.visas.models import VisaType
 
 
 class SupervisorOverrideView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """
+    GET lists active cases (optionally ?visa_type=) for supervisor action.
+    POST applies one decision to many of them: either the page form
+    (application_ids + decision + reason) or a JSON body
+    {"application_ids": [...], "decision": "...", "reason": "..."}, which
+    gets the per-application outcomes back as JSON.
+    """
+
     allowed_roles = [UserRole.SUPERVISOR]
     template_name = "supervisor/override.html"
 
@@ -26,6 +40,9 @@ class SupervisorOverrideView(LoginRequiredMixin, RoleRequiredMixin, View):
             .select_related("applicant", "visa_type")
             .order_by("submitted_at")
         )
+        visa_type = request.GET.get("visa_type", "")
+        if visa_type.isdigit():
+            escalated = escalated.filter(visa_type_id=int(visa_type))
         recent_rejected = (
             VisaApplication.objects
             .filter(status=ApplicationStatus.REJECTED, soft_deleted_at__isnull=True)
@@ -36,8 +53,70 @@ class SupervisorOverrideView(LoginRequiredMixin, RoleRequiredMixin, View):
             "escalated": escalated,
             "recent_rejected": recent_rejected,
             "can_take_action": True,
+            "visa_types": VisaType.objects.order_by("name"),
+            "selected_visa_type": int(visa_type) if visa_type.isdigit() else None,
+            "bulk_form": BulkDecisionForm(),
+            "bulk_max": BULK_DECISION_MAX,
         })
 
+    def post(self, request):
+        wants_json = request.content_type == "application/json"
+        invalid = []
+        if wants_json:
+            try:
+                payload = json.loads(request.body)
+                ids = [uuid.UUID(str(i)) for i in payload.get("application_ids", [])]
+                data = {"decision": payload.get("decision", ""), "reason": payload.get("reason", "")}
+            except (ValueError, TypeError, AttributeError):
+                return JsonResponse({"error": "Malformed request body."}, status=400)
+        else:
+            # A malformed ID is reported back; the rest of the selection stands.
+            ids = []
+            for value in request.POST.getlist("application_ids"):
+                try:
+                    ids.append(uuid.UUID(value))
+                except ValueError:
+                    invalid.append(value)
+            data = request.POST
+
+        form = BulkDecisionForm(data)
+        error = None
+        if not form.is_valid():
+            error = "; ".join(e for errors in form.errors.values() for e in errors)
+        elif not ids and invalid:
+            error = "Not valid application IDs: " + ", ".join(value[:36] for value in invalid) + "."
+        elif not ids:
+            error = "Select at least one application."
+        else:
+            try:
+                outcomes = bulk_decide(
+                    ids,
+                    form.cleaned_data["decision"],
+                    reviewer=request.user,
+                    reason=form.cleaned_data["reason"],
+                )
+            except (PermissionDenied, InvalidStateTransition, RuleViolation) as exc:
+                error = str(exc)
+        if error:
+            if wants_json:
+                return JsonResponse({"error": error}, status=400)
+            messages.error(request, error)
+            return redirect("visas:supervisor_override")
+
+        new_status = DECISION_STATUSES[form.cleaned_data["decision"]]
+        applied = sum(1 for outcome in outcomes.values() if outcome == new_status)
+        if wants_json:
+            return JsonResponse({
+                "applied": applied,
+                "outcomes": {str(pk): outcome for pk, outcome in outcomes.items()},
+            })
+        messages.success(request, f"Decision applied to {applied} of {len(outcomes)} application(s).")
+        skipped = [f"{value[:36]}: Not a valid application ID." for value in invalid]
+        skipped += [f"{str(pk)[:8]}: {outcome}" for pk, outcome in outcomes.items() if outcome != new_status]
+        if skipped:
+            messages.error(request, "Not applied — " + "; ".join(skipped[:20]) + (" …" if len(skipped) > 20 else ""))
+        return redirect("visas:supervisor_override")
+
 
 class VisaTypeManagementView(LoginRequiredMixin, RoleRequiredMixin, View):
     allowed_roles = [UserRole.ADMIN]
@@ -78,19 +157,11 @@ class SystemReportsView(LoginRequiredMixin, RoleRequiredMixin, View):
     template_name = "admin/reports.html"
 
     def get(self, request):
-        status_counts = dict(
-            VisaApplication.objects
-            .filter(soft_deleted_at__isnull=True)
-            .values("status")
-            .annotate(count=Count("id"))
-            .values_list("status", "count")
-        )
+        # Counters only: a fixed handful of rows however many applications exist.
+        status_counts = get_status_counts()
         total = sum(status_counts.values())
         issued = status_counts.get(ApplicationStatus.ISSUED, 0)
-        thirty_days_ago = timezone.now() - datetime.timedelta(days=30)
-        this_month = VisaApplication.objects.filter(
-            submitted_at__gte=thirty_days_ago, soft_deleted_at__isnull=True
-        ).count()
+        this_month = count_submissions_since(timezone.localdate() - datetime.timedelta(days=29))
         approval_rate = round(issued / total * 100, 1) if total > 0 else 0.0
         return render(request, self.template_name, {
             "status_counts": status_counts,
@@ -126,6 +126,94 @@ STATICFILES_DIRS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Document storage backend. Swap BACKEND for
+# apps.documents.storage.ObjectStoreStorage to move files off the app servers.
+DOCUMENT_STORAGE = {
+    "BACKEND": "apps.documents.storage.LocalFileSystemStorage",
+    "OPTIONS": {},
+}
+# Local scratch space for in-flight uploads; keep it on the same filesystem as
+# MEDIA_ROOT so the local backend can publish files with a single rename.
+DOCUMENT_UPLOAD_TMP_DIR = MEDIA_ROOT / "documents" / "tmp"
+
+# Document downloads are access-checked in Django, then optionally handed to the
+# front proxy: "x-accel-redirect" (nginx, internal location at the prefix below),
+# "x-sendfile" (Apache/lighttpd, local storage only) or "" to stream from Django.
+DOCUMENT_SENDFILE_MODE = _env("DOCUMENT_SENDFILE_MODE", default="")
+DOCUMENT_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Resumable document uploads: each PUT carries at most one chunk, so a single
+# request never holds more than DOCUMENT_UPLOAD_CHUNK_BYTES of body.
+DOCUMENT_UPLOAD_CHUNK_BYTES = 1024 * 1024
+DOCUMENT_UPLOAD_MAX_BYTES = 50 * 1024 * 1024
+# Per document type; enforced while the upload streams in.
+DOCUMENT_UPLOAD_LIMITS = {
+    "PASSPORT": 5 * 1024 * 1024,
+    "PHOTO": 2 * 1024 * 1024,
+    "BANK_STATEMENT": DOCUMENT_UPLOAD_MAX_BYTES,
+    "INVITATION_LETTER": 10 * 1024 * 1024,
+    "TRAVEL_ITINERARY": 10 * 1024 * 1024,
+    "ACCOMMODATION_PROOF": 10 * 1024 * 1024,
+    "OTHER": 10 * 1024 * 1024,
+}
+DOCUMENT_UPLOAD_SESSION_TTL_HOURS = 24
+
+# manage.py gc_documents: files younger than the grace period are never
+# collected; soft-deleted applications stop pinning their files after the
+# retention period (None keeps them forever). Quarantined files keep their
+# relative path under DOCUMENT_GC_QUARANTINE_DIR, outside the scanned tree.
+DOCUMENT_GC_GRACE_HOURS = 48
+DOCUMENT_GC_SOFT_DELETE_RETENTION_DAYS = 365
+DOCUMENT_GC_QUARANTINE_DIR = MEDIA_ROOT / "documents-quarantine"
+
+# Payment gateway webhooks: HMAC-SHA256 shared secret, and how old a signed
+# timestamp may be before the notification is refused as a replay.
+PAYMENT_WEBHOOK_SECRET = _env("PAYMENT_WEBHOOK_SECRET", default="")
+PAYMENT_WEBHOOK_TOLERANCE_SECONDS = 300
+# A notification can arrive before its payment record exists; the worker
+# retries it after RETRY_SECONDS, doubling each time, and marks it FAILED
+# once MAX_ATTEMPTS have all found no payment.
+PAYMENT_NOTIFICATION_MAX_ATTEMPTS = 8
+PAYMENT_NOTIFICATION_RETRY_SECONDS = 30
+
+# manage.py flush_audit_outbox only moves events older than this, so a
+# transaction that commits its audit event late still lands in order. Keep
+# it above the longest request or worker transaction.
+AUDIT_OUTBOX_COMMIT_LAG_SECONDS = 5
+
+# manage.py maintain_audit_partitions: monthly audit partitions are created
+# this many months ahead, and months older than the hot retention window are
+# detached into audit_applicationauditlog_pYYYYMM archive tables.
+AUDIT_PARTITION_MONTHS_AHEAD = 3
+AUDIT_HOT_RETENTION_MONTHS = 24
+# manage.py archive_audit_segments writes detached months here as immutable
+# gzip JSONL segments (with an application_id -> offset index); application
+# timelines read them back transparently.
+AUDIT_ARCHIVE_DIR = Path(_env("AUDIT_ARCHIVE_DIR", default=str(BASE_DIR / "audit-archive")))
+
+# HMAC key for audit chain checkpoints (manage.py verify_audit_chain). Keep it
+# out of the database so whoever can edit audit rows cannot re-sign them;
+# falls back to SECRET_KEY.
+AUDIT_CHECKPOINT_SECRET = _env("AUDIT_CHECKPOINT_SECRET", default="")
+
+# Officer assignment on entry to UNDER_REVIEW (apps.reviews.assignment):
+# "least_loaded" or "round_robin"; with skill routing, officers whose
+# visa_type_skills include the application's type are preferred. Each
+# process keeps an in-memory load table, rebuilt after this many seconds.
+REVIEW_ASSIGNMENT_STRATEGY = _env("REVIEW_ASSIGNMENT_STRATEGY", default="least_loaded")
+REVIEW_ASSIGNMENT_SKILL_ROUTING = _env("REVIEW_ASSIGNMENT_SKILL_ROUTING", default="True").lower() in ("true", "1", "yes")
+REVIEW_ASSIGNMENT_REFRESH_SECONDS = 60
+
+# Officer queue change feed (reviews:queue_events): only streams under ASGI
+# (e.g. uvicorn e_visa_system.asgi:application); under WSGI pages fall back
+# to reviews:queue_version, a conditional GET. Each process polls the queue
+# version table once per interval for all open streams; streams end after
+# QUEUE_FEED_STREAM_SECONDS and the browser reconnects.
+QUEUE_FEED_POLL_SECONDS = 2
+QUEUE_FEED_HEARTBEAT_SECONDS = 20
+QUEUE_FEED_STREAM_SECONDS = 300
+QUEUE_FEED_RETRY_MS = 5000
+
 LOGIN_URL = "/auth/login/"
 LOGIN_REDIRECT_URL = "/applications/dashboard/"
 LOGOUT_REDIRECT_URL = "/auth/login/"
@@ -1,5 +1,3 @@
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import RedirectView
@@ -23,6 +21,7 @@ urlpatterns = [
     path("django-admin/", admin.site.urls),
     path("auth/", include("apps.accounts.urls", namespace="accounts")),
     path("applications/", include("apps.applications.urls", namespace="applications")),
+    path("documents/", include("apps.documents.urls", namespace="documents")),
     path("payments/", include("apps.payments.urls", namespace="payments")),
     path("reviews/", include("apps.reviews.urls", namespace="reviews")),
     path("audit/", include("apps.audit.urls", namespace="audit")),
@@ -38,4 +37,4 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc",
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]